@@ -0,0 +1,113 @@
+-- Migration to add ranked full-text search over calls
+-- Run this SQL in your Supabase SQL Editor
+
+-- Search document of a call: identifiers (load number, driver) rank above the
+-- call summary, which ranks above the transcript / free-text details. It is
+-- indexed as an expression instead of a stored column so `select=*` responses
+-- don't carry a tsvector.
+CREATE OR REPLACE FUNCTION call_search_document(identifiers TEXT, summary TEXT, body TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(identifiers, '')), 'A') ||
+           setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+           setweight(to_tsvector('english', coalesce(body, '')), 'C')
+$$ LANGUAGE sql IMMUTABLE;
+
+DO $$
+BEGIN
+    IF to_regclass('public.call_records') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_call_records_search ON call_records USING GIN (
+            call_search_document(
+                load_number || ' ' || driver_name,
+                call_summary,
+                coalesce(delivery_address, '') || ' ' || coalesce(special_instructions, '')
+            )
+        );
+    END IF;
+
+    IF to_regclass('public.call_results') IS NOT NULL THEN
+        ALTER TABLE call_results ADD COLUMN IF NOT EXISTS call_summary TEXT;
+        CREATE INDEX IF NOT EXISTS idx_call_results_search ON call_results USING GIN (
+            call_search_document(load_number || ' ' || driver_name, call_summary, transcript)
+        );
+    END IF;
+END $$;
+
+-- Ranked search over call_records (simple backend). The WHERE expression must
+-- match the index expression exactly; snippets are only built for the returned page.
+CREATE OR REPLACE FUNCTION search_call_records(search_query TEXT, result_limit INTEGER DEFAULT 20, result_offset INTEGER DEFAULT 0)
+RETURNS TABLE (
+    call_id VARCHAR,
+    agent_config_id BIGINT,
+    driver_name VARCHAR,
+    phone_number VARCHAR,
+    load_number VARCHAR,
+    status VARCHAR,
+    created_at TIMESTAMP WITH TIME ZONE,
+    rank REAL,
+    snippet TEXT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH hits AS (
+        SELECT r.*, ts_rank_cd(
+            call_search_document(
+                r.load_number || ' ' || r.driver_name,
+                r.call_summary,
+                coalesce(r.delivery_address, '') || ' ' || coalesce(r.special_instructions, '')
+            ),
+            q
+        ) AS hit_rank, q
+        FROM call_records r, websearch_to_tsquery('english', search_query) q
+        WHERE call_search_document(
+            r.load_number || ' ' || r.driver_name,
+            r.call_summary,
+            coalesce(r.delivery_address, '') || ' ' || coalesce(r.special_instructions, '')
+        ) @@ q
+        ORDER BY hit_rank DESC, r.id DESC
+        LIMIT result_limit OFFSET result_offset
+    )
+    SELECT h.call_id, h.agent_config_id, h.driver_name, h.phone_number, h.load_number, h.status,
+           h.created_at, h.hit_rank,
+           ts_headline('english',
+                       concat_ws(' ', h.call_summary, h.delivery_address, h.special_instructions),
+                       h.q, 'MaxFragments=2, MaxWords=20, MinWords=5')
+    FROM hits h
+    ORDER BY h.hit_rank DESC, h.id DESC;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Ranked search over call_results (app/ backend)
+CREATE OR REPLACE FUNCTION search_call_results(search_query TEXT, result_limit INTEGER DEFAULT 20, result_offset INTEGER DEFAULT 0)
+RETURNS TABLE (
+    call_id VARCHAR,
+    agent_config_id INTEGER,
+    driver_name VARCHAR,
+    phone_number VARCHAR,
+    load_number VARCHAR,
+    status VARCHAR,
+    created_at TIMESTAMP WITH TIME ZONE,
+    rank REAL,
+    snippet TEXT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH hits AS (
+        SELECT r.*, ts_rank_cd(
+            call_search_document(r.load_number || ' ' || r.driver_name, r.call_summary, r.transcript),
+            q
+        ) AS hit_rank, q
+        FROM call_results r, websearch_to_tsquery('english', search_query) q
+        WHERE call_search_document(r.load_number || ' ' || r.driver_name, r.call_summary, r.transcript) @@ q
+        ORDER BY hit_rank DESC, r.id DESC
+        LIMIT result_limit OFFSET result_offset
+    )
+    SELECT h.call_id, h.agent_config_id, h.driver_name, h.phone_number, h.load_number, h.status,
+           h.created_at, h.hit_rank,
+           ts_headline('english', coalesce(h.call_summary, '') || ' ' || coalesce(h.transcript, ''),
+                       h.q, 'MaxFragments=2, MaxWords=20, MinWords=5')
+    FROM hits h
+    ORDER BY h.hit_rank DESC, h.id DESC;
+END;
+$$ LANGUAGE plpgsql STABLE;
@@ -0,0 +1,109 @@
+-- Migration to add outbound calling campaigns
+-- Run this SQL in your Supabase SQL Editor after supabase_schema.sql
+
+-- Create campaigns table (outbound calling campaigns dialed by the scheduler)
+CREATE TABLE IF NOT EXISTS campaigns (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    agent_config_id BIGINT NOT NULL REFERENCES agent_configurations(id) ON DELETE CASCADE,
+    status VARCHAR(20) DEFAULT 'active' CHECK (status IN ('active', 'paused', 'completed', 'cancelled')),
+    max_concurrency INTEGER NOT NULL DEFAULT 5 CHECK (max_concurrency > 0),
+    timezone VARCHAR(64) NOT NULL DEFAULT 'America/Chicago',
+    window_start TIME NOT NULL DEFAULT '08:00',
+    window_end TIME NOT NULL DEFAULT '18:00',
+    max_attempts INTEGER NOT NULL DEFAULT 3 CHECK (max_attempts > 0),
+    retry_delay_minutes INTEGER NOT NULL DEFAULT 30 CHECK (retry_delay_minutes >= 0),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create campaign_entries table (one row per driver/load to call)
+CREATE TABLE IF NOT EXISTS campaign_entries (
+    id BIGSERIAL PRIMARY KEY,
+    campaign_id BIGINT NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    driver_name VARCHAR(100) NOT NULL,
+    phone_number VARCHAR(20) NOT NULL,
+    load_number VARCHAR(50) NOT NULL,
+    delivery_address TEXT,
+    expected_delivery_time TIMESTAMP WITH TIME ZONE,
+    special_instructions TEXT,
+    timezone VARCHAR(64),
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'dialing', 'in_progress', 'completed', 'failed', 'cancelled')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    last_call_id VARCHAR(100),
+    last_outcome VARCHAR(50),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create indexes for the scheduler's queries
+CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status);
+CREATE INDEX IF NOT EXISTS idx_campaign_entries_due ON campaign_entries(campaign_id, status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_campaign_entries_status_updated_at ON campaign_entries(status, updated_at);
+CREATE INDEX IF NOT EXISTS idx_campaign_entries_last_call_id ON campaign_entries(last_call_id);
+
+-- Enable Row Level Security for campaigns
+ALTER TABLE campaigns ENABLE ROW LEVEL SECURITY;
+ALTER TABLE campaign_entries ENABLE ROW LEVEL SECURITY;
+
+-- Create policies for campaigns
+CREATE POLICY "Allow all operations for anonymous users" ON campaigns
+    FOR ALL USING (true);
+
+CREATE POLICY "Allow all operations for anonymous users" ON campaign_entries
+    FOR ALL USING (true);
+
+-- Create triggers for campaigns updated_at
+CREATE TRIGGER update_campaigns_updated_at 
+    BEFORE UPDATE ON campaigns 
+    FOR EACH ROW 
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_campaign_entries_updated_at 
+    BEFORE UPDATE ON campaign_entries 
+    FOR EACH ROW 
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Claim up to the campaign's free concurrency slots among the given pending entries
+-- (pending -> dialing). Locking the campaign row serializes claims, so schedulers
+-- running in several workers never dial an entry twice or exceed max_concurrency.
+CREATE OR REPLACE FUNCTION claim_campaign_entries(target_campaign_id BIGINT, entry_ids BIGINT[])
+RETURNS SETOF campaign_entries AS $$
+DECLARE
+    slots INTEGER;
+BEGIN
+    SELECT max_concurrency INTO slots FROM campaigns WHERE id = target_campaign_id FOR UPDATE;
+    IF slots IS NULL THEN
+        RETURN;
+    END IF;
+    
+    slots := slots - (
+        SELECT COUNT(*) FROM campaign_entries
+        WHERE campaign_id = target_campaign_id AND status IN ('dialing', 'in_progress')
+    );
+    IF slots <= 0 THEN
+        RETURN;
+    END IF;
+    
+    RETURN QUERY
+    UPDATE campaign_entries e
+    SET status = 'dialing', attempts = e.attempts + 1
+    WHERE e.id IN (
+        SELECT p.id FROM campaign_entries p
+        WHERE p.campaign_id = target_campaign_id AND p.status = 'pending' AND p.id = ANY(entry_ids)
+        ORDER BY array_position(entry_ids, p.id)
+        LIMIT slots
+    )
+    RETURNING e.*;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Entry counts and dial attempts of a campaign by status, without reading every entry
+CREATE OR REPLACE FUNCTION campaign_progress(target_campaign_id BIGINT)
+RETURNS TABLE (status VARCHAR, entries BIGINT, attempts BIGINT) AS $$
+    SELECT e.status, COUNT(*), COALESCE(SUM(e.attempts), 0)
+    FROM campaign_entries e
+    WHERE e.campaign_id = target_campaign_id
+    GROUP BY e.status;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,94 @@
+-- Migration to keep call search working once transcripts are stored compressed
+-- Run this SQL in your Supabase SQL Editor (after add_call_search.sql)
+
+-- The backend stores long transcripts as "zb64:..." compressed text, which
+-- Postgres can't index. Each call's search document therefore lives in its own
+-- table: a trigger keeps identifiers and summary current, and the backend sends
+-- the plain transcript through index_call_transcript() when it writes a
+-- compressed one.
+CREATE TABLE IF NOT EXISTS call_search_documents (
+    call_id VARCHAR(50) PRIMARY KEY REFERENCES call_results(call_id) ON DELETE CASCADE,
+    document tsvector NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_search_documents_document ON call_search_documents USING GIN (document);
+
+-- Replaced by call_search_documents
+DROP INDEX IF EXISTS idx_call_results_search;
+
+CREATE OR REPLACE FUNCTION refresh_call_search_document()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- A compressed transcript keeps the transcript part (weight C) of the previous document
+    INSERT INTO call_search_documents (call_id, document)
+    VALUES (
+        NEW.call_id,
+        call_search_document(
+            NEW.load_number || ' ' || NEW.driver_name,
+            NEW.call_summary,
+            CASE WHEN NEW.transcript LIKE 'zb64:%' THEN NULL ELSE NEW.transcript END
+        )
+    )
+    ON CONFLICT (call_id) DO UPDATE SET document = CASE
+        WHEN NEW.transcript LIKE 'zb64:%'
+            THEN EXCLUDED.document || ts_filter(call_search_documents.document, '{c}')
+        ELSE EXCLUDED.document
+    END;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS refresh_call_results_search_document ON call_results;
+CREATE TRIGGER refresh_call_results_search_document
+    AFTER INSERT OR UPDATE OF load_number, driver_name, call_summary, transcript ON call_results
+    FOR EACH ROW EXECUTE FUNCTION refresh_call_search_document();
+
+-- Rebuild a call's search document from the plain text of its compressed transcript
+CREATE OR REPLACE FUNCTION index_call_transcript(target_call_id TEXT, transcript_text TEXT)
+RETURNS VOID AS $$
+    UPDATE call_search_documents d
+    SET document = call_search_document(r.load_number || ' ' || r.driver_name, r.call_summary, transcript_text)
+    FROM call_results r
+    WHERE r.call_id = target_call_id AND d.call_id = r.call_id;
+$$ LANGUAGE sql;
+
+-- Documents for calls stored before this migration (all plain text)
+INSERT INTO call_search_documents (call_id, document)
+SELECT call_id, call_search_document(load_number || ' ' || driver_name, call_summary, transcript)
+FROM call_results
+ON CONFLICT (call_id) DO NOTHING;
+
+-- Ranked search over call_results (app/ backend). Snippets come from the call
+-- summary and plain transcripts; the backend cuts them from compressed ones.
+CREATE OR REPLACE FUNCTION search_call_results(search_query TEXT, result_limit INTEGER DEFAULT 20, result_offset INTEGER DEFAULT 0)
+RETURNS TABLE (
+    call_id VARCHAR,
+    agent_config_id INTEGER,
+    driver_name VARCHAR,
+    phone_number VARCHAR,
+    load_number VARCHAR,
+    status VARCHAR,
+    created_at TIMESTAMP WITH TIME ZONE,
+    rank REAL,
+    snippet TEXT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH hits AS (
+        SELECT d.call_id, ts_rank_cd(d.document, q) AS hit_rank, q
+        FROM call_search_documents d, websearch_to_tsquery('english', search_query) q
+        WHERE d.document @@ q
+        ORDER BY hit_rank DESC, d.call_id
+        LIMIT result_limit OFFSET result_offset
+    )
+    SELECT r.call_id, r.agent_config_id, r.driver_name, r.phone_number, r.load_number, r.status,
+           r.created_at, h.hit_rank,
+           ts_headline('english',
+                       concat_ws(' ', r.call_summary, CASE WHEN r.transcript LIKE 'zb64:%' THEN NULL ELSE r.transcript END),
+                       h.q, 'MaxFragments=2, MaxWords=20, MinWords=5')
+    FROM hits h
+    JOIN call_results r ON r.call_id = h.call_id
+    ORDER BY h.hit_rank DESC, h.call_id;
+END;
+$$ LANGUAGE plpgsql STABLE;
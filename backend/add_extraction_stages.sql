@@ -0,0 +1,6 @@
+-- Migration to choose structured extraction stages per agent configuration
+-- Run this SQL in your Supabase SQL Editor
+
+-- NULL runs the default stages; otherwise the named stages run in pipeline order
+-- (e.g. '{keywords,transcript_stats}')
+ALTER TABLE agent_configurations ADD COLUMN IF NOT EXISTS extraction_stages TEXT[];
@@ -0,0 +1,10 @@
+-- Migration to record the caller-ID number each call was placed from
+-- Run this SQL in your Supabase SQL Editor
+
+-- Outbound calls are spread over a pool of verified numbers
+ALTER TABLE call_records 
+ADD COLUMN IF NOT EXISTS from_number VARCHAR(20);
+
+-- Per-number reporting (load, carrier errors)
+CREATE INDEX IF NOT EXISTS idx_call_records_from_number 
+ON call_records(from_number);
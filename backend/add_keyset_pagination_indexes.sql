@@ -0,0 +1,23 @@
+-- Migration to support keyset (cursor) pagination of call listings
+-- Run this SQL in your Supabase SQL Editor
+
+-- Listings are ordered by (created_at DESC, id DESC) and paged with a
+-- (created_at, id) cursor, so each page is a single index range scan
+DO $$
+BEGIN
+    IF to_regclass('public.call_records') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_call_records_created_at_id
+            ON call_records(created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_call_records_agent_created_at_id
+            ON call_records(agent_config_id, created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_call_records_status_created_at_id
+            ON call_records(status, created_at DESC, id DESC);
+    END IF;
+
+    IF to_regclass('public.call_results') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_call_results_created_at_id
+            ON call_results(created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_call_results_agent_created_at_id
+            ON call_results(agent_config_id, created_at DESC, id DESC);
+    END IF;
+END $$;
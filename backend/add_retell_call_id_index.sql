@@ -0,0 +1,6 @@
+-- Migration to index call_records.retell_call_id
+-- Run this SQL in your Supabase SQL Editor
+
+-- Webhooks from Retell AI identify calls by retell_call_id, so look them up by index
+CREATE INDEX IF NOT EXISTS idx_call_records_retell_call_id 
+ON call_records(retell_call_id);
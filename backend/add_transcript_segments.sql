@@ -0,0 +1,14 @@
+-- Migration to store live call transcripts as append-only segments
+-- Run this SQL in your Supabase SQL Editor
+
+-- Each transcript_updated webhook appends only its new utterances; the
+-- UNIQUE (call_id, seq) constraint also serves ordered reads of one call
+-- Transcript segments table (append-only utterances of live calls)
+CREATE TABLE IF NOT EXISTS call_transcript_segments (
+    id BIGSERIAL PRIMARY KEY,
+    call_id VARCHAR(50) NOT NULL,
+    seq INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (call_id, seq)
+);
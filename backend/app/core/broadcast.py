@@ -0,0 +1,123 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+class TooManySubscribers(Exception):
+    """Raised when the hub already serves its maximum number of subscribers"""
+
+class Subscription:
+    """One stream consumer with its own bounded queue and optional filters"""
+    
+    def __init__(self, queue_size: int, filters: Dict[str, Any]):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.filters = filters
+        self.dropped = False
+        self.delivered = 0
+    
+    def matches(self, event: Dict[str, Any]) -> bool:
+        return all(event.get(field) == value for field, value in self.filters.items())
+
+class BroadcastHub:
+    """
+    In-process fan-out of events to stream subscribers. publish() never blocks:
+    each subscriber has a bounded queue, and a subscriber whose queue is full
+    is dropped (its stream ends) instead of slowing down the publisher or
+    buffering without limit. Events carry a sequence number used as the SSE id.
+    """
+    
+    def __init__(self, queue_size: int = 100, max_subscribers: int = 500):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self._seq = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped_subscribers = 0
+    
+    def subscribe(self, **filters: Any) -> Subscription:
+        """Register a subscriber; filters with a None value are ignored"""
+        if len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribers(f"Too many stream subscribers ({self.max_subscribers})")
+        subscription = Subscription(
+            self.queue_size,
+            {field: value for field, value in filters.items() if value is not None}
+        )
+        self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+    
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+    
+    def wants(self, field: str) -> bool:
+        """Whether any subscriber filters on field, so publishers only look it up when needed"""
+        return any(field in subscription.filters for subscription in self._subscribers)
+    
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """Queue an event for every matching subscriber and return how many received it"""
+        if not self._subscribers:
+            return 0
+        self._seq += 1
+        self.published += 1
+        event = {"id": self._seq, "event": event_type, "data": data}
+        
+        received = 0
+        for subscription in list(self._subscribers):
+            if not subscription.matches(data):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                subscription.delivered += 1
+                received += 1
+            except asyncio.QueueFull:
+                # A client this far behind is dropped; it can reconnect and catch up
+                subscription.dropped = True
+                self.dropped_subscribers += 1
+                self._subscribers.discard(subscription)
+        self.delivered += received
+        return received
+    
+    async def stream(
+        self,
+        subscription: Subscription,
+        heartbeat: float = 15.0,
+        is_disconnected: Optional[Callable[[], Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield a subscription's events as Server-Sent Events until the client
+        disconnects or is dropped. A comment line is sent every `heartbeat`
+        seconds without events so proxies keep the connection open.
+        """
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if is_disconnected is not None and await is_disconnected():
+                    return
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    if subscription.dropped:
+                        return
+                    yield f": keep-alive {int(time.time())}\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+                if subscription.dropped and subscription.queue.empty():
+                    yield "event: dropped\ndata: {}\n\n"
+                    return
+        finally:
+            self.unsubscribe(subscription)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Subscriber and delivery counters for monitoring"""
+        return {
+            "subscribers": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped_subscribers
+        }
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import time
+
+class LRUCache:
+    """Bounded in-process mapping that evicts the least recently used entry once full"""
+    
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value and mark it as recently used"""
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the oldest entry if the cache is full"""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove a key and return its value"""
+        return self._data.pop(key, default)
+    
+    def clear(self) -> None:
+        self._data.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+class TTLCache(LRUCache):
+    """LRU-bounded cache whose entries also expire `ttl` seconds after being stored"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return a live cached value, counting the lookup as a hit or miss"""
+        entry = super().get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._data.pop(key, None)
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        super().set(key, (time.monotonic() + self.ttl, value))
+    
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = super().pop(key)
+        return entry[1] if entry is not None else default
+    
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,85 @@
+import base64
+import json
+import zlib
+from typing import Any, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compressed values are stored in TEXT/JSONB columns as
+# "zb64:" + base64(format_version byte + codec byte + compressed payload)
+COMPRESSED_PREFIX = "zb64:"
+FORMAT_VERSION = 1
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODECS = {"zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+def resolve_codec(name: str) -> Optional[str]:
+    """The codec to write with: "none" disables compression, zstd falls back to zlib if not installed"""
+    name = (name or "none").lower()
+    if name == "none":
+        return None
+    if name not in CODECS:
+        raise ValueError(f"Unknown compression codec: {name}")
+    if name == "zstd" and zstandard is None:
+        return "zlib"
+    return name
+
+def is_compressed(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(COMPRESSED_PREFIX)
+
+def compress_text(text: Optional[str], codec: Optional[str] = "zstd", min_size: int = 1024) -> Optional[str]:
+    """
+    Compress text for storage. Values shorter than min_size bytes are stored as
+    they are, unless they would be mistaken for a compressed value.
+    """
+    if not text:
+        return text
+    data = text.encode("utf-8")
+    if (codec is None or len(data) < min_size) and not is_compressed(text):
+        return text
+    
+    codec = resolve_codec(codec or "zlib")
+    if codec == "zstd":
+        payload = zstandard.ZstdCompressor(level=10).compress(data)
+    else:
+        payload = zlib.compress(data, 9)
+    header = bytes([FORMAT_VERSION, CODECS[codec]])
+    return COMPRESSED_PREFIX + base64.b64encode(header + payload).decode("ascii")
+
+def decompress_text(value: Optional[str]) -> Optional[str]:
+    """Return the original text of a stored value; plain values pass through unchanged"""
+    if not is_compressed(value):
+        return value
+    
+    raw = base64.b64decode(value[len(COMPRESSED_PREFIX):])
+    if len(raw) < 2 or raw[0] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compressed value format: {raw[:1].hex() or 'empty'}")
+    codec, payload = raw[1], raw[2:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed value found but the 'zstandard' package is not installed")
+        data = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == CODEC_ZLIB:
+        data = zlib.decompress(payload)
+    else:
+        raise ValueError(f"Unknown compression codec id: {codec}")
+    return data.decode("utf-8")
+
+def compress_json(value: Any, codec: Optional[str] = "zstd", min_size: int = 1024) -> Any:
+    """Compress a JSON value into a string when its serialized form is at least min_size bytes"""
+    if value is None or codec is None:
+        return value
+    serialized = json.dumps(value, separators=(",", ":"))
+    if len(serialized) < min_size:
+        return value
+    return compress_text(serialized, codec, min_size=0)
+
+def decompress_json(value: Any) -> Any:
+    """Return the original JSON value of a stored value; plain values pass through unchanged"""
+    if not is_compressed(value):
+        return value
+    return json.loads(decompress_text(value))
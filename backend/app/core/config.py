@@ -18,8 +18,56 @@ class Settings(BaseModel):
     app_name: str = Field(default="Voice Agent Admin")
     debug: bool = Field(default=False)
     
+    # Outbound Retell AI rate limits per endpoint class (requests/second, burst)
+    retell_call_rate: float = Field(default=5.0)
+    retell_call_burst: int = Field(default=10)
+    retell_agent_rate: float = Field(default=2.0)
+    retell_agent_burst: int = Field(default=5)
+    retell_read_rate: float = Field(default=10.0)
+    retell_read_burst: int = Field(default=20)
+    retell_rate_limit_max_wait: float = Field(default=30.0)
+    
     # Database Configuration
     database_url: str = Field(default="")
+    db_pool_size: int = Field(default=16)
+    
+    # Agent Configuration Cache
+    agent_config_cache_size: int = Field(default=256)
+    agent_config_cache_ttl: float = Field(default=300.0)
+    
+    # Retell agent catalog (served stale while refreshing after the TTL)
+    agent_catalog_ttl: float = Field(default=60.0)
+    agent_catalog_max_stale: float = Field(default=3600.0)
+    
+    # Webhook Ingestion ("queue" acks immediately and processes in background workers,
+    # one ordered worker per partition of call_ids)
+    webhook_ingest_mode: str = Field(default="queue")
+    webhook_partitions: int = Field(default=8)
+    webhook_queue_size: int = Field(default=1000)
+    webhook_drain_timeout: float = Field(default=30.0)
+    webhook_dedup_size: int = Field(default=50000)
+    webhook_dedup_ttl: float = Field(default=3600.0)
+    
+    # Idempotency-Key replay store for call triggers and agent creation
+    idempotency_cache_size: int = Field(default=10000)
+    idempotency_ttl: float = Field(default=86400.0)
+    
+    # Call result writes to the same call within this window are merged into one PATCH
+    call_write_coalesce_window_ms: int = Field(default=50)
+    
+    # Compression of stored transcripts and structured summaries ("zstd", "zlib" or "none");
+    # values smaller than compression_min_bytes are stored as they are
+    call_compression: str = Field(default="zstd")
+    compression_min_bytes: int = Field(default=1024)
+    
+    # Structured extraction pipeline (worker processes for CPU stages, default per-stage timeout)
+    extraction_workers: int = Field(default=2)
+    extraction_stage_timeout: float = Field(default=10.0)
+    
+    # Live call event stream (per-subscriber queue bound, subscriber cap, keep-alive interval)
+    stream_queue_size: int = Field(default=100)
+    stream_max_subscribers: int = Field(default=500)
+    stream_heartbeat: float = Field(default=15.0)
     
     class Config:
         env_file = ".env"
@@ -31,5 +79,33 @@ settings = Settings(
     retell_api_key=os.getenv("RETELL_API_KEY", "key_7a79962d3b29d3a33bf65ad316ec"),
     retell_webhook_url=os.getenv("RETELL_WEBHOOK_URL", ""),
     debug=os.getenv("DEBUG", "False").lower() == "true",
-    database_url=os.getenv("DATABASE_URL", "")
+    retell_call_rate=float(os.getenv("RETELL_CALL_RATE", "5")),
+    retell_call_burst=int(os.getenv("RETELL_CALL_BURST", "10")),
+    retell_agent_rate=float(os.getenv("RETELL_AGENT_RATE", "2")),
+    retell_agent_burst=int(os.getenv("RETELL_AGENT_BURST", "5")),
+    retell_read_rate=float(os.getenv("RETELL_READ_RATE", "10")),
+    retell_read_burst=int(os.getenv("RETELL_READ_BURST", "20")),
+    retell_rate_limit_max_wait=float(os.getenv("RETELL_RATE_LIMIT_MAX_WAIT", "30")),
+    database_url=os.getenv("DATABASE_URL", ""),
+    db_pool_size=int(os.getenv("DB_POOL_SIZE", "16")),
+    agent_config_cache_size=int(os.getenv("AGENT_CONFIG_CACHE_SIZE", "256")),
+    agent_config_cache_ttl=float(os.getenv("AGENT_CONFIG_CACHE_TTL", "300")),
+    agent_catalog_ttl=float(os.getenv("AGENT_CATALOG_TTL", "60")),
+    agent_catalog_max_stale=float(os.getenv("AGENT_CATALOG_MAX_STALE", "3600")),
+    webhook_ingest_mode=os.getenv("WEBHOOK_INGEST_MODE", "queue").lower(),
+    webhook_partitions=int(os.getenv("WEBHOOK_PARTITIONS", os.getenv("WEBHOOK_WORKERS", "8"))),
+    webhook_queue_size=int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000")),
+    webhook_drain_timeout=float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30")),
+    webhook_dedup_size=int(os.getenv("WEBHOOK_DEDUP_SIZE", "50000")),
+    webhook_dedup_ttl=float(os.getenv("WEBHOOK_DEDUP_TTL", "3600")),
+    idempotency_cache_size=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")),
+    idempotency_ttl=float(os.getenv("IDEMPOTENCY_TTL", "86400")),
+    call_write_coalesce_window_ms=int(os.getenv("CALL_WRITE_COALESCE_WINDOW_MS", "50")),
+    call_compression=os.getenv("CALL_COMPRESSION", "zstd").lower(),
+    compression_min_bytes=int(os.getenv("COMPRESSION_MIN_BYTES", "1024")),
+    extraction_workers=int(os.getenv("EXTRACTION_WORKERS", "2")),
+    extraction_stage_timeout=float(os.getenv("EXTRACTION_STAGE_TIMEOUT", "10")),
+    stream_queue_size=int(os.getenv("STREAM_QUEUE_SIZE", "100")),
+    stream_max_subscribers=int(os.getenv("STREAM_MAX_SUBSCRIBERS", "500")),
+    stream_heartbeat=float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
 )
@@ -0,0 +1,50 @@
+import hashlib
+import json
+from typing import Any, Dict, Hashable
+from app.core.cache import TTLCache
+
+def webhook_fingerprint(event: Dict[str, Any]) -> str:
+    """
+    Identify a webhook delivery by call_id + event type + timestamp, falling back to a
+    hash of the whole payload when the event carries no timestamp. Redelivered
+    copies of an event get the same fingerprint.
+    """
+    call_id = event.get("call_id")
+    event_type = event.get("event_type") or event.get("event") or event.get("call_status")
+    timestamp = event.get("timestamp")
+    if timestamp is None:
+        encoded = json.dumps(event, sort_keys=True, default=str, separators=(",", ":"))
+        timestamp = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    return f"{call_id}:{event_type}:{timestamp}"
+
+class EventDeduplicator:
+    """
+    Bounded TTL set of recently seen event fingerprints. check_and_mark() is
+    synchronous, so on the event loop it is atomic with respect to other requests.
+    """
+    
+    def __init__(self, maxsize: int = 50000, ttl: float = 3600.0):
+        self._seen = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.checked = 0
+        self.suppressed = 0
+    
+    def check_and_mark(self, fingerprint: Hashable) -> bool:
+        """Return True if the event was already seen, otherwise remember it and return False"""
+        self.checked += 1
+        if self._seen.get(fingerprint) is not None:
+            self.suppressed += 1
+            return True
+        self._seen.set(fingerprint, True)
+        return False
+    
+    def forget(self, fingerprint: Hashable) -> None:
+        """Drop a fingerprint so a redelivery is processed again (e.g. after a failure)"""
+        self._seen.pop(fingerprint)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Dedup counters for monitoring"""
+        return {
+            "tracked": len(self._seen),
+            "checked": self.checked,
+            "suppressed": self.suppressed
+        }
@@ -0,0 +1,71 @@
+from typing import Iterable, Optional, Sequence
+
+# Columns that may be requested through a `fields=` query parameter, and the
+# lean projections list views use when no fields are requested. Full rows
+# (including transcripts, summaries and conversation flows) are only returned
+# by detail endpoints or when a client explicitly asks for `fields=*`.
+
+CALL_RECORD_COLUMNS = (
+    "id", "call_id", "agent_config_id", "driver_name", "phone_number", "load_number",
+    "delivery_address", "expected_delivery_time", "special_instructions", "status",
+    "retell_call_id", "from_number", "start_time", "end_time", "duration_seconds",
+    "call_summary", "created_at", "updated_at",
+)
+CALL_RECORD_LIST_FIELDS = (
+    "id", "call_id", "agent_config_id", "driver_name", "phone_number", "load_number",
+    "status", "retell_call_id", "start_time", "end_time", "duration_seconds",
+    "created_at", "updated_at",
+)
+
+AGENT_CONFIGURATION_COLUMNS = (
+    "id", "agent_name", "greeting", "primary_objective", "conversation_flow",
+    "fallback_responses", "call_ending_conditions", "is_active", "retell_agent_id",
+    "created_at", "updated_at",
+)
+AGENT_CONFIGURATION_LIST_FIELDS = (
+    "id", "agent_name", "primary_objective", "is_active", "retell_agent_id",
+    "created_at", "updated_at",
+)
+
+CALL_RESULT_COLUMNS = (
+    "id", "call_id", "driver_name", "phone_number", "load_number", "status",
+    "duration_seconds", "transcript", "structured_summary", "call_summary",
+    "agent_config_id", "created_at", "updated_at",
+)
+CALL_RESULT_LIST_FIELDS = (
+    "id", "call_id", "driver_name", "phone_number", "load_number", "status",
+    "duration_seconds", "agent_config_id", "created_at", "updated_at",
+)
+
+# Keyset pagination needs these to build the next cursor
+PAGINATION_FIELDS = ("id", "created_at")
+
+def build_select(
+    fields: Optional[str],
+    allowed: Sequence[str],
+    default: Sequence[str],
+    required: Iterable[str] = PAGINATION_FIELDS,
+) -> str:
+    """
+    Turn a comma-separated `fields` parameter into a PostgREST `select` projection.
+    Falls back to `default` when no fields are given, and `*` selects every column.
+    Raises ValueError for unknown column names.
+    """
+    if fields is None or not fields.strip():
+        columns = list(default)
+    elif fields.strip() == "*":
+        return "*"
+    else:
+        columns = []
+        for name in (part.strip() for part in fields.split(",")):
+            if not name:
+                continue
+            if name not in allowed:
+                raise ValueError(f"Unknown field '{name}'. Allowed fields: {', '.join(allowed)}")
+            if name not in columns:
+                columns.append(name)
+    
+    for name in required:
+        if name not in columns:
+            columns.append(name)
+    return ",".join(columns)
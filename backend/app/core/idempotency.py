@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import HTTPException, Response, status
+from app.core.cache import TTLCache
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+class IdempotencyConflict(Exception):
+    """Raised when an idempotency key is reused for a different request"""
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a request body, used to detect a key reused for another request"""
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class IdempotencyStore:
+    """
+    Bounded TTL store of idempotency key -> successful result. A replayed key
+    returns the stored result without running the operation again, and a
+    duplicate that arrives while the original is still running waits for it.
+    Failed operations are not stored, so the client can retry them.
+    """
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400.0):
+        self._results = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[Hashable, Tuple[str, asyncio.Future]] = {}
+        self.executions = 0
+        self.replays = 0
+        self.waits = 0
+        self.conflicts = 0
+    
+    def _check(self, stored_fingerprint: str, fingerprint: str) -> None:
+        if stored_fingerprint != fingerprint:
+            self.conflicts += 1
+            raise IdempotencyConflict("Idempotency key was already used for a different request")
+    
+    async def run(self, key: Hashable, fingerprint: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return (result, replayed), running fn() only for the first request with this key"""
+        stored = self._results.get(key)
+        if stored is not None:
+            self._check(stored[0], fingerprint)
+            self.replays += 1
+            return stored[1], True
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._check(inflight[0], fingerprint)
+            self.waits += 1
+            return await asyncio.shield(inflight[1]), True
+        
+        # The operation runs as its own task so a client disconnecting midway
+        # doesn't abandon a half-finished call or agent creation
+        self.executions += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = (fingerprint, future)
+        future.add_done_callback(lambda f: self._complete(key, fingerprint, f))
+        return await asyncio.shield(future), False
+    
+    def _complete(self, key: Hashable, fingerprint: str, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._results.set(key, (fingerprint, future.result()))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Replay counters for monitoring"""
+        return {
+            "stored": len(self._results),
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "replays": self.replays,
+            "waits": self.waits,
+            "conflicts": self.conflicts
+        }
+
+async def run_idempotent(
+    store: IdempotencyStore,
+    scope: str,
+    idempotency_key: Optional[str],
+    payload: Any,
+    response: Response,
+    fn: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Run an endpoint body under an optional Idempotency-Key header. Replayed
+    responses carry an Idempotent-Replayed: true header; reusing a key with a
+    different body is rejected with 422.
+    """
+    if not idempotency_key:
+        return await fn()
+    
+    try:
+        result, replayed = await store.run((scope, idempotency_key), request_fingerprint(payload), fn)
+    except IdempotencyConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    if replayed:
+        response.headers[REPLAYED_HEADER] = "true"
+    return result
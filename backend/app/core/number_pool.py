@@ -0,0 +1,171 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+def parse_from_numbers(spec: Optional[str], default_limit: int = 5) -> Dict[str, int]:
+    """
+    Parse "number[:max_concurrent],..." (e.g. "+15550001111:5,+15550002222")
+    into a number -> concurrency limit mapping.
+    """
+    numbers: Dict[str, int] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        number, _, limit = item.partition(":")
+        numbers[number.strip()] = int(limit) if limit.strip() else default_limit
+    return numbers
+
+class FromNumberPool:
+    """
+    Pool of verified caller-ID numbers for outbound calls. Each number carries at
+    most its own limit of concurrent calls and new calls go to the least-loaded
+    number. A number that hits a carrier error cools down for `cooldown` seconds.
+    Holds are released when the call ends, or expire after `max_hold` seconds in
+    case the final webhook never arrives.
+    
+    With several server processes the final webhook of a call often reaches a
+    process other than the one holding its number. `finished_calls` lets the pool
+    ask the database which of its held calls have already finished (at most every
+    `reconcile_interval` seconds while it waits for capacity) and release those.
+    Concurrency limits still apply per process.
+    """
+    
+    def __init__(
+        self,
+        numbers: Dict[str, int],
+        cooldown: float = 300.0,
+        max_hold: float = 3600.0,
+        finished_calls: Optional[Callable[[List[Hashable]], Awaitable[Iterable[Hashable]]]] = None,
+        reconcile_interval: float = 5.0
+    ):
+        self.limits = dict(numbers)
+        self.cooldown = cooldown
+        self.max_hold = max_hold
+        self.finished_calls = finished_calls
+        self.reconcile_interval = reconcile_interval
+        self._last_reconcile = 0.0
+        self._active: Dict[str, int] = {number: 0 for number in numbers}
+        self._cooling_until: Dict[str, float] = {}
+        self._last_used: Dict[str, float] = {number: 0.0 for number in numbers}
+        self._holds: Dict[Hashable, Tuple[str, float]] = {}
+        self._calls: Dict[str, int] = {number: 0 for number in numbers}
+        self._errors: Dict[str, int] = {number: 0 for number in numbers}
+        self._available = asyncio.Condition()
+        self.waits = 0
+        self.exhausted = 0
+        self.reconciled = 0
+    
+    def __len__(self) -> int:
+        return len(self.limits)
+    
+    def _expire_holds(self, now: float) -> None:
+        for key, (number, acquired_at) in list(self._holds.items()):
+            if now - acquired_at > self.max_hold:
+                self._release(key)
+    
+    def _reconcile_due(self, now: float) -> bool:
+        return self.finished_calls is not None and bool(self._holds) and now - self._last_reconcile >= self.reconcile_interval
+    
+    async def _reconcile_holds(self, keys: List[Hashable]) -> None:
+        """
+        Release holds of calls the database already records as finished. Called
+        without the lock so releases and other acquires aren't stuck behind the query.
+        """
+        try:
+            finished = await self.finished_calls(keys)
+        except Exception:
+            # Holds still expire after max_hold
+            return
+        async with self._available:
+            released = [key for key in finished if self._release(key)]
+            if released:
+                self.reconciled += len(released)
+                self._available.notify_all()
+    
+    def _pick(self, now: float) -> Optional[str]:
+        candidates = [
+            number for number, limit in self.limits.items()
+            if self._active[number] < limit and self._cooling_until.get(number, 0.0) <= now
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda n: (self._active[n] / self.limits[n], self._last_used[n]))
+    
+    async def acquire(self, key: Hashable, timeout: float = 30.0) -> Optional[str]:
+        """
+        Reserve the least-loaded available number for the call identified by key,
+        waiting up to timeout seconds for capacity. Returns None if none frees up.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            reconcile_keys = None
+            async with self._available:
+                now = time.monotonic()
+                self._expire_holds(now)
+                number = self._pick(now)
+                if number:
+                    self._active[number] += 1
+                    self._last_used[number] = now
+                    self._calls[number] += 1
+                    self._holds[key] = (number, now)
+                    return number
+                
+                if self._reconcile_due(now):
+                    self._last_reconcile = now
+                    reconcile_keys = list(self._holds)
+                else:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.exhausted += 1
+                        return None
+                    # Wake up on a release, when the next cooldown ends or when holds can be
+                    # reconciled again, whichever is first
+                    wakeups = [until - now for until in self._cooling_until.values() if until > now]
+                    if self.finished_calls is not None:
+                        wakeups.append(self.reconcile_interval)
+                    self.waits += 1
+                    try:
+                        await asyncio.wait_for(self._available.wait(), timeout=min([remaining, *wakeups]))
+                    except asyncio.TimeoutError:
+                        pass
+            
+            if reconcile_keys:
+                await self._reconcile_holds(reconcile_keys)
+    
+    def _release(self, key: Hashable) -> Optional[str]:
+        hold = self._holds.pop(key, None)
+        if hold is None:
+            return None
+        number = hold[0]
+        self._active[number] = max(self._active[number] - 1, 0)
+        return number
+    
+    async def release(self, key: Hashable, carrier_error: bool = False) -> Optional[str]:
+        """Free the number held by a call; a carrier error also puts it into cooldown"""
+        async with self._available:
+            number = self._release(key)
+            if number and carrier_error:
+                self._errors[number] += 1
+                self._cooling_until[number] = time.monotonic() + self.cooldown
+            self._available.notify_all()
+            return number
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-number load and error counters for monitoring"""
+        now = time.monotonic()
+        return {
+            "waits": self.waits,
+            "exhausted": self.exhausted,
+            "reconciled": self.reconciled,
+            "numbers": {
+                number: {
+                    "active": self._active[number],
+                    "limit": limit,
+                    "calls": self._calls[number],
+                    "carrier_errors": self._errors[number],
+                    "cooldown_seconds": round(max(self._cooling_until.get(number, 0.0) - now, 0.0), 1)
+                }
+                for number, limit in self.limits.items()
+            }
+        }
@@ -0,0 +1,39 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Keyset pages are ordered newest first with id as the tiebreaker, so
+# (created_at, id) identifies a unique position in the listing
+KEYSET_ORDER = "created_at.desc,id.desc"
+
+def encode_cursor(created_at: Union[str, datetime], row_id: int) -> str:
+    """Build an opaque cursor pointing just past the given row"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps({"created_at": created_at, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor into its (created_at, id) position, raising ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = payload["created_at"]
+        row_id = int(payload["id"])
+        datetime.fromisoformat(created_at)
+        return created_at, row_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def keyset_filter(cursor: str) -> str:
+    """PostgREST `or` filter selecting rows that sort after the cursor position"""
+    created_at, row_id = decode_cursor(cursor)
+    return f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+
+def next_cursor(rows: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last["created_at"], last["id"])
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+def partition_for(key: Hashable, partitions: int) -> int:
+    """Stable partition index for a key (the same across processes and restarts)"""
+    return zlib.crc32(str(key).encode("utf-8")) % partitions
+
+class PartitionedProcessor:
+    """
+    Bounded in-process queue split into partitions, each drained by exactly one
+    worker task. Items are routed by a stable hash of their key, so items with
+    the same key (e.g. events of one call) are handled one at a time in arrival
+    order, while different partitions are handled in parallel. Call start() on
+    startup, enqueue() to submit items and stop() to drain on shutdown.
+    """
+    
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[Any]],
+        key: Callable[[Any], Hashable],
+        partitions: int = 8,
+        maxsize: int = 1000,
+        name: str = "partitioned-processor"
+    ):
+        self.handler = handler
+        self.key = key
+        self.partitions = max(partitions, 1)
+        self.maxsize = maxsize
+        self.name = name
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._accepting = False
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+    
+    async def start(self) -> None:
+        """Create one queue and one worker task per partition"""
+        if self._tasks:
+            return
+        per_partition = max(self.maxsize // self.partitions, 1)
+        self._queues = [asyncio.Queue(maxsize=per_partition) for _ in range(self.partitions)]
+        self._tasks = [
+            asyncio.create_task(self._worker(queue), name=f"{self.name}-{index}")
+            for index, queue in enumerate(self._queues)
+        ]
+        self._accepting = True
+        logger.info(f"Started {self.name} with {self.partitions} partitions")
+    
+    def enqueue(self, item: Any) -> bool:
+        """Queue an item on its key's partition; returns False if that partition is full or stopped"""
+        if not self._accepting or not self._queues:
+            self.rejected += 1
+            return False
+        queue = self._queues[partition_for(self.key(item), self.partitions)]
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"{self.name} partition is full ({queue.maxsize} items), rejecting item")
+            return False
+        self.enqueued += 1
+        return True
+    
+    @property
+    def depth(self) -> int:
+        """Number of items waiting across all partitions"""
+        return sum(queue.qsize() for queue in self._queues)
+    
+    @property
+    def running(self) -> bool:
+        return self._accepting
+    
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop accepting items, drain every partition, then stop the workers"""
+        if not self._tasks:
+            return
+        self._accepting = False
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.name} drain timed out with {self.depth} items left")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"Stopped {self.name}")
+    
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"{self.name} failed to process item: {e}")
+            finally:
+                queue.task_done()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput counters for monitoring"""
+        return {
+            "running": self.running,
+            "depth": self.depth,
+            "partition_depths": [queue.qsize() for queue in self._queues],
+            "maxsize": self.maxsize,
+            "partitions": self.partitions,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
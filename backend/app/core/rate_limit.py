@@ -0,0 +1,115 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Endpoint class -> (requests per second, burst size)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "call": (5.0, 10),
+    "agent": (2.0, 5),
+    "read": (10.0, 20)
+}
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than the limiter allows"""
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second up to `burst`.
+    Waiters are served in arrival order; a 429 from upstream empties the
+    bucket and blocks it until the server's Retry-After has passed.
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+    
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self, max_wait: float) -> float:
+        """Take one token, waiting at most max_wait seconds; returns the time waited"""
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.acquired += 1
+                        self.wait_seconds += now - start
+                        return now - start
+                    wait = (1 - self._tokens) / self.rate
+                if now + wait - start > max_wait:
+                    self.rejected += 1
+                    raise RateLimitExceeded(f"Rate limit wait of {wait:.2f}s exceeds {max_wait:.2f}s")
+                await asyncio.sleep(wait)
+    
+    def penalize(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds` after the upstream rejected a request"""
+        now = time.monotonic()
+        self.throttled += 1
+        self._tokens = 0.0
+        self._updated = now
+        self._blocked_until = max(self._blocked_until, now + seconds)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens": round(min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate), 2),
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "avg_wait_ms": round(self.wait_seconds / self.acquired * 1000, 1) if self.acquired else 0.0
+        }
+
+class RateLimiter:
+    """One token bucket per endpoint class"""
+    
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None, max_wait: float = 30.0):
+        self.max_wait = max_wait
+        self.buckets = {
+            endpoint_class: TokenBucket(rate, burst)
+            for endpoint_class, (rate, burst) in (limits or DEFAULT_RATE_LIMITS).items()
+        }
+    
+    def _bucket(self, endpoint_class: str) -> TokenBucket:
+        try:
+            return self.buckets[endpoint_class]
+        except KeyError:
+            raise ValueError(f"Unknown endpoint class: {endpoint_class}")
+    
+    async def acquire(self, endpoint_class: str, max_wait: Optional[float] = None) -> float:
+        """Wait for a token in the endpoint class's bucket"""
+        return await self._bucket(endpoint_class).acquire(self.max_wait if max_wait is None else max_wait)
+    
+    def penalize(self, endpoint_class: str, seconds: float) -> None:
+        self._bucket(endpoint_class).penalize(seconds)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {endpoint_class: bucket.stats() for endpoint_class, bucket in self.buckets.items()}
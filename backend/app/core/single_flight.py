@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+def request_key(method: str, path: str, params: Optional[Mapping[str, Any]] = None) -> Tuple:
+    """Hashable key for an outbound request; params are order-insensitive"""
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return (method.upper(), path, items)
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while one call for a key is in flight,
+    later callers with the same key await its result instead of starting their own.
+    The upstream call runs as its own task, so a caller being cancelled does not
+    cancel it for the others. Nothing is cached once the call completes.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn() for key, or join the call already in flight for it"""
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+    
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Retrieve the exception so an unawaited failure is not reported as lost
+        if not future.cancelled():
+            future.exception()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters for monitoring"""
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced
+        }
@@ -1,6 +1,11 @@
 from supabase import create_client, Client
 from app.core.config import settings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+import asyncio
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -38,3 +43,78 @@ db_manager = DatabaseManager()
 def get_db() -> Client:
     """Dependency to get database client"""
     return db_manager.get_client()
+
+class DatabaseExecutor:
+    """
+    Dedicated, bounded thread pool for the synchronous supabase-py client.
+    Queries run off the event loop so other requests keep being served
+    while one waits on Supabase.
+    """
+    
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="supabase-db")
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+    
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking database call in the pool and await its result"""
+        queued_at = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+        
+        def call() -> Any:
+            started_at = time.perf_counter()
+            with self._lock:
+                wait = started_at - queued_at
+                self.active += 1
+                self.total_wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            try:
+                result = fn(*args)
+                with self._lock:
+                    self.completed += 1
+                return result
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.total_run_seconds += time.perf_counter() - started_at
+        
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+    
+    async def shutdown(self) -> None:
+        """Wait for queued queries to finish without blocking the event loop"""
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation and latency counters for monitoring"""
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "active": self.active,
+                "queued": self.submitted - finished - self.active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(self.total_wait_seconds / finished * 1000, 2) if finished else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+                "avg_run_ms": round(self.total_run_seconds / finished * 1000, 2) if finished else 0.0
+            }
+
+# Global thread pool for database calls
+db_executor = DatabaseExecutor(max_workers=settings.db_pool_size)
+
+async def run_db(fn: Callable[..., Any], *args: Any) -> Any:
+    """Await a blocking supabase-py call (e.g. `query.execute`) without blocking the event loop"""
+    return await db_executor.run(fn, *args)
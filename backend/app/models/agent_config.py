@@ -27,6 +27,8 @@ class AgentConfiguration(BaseModel):
     conversation_flow: List[ConversationStep] = Field(..., min_items=1)
     fallback_responses: List[str] = Field(default_factory=list)
     call_ending_conditions: List[str] = Field(default_factory=list)
+    # Extraction pipeline stages to run on this agent's calls (None = the default stages)
+    extraction_stages: Optional[List[str]] = None
     is_active: bool = True
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
@@ -61,4 +63,5 @@ class AgentConfigurationUpdate(BaseModel):
     conversation_flow: Optional[List[ConversationStep]] = None
     fallback_responses: Optional[List[str]] = None
     call_ending_conditions: Optional[List[str]] = None
+    extraction_stages: Optional[List[str]] = None
     is_active: Optional[bool] = None
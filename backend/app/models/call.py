@@ -10,6 +10,9 @@ class CallStatus(str, Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+# Statuses after which a call receives no further progress updates
+FINAL_CALL_STATUSES = [CallStatus.COMPLETED.value, CallStatus.FAILED.value, CallStatus.CANCELLED.value]
+
 class CallTrigger(BaseModel):
     driver_name: str = Field(..., min_length=1, max_length=100)
     phone_number: str = Field(..., min_length=10, max_length=15)
@@ -34,8 +37,10 @@ class CallResult(BaseModel):
     load_number: str = Field(..., min_length=1, max_length=50)
     status: CallStatus = CallStatus.COMPLETED
     duration_seconds: Optional[int] = None
-    transcript: str = Field(..., min_length=1)
+    # Empty until the first utterance of a live call is stored
+    transcript: Optional[str] = None
     structured_summary: Dict[str, Any] = Field(default_factory=dict)
+    call_summary: Optional[str] = None
     agent_config_id: int = Field(..., gt=0)
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
@@ -60,8 +65,37 @@ class CallResult(BaseModel):
             }
         }
 
+class CallResultSummary(BaseModel):
+    """Projection of a call result used by list views; only the selected columns are set"""
+    id: Optional[int] = None
+    call_id: Optional[str] = None
+    driver_name: Optional[str] = None
+    phone_number: Optional[str] = None
+    load_number: Optional[str] = None
+    status: Optional[CallStatus] = None
+    duration_seconds: Optional[int] = None
+    transcript: Optional[str] = None
+    structured_summary: Optional[Dict[str, Any]] = None
+    call_summary: Optional[str] = None
+    agent_config_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class CallSearchHit(BaseModel):
+    """One full-text search match, ranked by relevance, with a highlighted snippet"""
+    call_id: str
+    driver_name: str
+    phone_number: str
+    load_number: str
+    status: Optional[CallStatus] = None
+    agent_config_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    rank: float
+    snippet: Optional[str] = None
+
 class CallResultUpdate(BaseModel):
     status: Optional[CallStatus] = None
     duration_seconds: Optional[int] = None
     transcript: Optional[str] = None
     structured_summary: Optional[Dict[str, Any]] = None
+    call_summary: Optional[str] = None
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from app.services.retell_service import RetellService
 from app.services.agent_config_service import AgentConfigurationService
+from app.services.agent_catalog import AgentCatalog
+from app.core.config import settings
+from app.core.idempotency import IdempotencyStore, run_idempotent, IDEMPOTENCY_HEADER
 from app.models.agent_config import AgentConfiguration, ConversationStep
 import logging
 
@@ -13,6 +16,26 @@ router = APIRouter()
 retell_service = RetellService()
 agent_config_service = AgentConfigurationService()
 
+async def _fetch_agents() -> List[Dict[str, Any]]:
+    agents_data = await retell_service.get_all_agents()
+    if agents_data is None:
+        raise RuntimeError("Failed to retrieve agents from Retell AI")
+    if isinstance(agents_data, list):
+        return agents_data
+    return agents_data.get('data', [])
+
+# Replays agent creations retried with the same Idempotency-Key
+idempotency_store = IdempotencyStore(
+    maxsize=settings.idempotency_cache_size,
+    ttl=settings.idempotency_ttl
+)
+
+agent_catalog = AgentCatalog(
+    _fetch_agents,
+    ttl=settings.agent_catalog_ttl,
+    max_stale=settings.agent_catalog_max_stale
+)
+
 # Pydantic models
 class AgentCreationRequest(BaseModel):
     agent_name: str
@@ -30,15 +53,13 @@ class AgentCreationRequest(BaseModel):
 async def get_all_agents():
     """Get all agents from Retell AI"""
     try:
-        agents_data = await retell_service.get_all_agents()
-        if agents_data is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to retrieve agents from Retell AI"
-            )
-        return agents_data
-    except HTTPException:
-        raise
+        agents = await agent_catalog.get_all()
+        return {"data": agents}
+    except RuntimeError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve agents from Retell AI"
+        )
     except Exception as e:
         logger.error(f"Error getting agents: {e}")
         raise HTTPException(
@@ -50,18 +71,7 @@ async def get_all_agents():
 async def get_agent_by_id(agent_id: str):
     """Get a specific agent by ID from Retell AI"""
     try:
-        # For now, we'll get all agents and filter by ID
-        # In a real implementation, you might want to add a specific endpoint for this
-        agents_data = await retell_service.get_all_agents()
-        if agents_data is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to retrieve agents from Retell AI"
-            )
-        
-        agents = agents_data.get('data', [])
-        agent = next((agent for agent in agents if agent.get('agent_id') == agent_id), None)
-        
+        agent = await agent_catalog.get(agent_id)
         if not agent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -71,6 +81,11 @@ async def get_agent_by_id(agent_id: str):
         return agent
     except HTTPException:
         raise
+    except RuntimeError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve agents from Retell AI"
+        )
     except Exception as e:
         logger.error(f"Error getting agent {agent_id}: {e}")
         raise HTTPException(
@@ -79,8 +94,18 @@ async def get_agent_by_id(agent_id: str):
         )
 
 @router.post("/agents/create", response_model=Dict[str, Any])
-async def create_agent(agent_request: AgentCreationRequest):
-    """Create a new agent in both Supabase and Retell AI"""
+async def create_agent(
+    agent_request: AgentCreationRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    """Create a new agent in both Supabase and Retell AI; retries with the same Idempotency-Key replay the first response"""
+    return await run_idempotent(
+        idempotency_store, "agents/create", idempotency_key, agent_request.dict(), response,
+        lambda: _create_agent(agent_request)
+    )
+
+async def _create_agent(agent_request: AgentCreationRequest) -> Dict[str, Any]:
     try:
         # First, save the configuration to Supabase
         # Convert conversation flow to ConversationStep objects
@@ -129,6 +154,8 @@ async def create_agent(agent_request: AgentCreationRequest):
                 detail="Failed to create agent in Retell AI. Configuration saved to database."
             )
         
+        agent_catalog.invalidate()
+        
         # Update the Supabase config with the Retell agent ID
         await agent_config_service.update_configuration(
             saved_config.id, 
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-from app.models.call import CallTrigger, CallResult
+from app.models.call import CallTrigger, CallResult, CallResultSummary, CallSearchHit
 from app.services.call_service import CallService
 from app.services.retell_service import RetellService
+from app.services.call_events import call_event_hub
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.fields import build_select, CALL_RESULT_COLUMNS, CALL_RESULT_LIST_FIELDS
+from app.core.idempotency import IdempotencyStore, run_idempotent, IDEMPOTENCY_HEADER
+from app.core.config import settings
+from app.core.broadcast import TooManySubscribers
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,13 +20,58 @@ router = APIRouter()
 call_service = CallService()
 retell_service = RetellService()
 
+# Replays call triggers retried with the same Idempotency-Key
+idempotency_store = IdempotencyStore(
+    maxsize=settings.idempotency_cache_size,
+    ttl=settings.idempotency_ttl
+)
+
+# Largest page of search hits returned at once
+MAX_SEARCH_LIMIT = 100
+
 # Pydantic models
 class WebCallRequest(BaseModel):
     agent_id: str
 
+def _validate_cursor(cursor: Optional[str]) -> None:
+    """Reject malformed pagination cursors before querying the database"""
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+
+def _select_fields(fields: Optional[str]) -> str:
+    """Translate a `fields=` query parameter into a column projection for list views"""
+    try:
+        return build_select(fields, CALL_RESULT_COLUMNS, CALL_RESULT_LIST_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+def _set_next_cursor(response: Response, calls: List[CallResultSummary], limit: int) -> None:
+    """Expose the cursor of the following page in the X-Next-Cursor header"""
+    if calls and len(calls) >= limit and calls[-1].created_at and calls[-1].id is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(calls[-1].created_at, calls[-1].id)
+
 @router.post("/calls/trigger", status_code=status.HTTP_201_CREATED)
-async def trigger_call(call_trigger: CallTrigger):
-    """Trigger a new voice call"""
+async def trigger_call(
+    call_trigger: CallTrigger,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    """Trigger a new voice call; retries with the same Idempotency-Key replay the first response"""
+    return await run_idempotent(
+        idempotency_store, "calls/trigger", idempotency_key, call_trigger.dict(), response,
+        lambda: _trigger_call(call_trigger)
+    )
+
+async def _trigger_call(call_trigger: CallTrigger) -> Dict[str, Any]:
     try:
         # First, create a call record in our database
         call_id = await call_service.create_call_from_trigger(call_trigger)
@@ -58,11 +110,14 @@ async def trigger_call(call_trigger: CallTrigger):
             detail="Internal server error"
         )
 
-@router.get("/calls", response_model=List[CallResult])
-async def get_all_call_results(limit: int = 100):
-    """Get all call results with pagination"""
+@router.get("/calls", response_model=List[CallResultSummary], response_model_exclude_unset=True)
+async def get_all_call_results(response: Response, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None):
+    """Get all call results with keyset pagination (next page cursor in X-Next-Cursor)"""
+    _validate_cursor(cursor)
+    select = _select_fields(fields)
     try:
-        calls = await call_service.get_all_call_results(limit)
+        calls = await call_service.get_all_call_results(limit, cursor, select)
+        _set_next_cursor(response, calls, limit)
         return calls
     except Exception as e:
         logger.error(f"Error getting all call results: {e}")
@@ -71,6 +126,50 @@ async def get_all_call_results(limit: int = 100):
             detail="Internal server error"
         )
 
+# Declared before /calls/{call_id} so "search" is not taken for a call ID
+@router.get("/calls/search", response_model=List[CallSearchHit])
+async def search_call_results(response: Response, q: str, limit: int = 20, offset: int = 0):
+    """Ranked full-text search over transcripts and call summaries (next page offset in X-Next-Offset)"""
+    query = q.strip()
+    if not query:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must not be empty"
+        )
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    offset = max(offset, 0)
+    
+    try:
+        hits = await call_service.search_call_results(query, limit, offset)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search call results: {str(e)}"
+        )
+    if len(hits) >= limit:
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    return hits
+
+# Also declared before /calls/{call_id}
+@router.get("/calls/stream")
+async def stream_call_events(request: Request, call_id: Optional[str] = None, agent_config_id: Optional[int] = None):
+    """
+    Server-Sent Events stream of live call updates (call_started, transcript_updated,
+    call_ended, structured_summary), optionally limited to one call or agent
+    """
+    try:
+        subscription = call_event_hub.subscribe(call_id=call_id, agent_config_id=agent_config_id)
+    except TooManySubscribers as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        call_event_hub.stream(subscription, settings.stream_heartbeat, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/calls/{call_id}", response_model=CallResult)
 async def get_call_result(call_id: str):
     """Get a specific call result by call ID"""
@@ -91,11 +190,14 @@ async def get_call_result(call_id: str):
             detail="Internal server error"
         )
 
-@router.get("/calls/agent/{agent_config_id}", response_model=List[CallResult])
-async def get_call_results_by_agent(agent_config_id: int, limit: int = 100):
+@router.get("/calls/agent/{agent_config_id}", response_model=List[CallResultSummary], response_model_exclude_unset=True)
+async def get_call_results_by_agent(response: Response, agent_config_id: int, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get call results for a specific agent configuration"""
+    _validate_cursor(cursor)
+    select = _select_fields(fields)
     try:
-        calls = await call_service.get_call_results_by_agent(agent_config_id, limit)
+        calls = await call_service.get_call_results_by_agent(agent_config_id, limit, cursor, select)
+        _set_next_cursor(response, calls, limit)
         return calls
     except Exception as e:
         logger.error(f"Error getting call results for agent {agent_config_id}: {e}")
@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+from app.services.agent_config_service import AgentConfigurationService
+from app.services.call_service import CallService
+from app.routers.webhooks import webhook_queue, webhook_dedup
+from app.routers import agents, call_management
+from app.database.connection import db_executor
+from app.services.retell_service import retell_client
+from app.services.extraction_pipeline import extraction_pipeline
+from app.services.call_events import call_event_hub
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Initialize services
+agent_config_service = AgentConfigurationService()
+call_service = CallService()
+
+@router.get("/metrics", response_model=Dict[str, Any])
+async def get_metrics():
+    """In-process cache and queue counters for monitoring"""
+    return {
+        "agent_config_cache": agent_config_service.cache_stats(),
+        "agent_catalog": agents.agent_catalog.stats(),
+        "webhook_queue": webhook_queue.stats(),
+        "webhook_dedup": webhook_dedup.stats(),
+        "extraction_pipeline": extraction_pipeline.stats(),
+        "call_events": call_event_hub.stats(),
+        "call_result_writes": call_service.write_stats(),
+        "db_executor": db_executor.stats(),
+        "retell_single_flight": retell_client.single_flight.stats(),
+        "retell_rate_limits": retell_client.limiter.stats(),
+        "idempotency": {
+            "calls_trigger": call_management.idempotency_store.stats(),
+            "agents_create": agents.idempotency_store.stats()
+        }
+    }
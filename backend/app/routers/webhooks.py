@@ -1,10 +1,19 @@
 from fastapi import APIRouter, HTTPException, Request, status
 from app.services.retell_service import RetellService
 from app.services.call_service import CallService
-from app.models.call import CallStatus
+from app.services.transcript_service import TranscriptService, split_utterances
+from app.services.agent_config_service import AgentConfigurationService
+from app.services.extraction import get_extractor, load_extractor, drop_extractor
+from app.services.extraction_pipeline import extraction_pipeline, KEYWORD_STAGE
+from app.services.call_events import publish_call_event
+from app.models.call import CallStatus, CallResultUpdate
+from app.core.config import settings
+from app.core.partitioned_processor import PartitionedProcessor
+from app.core.dedup import EventDeduplicator, webhook_fingerprint
+import asyncio
 import logging
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -12,6 +21,142 @@ router = APIRouter()
 # Initialize services
 retell_service = RetellService()
 call_service = CallService()
+transcript_service = TranscriptService()
+agent_config_service = AgentConfigurationService()
+
+# Structured extraction of ended calls runs in the background so slow stages
+# never hold up the webhook partition the call shares with other calls
+_extraction_tasks: Set[asyncio.Task] = set()
+
+async def _get_extraction_stages(call_id: str) -> Optional[List[str]]:
+    """Extraction stages chosen by the call's agent configuration (None = default stages)"""
+    agent_config_id = await call_service.get_agent_config_id(call_id)
+    if agent_config_id is None:
+        return None
+    config = await agent_config_service.get_configuration(agent_config_id)
+    return config.extraction_stages if config else None
+
+async def _extract_call_summary(call_id: str, transcript: str, precomputed: Dict[str, Dict[str, Any]]) -> None:
+    try:
+        stages = await _get_extraction_stages(call_id)
+        structured_summary = await extraction_pipeline.run(transcript, stages, precomputed)
+        # The call has already finished, so this write must pass the guard that
+        # keeps late updates off finished calls, without touching its status
+        await call_service.update_call_result(
+            call_id,
+            CallResultUpdate(structured_summary=structured_summary),
+            allow_final=True
+        )
+        await publish_call_event("structured_summary", call_id, structured_summary=structured_summary)
+    except Exception as e:
+        logger.error(f"Error extracting structured data for call {call_id}: {e}")
+
+def _start_extraction(call_id: str, transcript: str, precomputed: Dict[str, Dict[str, Any]]) -> None:
+    task = asyncio.create_task(_extract_call_summary(call_id, transcript, precomputed))
+    _extraction_tasks.add(task)
+    task.add_done_callback(_extraction_tasks.discard)
+
+async def drain_extractions(timeout: float) -> None:
+    """Wait for running background extractions, e.g. on shutdown"""
+    if _extraction_tasks:
+        await asyncio.wait(set(_extraction_tasks), timeout=timeout)
+
+async def _process_webhook_event(webhook_data: Dict[str, Any]) -> None:
+    """Apply a Retell AI webhook event to the call results"""
+    # Process the webhook event
+    retell_service.process_webhook_event(webhook_data)
+    
+    # Handle specific event types
+    event_type = webhook_data.get("event_type")
+    call_id = webhook_data.get("call_id")
+    
+    if event_type == "call_started" and call_id:
+        call_service.queue_call_result_update(call_id, CallResultUpdate(status=CallStatus.IN_PROGRESS))
+        await publish_call_event("call_started", call_id, status=CallStatus.IN_PROGRESS.value)
+        logger.info(f"Updated call {call_id} status to in_progress")
+        
+    elif event_type == "call_ended" and call_id:
+        # The full transcript is written once, together with status and duration:
+        # the final one from the event if present, otherwise the stored segments
+        updates = CallResultUpdate(status=CallStatus.COMPLETED)
+        duration = webhook_data.get("duration_seconds")
+        if duration:
+            updates.duration_seconds = duration
+        if webhook_data.get("call_summary"):
+            updates.call_summary = webhook_data["call_summary"]
+        transcript = webhook_data.get("transcript")
+        extractor = get_extractor(call_id)
+        if transcript:
+            segments = await transcript_service.append(call_id, transcript, final=True)
+            if extractor:
+                extractor.feed_segments(segments)
+        else:
+            transcript = await transcript_service.materialize(call_id)
+        if transcript:
+            updates.transcript = transcript
+        await call_service.update_call_result(call_id, updates)
+        drop_extractor(call_id)
+        await publish_call_event(
+            "call_ended",
+            call_id,
+            status=CallStatus.COMPLETED.value,
+            duration_seconds=updates.duration_seconds,
+            call_summary=updates.call_summary
+        )
+        
+        if transcript:
+            # Reuse the incremental keyword extraction when it saw every utterance
+            precomputed = {}
+            if extractor and extractor.covers(len(split_utterances(transcript))):
+                precomputed[KEYWORD_STAGE] = extractor.structured_data()
+            _start_extraction(call_id, transcript, precomputed)
+        
+        logger.info(f"Updated call {call_id} status to completed")
+        
+    elif event_type == "transcript_updated" and call_id:
+        transcript = webhook_data.get("transcript", "")
+        if transcript:
+            # Only the utterances added since the previous event are written and scanned
+            segments = await transcript_service.append(call_id, transcript)
+            logger.info(f"Appended {len(segments)} transcript segments for call {call_id}")
+            if segments:
+                await publish_call_event(
+                    "transcript_updated",
+                    call_id,
+                    segments=[{"seq": segment["seq"], "content": segment["content"]} for segment in segments]
+                )
+                extractor = await load_extractor(call_id, transcript_service.get_segments, segments[0]["seq"])
+                previous = extractor.structured_data()
+                structured_summary = extractor.feed_segments(segments)
+                if structured_summary != previous:
+                    # Not awaited: summaries of consecutive transcript events merge into one write
+                    call_service.queue_call_result_update(
+                        call_id, CallResultUpdate(structured_summary=structured_summary)
+                    )
+
+# Fingerprints of recently received webhook events; Retell redelivers on timeout
+webhook_dedup = EventDeduplicator(
+    maxsize=settings.webhook_dedup_size,
+    ttl=settings.webhook_dedup_ttl
+)
+
+async def _process_queued_webhook_event(webhook_data: Dict[str, Any]) -> None:
+    """Queue worker entry point; a failed event is forgotten so its redelivery is processed"""
+    try:
+        await _process_webhook_event(webhook_data)
+    except Exception:
+        webhook_dedup.forget(webhook_fingerprint(webhook_data))
+        raise
+
+# Events of one call always land on the same partition and are applied in
+# order; different calls are processed in parallel across partitions
+webhook_queue = PartitionedProcessor(
+    _process_queued_webhook_event,
+    key=lambda webhook_data: webhook_data.get("call_id"),
+    partitions=settings.webhook_partitions,
+    maxsize=settings.webhook_queue_size,
+    name="retell-webhook-queue"
+)
 
 @router.post("/webhooks/retell", status_code=status.HTTP_200_OK)
 async def handle_retell_webhook(request: Request):
@@ -20,42 +165,48 @@ async def handle_retell_webhook(request: Request):
         # Parse the webhook payload
         body = await request.body()
         webhook_data = json.loads(body)
+        if not isinstance(webhook_data, dict):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Webhook payload must be a JSON object"
+            )
         
-        logger.info(f"Received Retell webhook: {webhook_data.get('event_type', 'unknown')}")
-        
-        # Process the webhook event
-        result = retell_service.process_webhook_event(webhook_data)
-        
-        # Handle specific event types
         event_type = webhook_data.get("event_type")
         call_id = webhook_data.get("call_id")
-        
-        if event_type == "call_started" and call_id:
-            await call_service.update_call_status(call_id, CallStatus.IN_PROGRESS)
-            logger.info(f"Updated call {call_id} status to in_progress")
-            
-        elif event_type == "call_ended" and call_id:
-            await call_service.update_call_status(call_id, CallStatus.COMPLETED)
-            
-            # Extract duration if available
-            duration = webhook_data.get("duration_seconds")
-            if duration:
-                from app.models.call import CallResultUpdate
-                await call_service.update_call_result(call_id, CallResultUpdate(duration_seconds=duration))
-            
-            logger.info(f"Updated call {call_id} status to completed")
-            
-        elif event_type == "transcript_updated" and call_id:
-            transcript = webhook_data.get("transcript", "")
-            if transcript:
-                await call_service.add_transcript(call_id, transcript)
-                logger.info(f"Updated transcript for call {call_id}")
-                
-                # Process transcript to extract structured data
-                structured_summary = await _extract_structured_data(transcript)
-                if structured_summary:
-                    await call_service.add_structured_summary(call_id, structured_summary)
-                    logger.info(f"Added structured summary for call {call_id}")
+        logger.info(f"Received Retell webhook: {event_type or 'unknown'}")
+        
+        # Redelivered copies are acked without touching the database or re-running extraction
+        fingerprint = webhook_fingerprint(webhook_data)
+        if webhook_dedup.check_and_mark(fingerprint):
+            logger.info(f"Suppressed duplicate webhook {event_type or 'unknown'} for call {call_id}")
+            return {
+                "status": "duplicate",
+                "message": "Duplicate webhook ignored",
+                "event_type": event_type,
+                "call_id": call_id
+            }
+        
+        if settings.webhook_ingest_mode == "queue":
+            # Ack right away and let the workers do the database work
+            if not webhook_queue.enqueue(webhook_data):
+                webhook_dedup.forget(fingerprint)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Webhook queue is full",
+                    headers={"Retry-After": "5"}
+                )
+            return {
+                "status": "accepted",
+                "message": "Webhook queued for processing",
+                "event_type": event_type,
+                "call_id": call_id
+            }
+        
+        try:
+            await _process_webhook_event(webhook_data)
+        except Exception:
+            webhook_dedup.forget(fingerprint)
+            raise
         
         return {
             "status": "success",
@@ -64,6 +215,8 @@ async def handle_retell_webhook(request: Request):
             "call_id": call_id
         }
         
+    except HTTPException:
+        raise
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in webhook payload: {e}")
         raise HTTPException(
@@ -85,69 +238,3 @@ async def webhook_health_check():
         "service": "Retell AI Webhook Handler",
         "timestamp": "2024-01-01T00:00:00Z"
     }
-
-async def _extract_structured_data(transcript: str) -> Dict[str, Any]:
-    """
-    Extract structured data from call transcript.
-    This is a simplified implementation - in production, you might use:
-    - OpenAI GPT for intelligent extraction
-    - Rule-based parsing
-    - Named Entity Recognition (NER)
-    """
-    try:
-        transcript_lower = transcript.lower()
-        
-        # Extract key information based on common patterns
-        structured_data = {
-            "delivery_confirmed": False,
-            "address_verified": False,
-            "issues_identified": [],
-            "next_steps": [],
-            "driver_sentiment": "neutral"
-        }
-        
-        # Check for delivery confirmation
-        if any(phrase in transcript_lower for phrase in ["confirmed", "yes", "correct", "right"]):
-            structured_data["delivery_confirmed"] = True
-        
-        # Check for address verification
-        if any(phrase in transcript_lower for phrase in ["address", "location", "correct address"]):
-            structured_data["address_verified"] = True
-        
-        # Extract issues
-        issue_keywords = ["problem", "issue", "concern", "trouble", "difficulty"]
-        for keyword in issue_keywords:
-            if keyword in transcript_lower:
-                # Simple extraction - in production, use more sophisticated NLP
-                structured_data["issues_identified"].append(f"Driver mentioned {keyword}")
-        
-        # Extract next steps
-        next_step_keywords = ["call back", "follow up", "tomorrow", "next week", "schedule"]
-        for keyword in next_step_keywords:
-            if keyword in transcript_lower:
-                structured_data["next_steps"].append(f"Action required: {keyword}")
-        
-        # Basic sentiment analysis
-        positive_words = ["good", "great", "excellent", "happy", "satisfied"]
-        negative_words = ["bad", "terrible", "unhappy", "angry", "frustrated"]
-        
-        positive_count = sum(1 for word in positive_words if word in transcript_lower)
-        negative_count = sum(1 for word in negative_words if word in transcript_lower)
-        
-        if positive_count > negative_count:
-            structured_data["driver_sentiment"] = "positive"
-        elif negative_count > positive_count:
-            structured_data["driver_sentiment"] = "negative"
-        
-        return structured_data
-        
-    except Exception as e:
-        logger.error(f"Error extracting structured data from transcript: {e}")
-        return {
-            "delivery_confirmed": False,
-            "address_verified": False,
-            "issues_identified": [],
-            "next_steps": [],
-            "driver_sentiment": "neutral",
-            "extraction_error": str(e)
-        }
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class AgentCatalog:
+    """
+    Stale-while-revalidate cache of the Retell AI agent list with an index by agent_id.
+    Fresh data is served from memory; once it is older than `ttl` the stale copy
+    is still served while one background refresh runs. Only an empty, invalidated
+    or too-stale (`max_stale`) catalog makes a caller wait for Retell.
+    """
+    
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        ttl: float = 60.0,
+        max_stale: float = 3600.0
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._agents: Optional[List[Dict[str, Any]]] = None
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._generation = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+    
+    async def _snapshot(self) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        age = time.monotonic() - self._fetched_at
+        if self._agents is None or age > self.max_stale:
+            self.misses += 1
+            return await self._refresh()
+        if age > self.ttl:
+            self.stale_hits += 1
+            self._start_refresh()
+        else:
+            self.hits += 1
+        return self._agents, self._index
+    
+    async def get_all(self) -> List[Dict[str, Any]]:
+        """Return the agent list, refreshing it inline only when there is nothing usable cached"""
+        agents, _ = await self._snapshot()
+        return agents
+    
+    async def get(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Look up one agent through the agent_id index"""
+        _, index = await self._snapshot()
+        return index.get(agent_id)
+    
+    def invalidate(self) -> None:
+        """Drop the cached list so the next read fetches a fresh copy (e.g. after creating an agent)"""
+        self._generation += 1
+        self._agents = None
+        self._index = {}
+        self._refresh_task = None
+    
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._load(self._generation))
+            # Background refreshes may have no awaiting caller; failures are already logged
+            self._refresh_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._refresh_task
+    
+    async def _refresh(self) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        # Waiters use the result of the refresh itself: an invalidate() while it
+        # is in flight clears the cached fields, but not what they are waiting for
+        stale = (self._agents, self._index) if self._agents is not None else None
+        task = self._start_refresh()
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            if stale is None:
+                raise
+            logger.warning("Serving stale agent catalog after failed refresh")
+            return stale
+    
+    async def _load(self, generation: int) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        self.refreshes += 1
+        try:
+            agents = await self.fetch()
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.error(f"Failed to refresh agent catalog: {e}")
+            raise
+        
+        index = {agent.get("agent_id"): agent for agent in agents if agent.get("agent_id")}
+        # An invalidation while the fetch was in flight makes this result outdated
+        # for the cache; callers already waiting on it still get it
+        if generation == self._generation:
+            self._agents = agents
+            self._index = index
+            self._fetched_at = time.monotonic()
+        return agents, index
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return {
+            "agents": len(self._agents) if self._agents is not None else 0,
+            "age_seconds": round(time.monotonic() - self._fetched_at, 1) if self._agents is not None else None,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures
+        }
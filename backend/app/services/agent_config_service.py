@@ -1,11 +1,20 @@
-from typing import List, Optional
-from app.database.connection import get_db
+from typing import Any, Dict, List, Optional
+from app.database.connection import get_db, run_db
 from app.models.agent_config import AgentConfiguration, AgentConfigurationUpdate
+from app.core.cache import TTLCache
+from app.core.config import settings
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# Shared by every service instance so invalidations made by one router are
+# seen by the others (e.g. RetellService reads configs on each call trigger)
+_configuration_cache = TTLCache(
+    maxsize=settings.agent_config_cache_size,
+    ttl=settings.agent_config_cache_ttl
+)
+
 class AgentConfigurationService:
     def __init__(self):
         self.table_name = "agent_configurations"
@@ -20,14 +29,15 @@ class AgentConfigurationService:
             
             # Prepare data for insertion
             config_data = config.dict(exclude={'id', 'created_at', 'updated_at'})
-            config_data['created_at'] = datetime.now(datetime.timezone.utc).isoformat()
-            config_data['updated_at'] = datetime.now(datetime.timezone.utc).isoformat()
+            config_data['created_at'] = datetime.now(timezone.utc).isoformat()
+            config_data['updated_at'] = datetime.now(timezone.utc).isoformat()
             
             # Insert into Supabase
-            result = db.table(self.table_name).insert(config_data).execute()
+            result = await run_db(db.table(self.table_name).insert(config_data).execute)
             
             if result.data:
                 created_config = result.data[0]
+                _configuration_cache.pop(created_config['id'])
                 logger.info(f"Created agent configuration: {created_config['id']}")
                 return AgentConfiguration(**created_config)
             
@@ -38,16 +48,22 @@ class AgentConfigurationService:
             return None
     
     async def get_configuration(self, config_id: int) -> Optional[AgentConfiguration]:
-        """Get agent configuration by ID"""
+        """Get agent configuration by ID (read-through cached)"""
+        cached = _configuration_cache.get(config_id)
+        if cached is not None:
+            return cached
+        
         try:
             db = get_db()
             if not db:
                 return None
             
-            result = db.table(self.table_name).select("*").eq("id", config_id).execute()
+            result = await run_db(db.table(self.table_name).select("*").eq("id", config_id).execute)
             
             if result.data:
-                return AgentConfiguration(**result.data[0])
+                config = AgentConfiguration(**result.data[0])
+                _configuration_cache.set(config_id, config)
+                return config
             
             return None
             
@@ -62,7 +78,7 @@ class AgentConfigurationService:
             if not db:
                 return []
             
-            result = db.table(self.table_name).select("*").order("created_at", desc=True).execute()
+            result = await run_db(db.table(self.table_name).select("*").order("created_at", desc=True).execute)
             
             if result.data:
                 return [AgentConfiguration(**config) for config in result.data]
@@ -80,7 +96,7 @@ class AgentConfigurationService:
             if not db:
                 return None
             
-            result = db.table(self.table_name).select("*").eq("is_active", True).single().execute()
+            result = await run_db(db.table(self.table_name).select("*").eq("is_active", True).single().execute)
             
             if result.data:
                 return AgentConfiguration(**result.data)
@@ -100,10 +116,13 @@ class AgentConfigurationService:
             
             # Prepare update data
             update_data = updates.dict(exclude_unset=True)
-            update_data['updated_at'] = datetime.now(datetime.timezone.utc).isoformat()
+            update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
             
             # Update in Supabase
-            result = db.table(self.table_name).update(update_data).eq("id", config_id).execute()
+            try:
+                result = await run_db(db.table(self.table_name).update(update_data).eq("id", config_id).execute)
+            finally:
+                _configuration_cache.pop(config_id)
             
             if result.data:
                 updated_config = result.data[0]
@@ -123,7 +142,10 @@ class AgentConfigurationService:
             if not db:
                 return False
             
-            result = db.table(self.table_name).delete().eq("id", config_id).execute()
+            try:
+                result = await run_db(db.table(self.table_name).delete().eq("id", config_id).execute)
+            finally:
+                _configuration_cache.pop(config_id)
             
             if result.data:
                 logger.info(f"Deleted agent configuration: {config_id}")
@@ -142,11 +164,15 @@ class AgentConfigurationService:
             if not db:
                 return False
             
-            # First, deactivate all configurations
-            db.table(self.table_name).update({"is_active": False}).execute()
-            
-            # Then activate the specified one
-            result = db.table(self.table_name).update({"is_active": True}).eq("id", config_id).execute()
+            try:
+                # First, deactivate all configurations
+                await run_db(db.table(self.table_name).update({"is_active": False}).execute)
+                
+                # Then activate the specified one
+                result = await run_db(db.table(self.table_name).update({"is_active": True}).eq("id", config_id).execute)
+            finally:
+                # Every configuration's is_active flag may have changed
+                _configuration_cache.clear()
             
             if result.data:
                 logger.info(f"Activated agent configuration: {config_id}")
@@ -157,3 +183,7 @@ class AgentConfigurationService:
         except Exception as e:
             logger.error(f"Error activating agent configuration {config_id}: {e}")
             return False
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the shared configuration cache"""
+        return _configuration_cache.stats()
@@ -0,0 +1,37 @@
+from typing import Any, Optional
+from app.core.broadcast import BroadcastHub
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.call_service import CallService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Live call updates for /calls/stream subscribers, published from webhook processing
+call_event_hub = BroadcastHub(
+    queue_size=settings.stream_queue_size,
+    max_subscribers=settings.stream_max_subscribers
+)
+
+# call_id -> agent_config_id, only looked up while someone filters the stream by agent
+_call_agents: LRUCache = LRUCache(maxsize=10000)
+
+async def _get_agent_config_id(call_id: str) -> Optional[int]:
+    agent_config_id = _call_agents.get(call_id)
+    if agent_config_id is None:
+        agent_config_id = await CallService().get_agent_config_id(call_id)
+        if agent_config_id is not None:
+            _call_agents.set(call_id, agent_config_id)
+    return agent_config_id
+
+async def publish_call_event(event_type: str, call_id: str, **data: Any) -> None:
+    """Broadcast an update of one call to the stream subscribers that want it"""
+    if not call_event_hub.has_subscribers:
+        return
+    try:
+        agent_config_id = None
+        if call_event_hub.wants("agent_config_id"):
+            agent_config_id = await _get_agent_config_id(call_id)
+        call_event_hub.publish(event_type, {"call_id": call_id, "agent_config_id": agent_config_id, **data})
+    except Exception as e:
+        logger.error(f"Error publishing {event_type} event for call {call_id}: {e}")
@@ -1,15 +1,76 @@
 from typing import List, Optional
-from app.database.connection import get_db
-from app.models.call import CallTrigger, CallResult, CallResultUpdate, CallStatus
+from app.database.connection import get_db, run_db
+from app.models.call import CallTrigger, CallResult, CallResultSummary, CallResultUpdate, CallSearchHit, CallStatus, FINAL_CALL_STATUSES
+from app.core.pagination import keyset_filter
+from app.core.config import settings
+from app.core.compression import compress_json, compress_text, decompress_json, decompress_text, is_compressed, resolve_codec
+from app.services.write_coalescer import WriteCoalescer
+from app.services.transcript_service import TranscriptService
 import logging
-from datetime import datetime
+import re
+from datetime import datetime, timezone
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Codec for transcripts and structured summaries written from now on; values
+# already stored in any format are always readable
+_compression_codec = resolve_codec(settings.call_compression)
+if settings.call_compression == "zstd" and _compression_codec != "zstd":
+    logger.warning("CALL_COMPRESSION=zstd but the zstandard package is not installed; writing zlib, zstd values can't be read")
+
+def _transcript_snippet(transcript: str, query: str, width: int = 80) -> Optional[str]:
+    """Excerpt around the first query term found in a transcript, highlighted like ts_headline"""
+    terms = [term for term in re.findall(r"\w+", query.lower()) if term not in ("or", "and")]
+    for term in terms:
+        match = re.search(rf"\b{re.escape(term)}\w*", transcript, re.IGNORECASE)
+        if match:
+            start, end = max(match.start() - width, 0), min(match.end() + width, len(transcript))
+            return (
+                ("..." if start else "") + transcript[start:match.start()]
+                + f"<b>{match.group(0)}</b>" + transcript[match.end():end]
+                + ("..." if end < len(transcript) else "")
+            )
+    return None
+
 class CallService:
+    # Shared by every instance so updates to one call from different routers
+    # are merged into the same PATCH and applied in order
+    _write_coalescer: Optional[WriteCoalescer] = None
+    
     def __init__(self):
         self.table_name = "call_results"
+        if CallService._write_coalescer is None:
+            CallService._write_coalescer = WriteCoalescer(
+                self._write_call_result,
+                window=settings.call_write_coalesce_window_ms / 1000
+            )
+    
+    def _encode_fields(self, data: dict) -> dict:
+        """Compress the transcript and structured summary of a row or update before it is written"""
+        data = dict(data)
+        if data.get("transcript"):
+            data["transcript"] = compress_text(data["transcript"], _compression_codec, settings.compression_min_bytes)
+        if data.get("structured_summary"):
+            data["structured_summary"] = compress_json(data["structured_summary"], _compression_codec, settings.compression_min_bytes)
+        return data
+    
+    def _decode_row(self, row: dict) -> dict:
+        """
+        Decompress whichever compressed fields a selected row contains. A field that
+        can't be decoded (e.g. zstd on a host without zstandard) is logged and left
+        out, so one bad row doesn't fail a whole page of results.
+        """
+        row = dict(row)
+        for field, decode in (("transcript", decompress_text), ("structured_summary", decompress_json)):
+            if field not in row:
+                continue
+            try:
+                row[field] = decode(row[field])
+            except Exception as e:
+                logger.error(f"Error decoding {field} of call {row.get('call_id')}: {e}")
+                row[field] = None
+        return row
     
     async def create_call_result(self, call_result: CallResult) -> Optional[CallResult]:
         """Create a new call result record"""
@@ -20,17 +81,17 @@ class CallService:
                 return None
             
             # Prepare data for insertion
-            result_data = call_result.dict(exclude={'id', 'created_at', 'updated_at'})
-            result_data['created_at'] = datetime.now(datetime.timezone.utc).isoformat()
-            result_data['updated_at'] = datetime.now(datetime.timezone.utc).isoformat()
+            result_data = self._encode_fields(call_result.dict(exclude={'id', 'created_at', 'updated_at'}))
+            result_data['created_at'] = datetime.now(timezone.utc).isoformat()
+            result_data['updated_at'] = datetime.now(timezone.utc).isoformat()
             
             # Insert into Supabase
-            result = db.table(self.table_name).insert(result_data).execute()
+            result = await run_db(db.table(self.table_name).insert(result_data).execute)
             
             if result.data:
                 created_result = result.data[0]
                 logger.info(f"Created call result: {created_result['id']}")
-                return CallResult(**created_result)
+                return CallResult(**self._decode_row(created_result))
             
             return None
             
@@ -45,28 +106,81 @@ class CallService:
             if not db:
                 return None
             
-            result = db.table(self.table_name).select("*").eq("call_id", call_id).execute()
+            result = await run_db(db.table(self.table_name).select("*").eq("call_id", call_id).execute)
             
-            if result.data:
-                return CallResult(**result.data[0])
+            if not result.data:
+                return None
             
-            return None
+            # Transcripts are decompressed on read; list views only select one when fields= asks for it
+            row = self._decode_row(result.data[0])
+            # Live calls keep their transcript as segments until the call ends
+            if not row.get("transcript") and row.get("status") not in FINAL_CALL_STATUSES:
+                row["transcript"] = await TranscriptService().materialize(call_id)
+            return CallResult(**row)
             
         except Exception as e:
             logger.error(f"Error getting call result {call_id}: {e}")
             return None
     
-    async def get_all_call_results(self, limit: int = 100) -> List[CallResult]:
-        """Get all call results with pagination"""
+    async def search_call_results(self, query: str, limit: int = 20, offset: int = 0) -> List[CallSearchHit]:
+        """Ranked full-text search over load numbers, driver names, call summaries and transcripts"""
         try:
             db = get_db()
             if not db:
                 return []
             
-            result = db.table(self.table_name).select("*").order("created_at", desc=True).limit(limit).execute()
+            result = await run_db(
+                db.rpc(
+                    "search_call_results",
+                    {"search_query": query, "result_limit": limit, "result_offset": offset}
+                ).execute
+            )
+            hits = [CallSearchHit(**hit) for hit in result.data or []]
+            
+            # Snippets of compressed transcripts are cut from the decompressed text, for this page only
+            unhighlighted = [hit.call_id for hit in hits if not hit.snippet or "<b>" not in hit.snippet]
+            if unhighlighted:
+                transcripts = await run_db(
+                    db.table(self.table_name).select("call_id,transcript").in_("call_id", unhighlighted).execute
+                )
+                texts = {row["call_id"]: decompress_text(row["transcript"]) for row in transcripts.data or []}
+                for hit in hits:
+                    if hit.call_id in texts and texts[hit.call_id]:
+                        hit.snippet = _transcript_snippet(texts[hit.call_id], query) or hit.snippet
+            return hits
+            
+        except Exception as e:
+            logger.error(f"Error searching call results for {query!r}: {e}")
+            raise
+    
+    async def get_agent_config_id(self, call_id: str) -> Optional[int]:
+        """Get the agent configuration a call was placed with"""
+        try:
+            db = get_db()
+            if not db:
+                return None
+            
+            result = await run_db(db.table(self.table_name).select("agent_config_id").eq("call_id", call_id).execute)
+            return result.data[0]["agent_config_id"] if result.data else None
+            
+        except Exception as e:
+            logger.error(f"Error getting agent configuration of call {call_id}: {e}")
+            return None
+    
+    async def get_all_call_results(self, limit: int = 100, cursor: Optional[str] = None, select: str = "*") -> List[CallResultSummary]:
+        """Get all call results with keyset pagination (pass the cursor of the previous page)"""
+        try:
+            db = get_db()
+            if not db:
+                return []
+            
+            query = db.table(self.table_name).select(select)
+            if cursor:
+                query = query.or_(keyset_filter(cursor))
+            result = await run_db(query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute)
             
             if result.data:
-                return [CallResult(**call_result) for call_result in result.data]
+                return [CallResultSummary(**self._decode_row(call_result)) for call_result in result.data]
             
             return []
             
@@ -74,17 +188,20 @@ class CallService:
             logger.error(f"Error getting all call results: {e}")
             return []
     
-    async def get_call_results_by_agent(self, agent_config_id: int, limit: int = 100) -> List[CallResult]:
+    async def get_call_results_by_agent(self, agent_config_id: int, limit: int = 100, cursor: Optional[str] = None, select: str = "*") -> List[CallResultSummary]:
         """Get call results for a specific agent configuration"""
         try:
             db = get_db()
             if not db:
                 return []
             
-            result = db.table(self.table_name).select("*").eq("agent_config_id", agent_config_id).order("created_at", desc=True).limit(limit).execute()
+            query = db.table(self.table_name).select(select).eq("agent_config_id", agent_config_id)
+            if cursor:
+                query = query.or_(keyset_filter(cursor))
+            result = await run_db(query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute)
             
             if result.data:
-                return [CallResult(**call_result) for call_result in result.data]
+                return [CallResultSummary(**self._decode_row(call_result)) for call_result in result.data]
             
             return []
             
@@ -92,31 +209,76 @@ class CallService:
             logger.error(f"Error getting call results for agent {agent_config_id}: {e}")
             return []
     
-    async def update_call_result(self, call_id: str, updates: CallResultUpdate) -> Optional[CallResult]:
-        """Update an existing call result"""
+    async def update_call_result(self, call_id: str, updates: CallResultUpdate, allow_final: bool = False) -> Optional[CallResult]:
+        """
+        Update an existing call result (merged with other updates to the same call
+        within the coalescing window). With allow_final the update is written on its
+        own and also applies to a finished call, e.g. results derived after the call ended.
+        """
         try:
-            db = get_db()
-            if not db:
-                return None
-            
-            # Prepare update data
             update_data = updates.dict(exclude_unset=True)
-            update_data['updated_at'] = datetime.now(datetime.timezone.utc).isoformat()
-            
-            # Update in Supabase
-            result = db.table(self.table_name).update(update_data).eq("call_id", call_id).execute()
-            
-            if result.data:
-                updated_result = result.data[0]
-                logger.info(f"Updated call result: {call_id}")
-                return CallResult(**updated_result)
-            
-            return None
+            if allow_final:
+                return await self._write_call_result(call_id, update_data, allow_final=True)
+            return await self._write_coalescer.submit(call_id, update_data)
             
         except Exception as e:
             logger.error(f"Error updating call result {call_id}: {e}")
             return None
     
+    def queue_call_result_update(self, call_id: str, updates: CallResultUpdate) -> None:
+        """
+        Queue an intermediate update without waiting for its write, so the next
+        event of the same call can merge into the same PATCH. Failed writes are
+        logged by the coalescer.
+        """
+        future = self._write_coalescer.enqueue(call_id, updates.dict(exclude_unset=True))
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    
+    async def _write_call_result(self, call_id: str, update_data: dict, allow_final: bool = False) -> Optional[CallResult]:
+        """Write merged field updates for a call in a single PATCH"""
+        db = get_db()
+        if not db:
+            return None
+        
+        # Prepare update data
+        transcript = update_data.get("transcript")
+        update_data = self._encode_fields(update_data)
+        update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+        
+        # Update in Supabase. Events of one call can still race across server
+        # processes, so an update that doesn't finish the call never lands on a
+        # call that is already finished (no in_progress over completed, no late
+        # transcript over the final one)
+        query = db.table(self.table_name).update(update_data).eq("call_id", call_id)
+        if not allow_final and update_data.get("status") not in FINAL_CALL_STATUSES:
+            query = query.not_.in_("status", FINAL_CALL_STATUSES)
+        result = await run_db(query.execute)
+        
+        if not result.data:
+            return None
+        
+        # Postgres can't read a compressed transcript, so its search document is built
+        # from the plain text. The row is already written, so a failure here only
+        # leaves the call's transcript out of search until its next write
+        if is_compressed(update_data.get("transcript")):
+            try:
+                await run_db(
+                    db.rpc("index_call_transcript", {"target_call_id": call_id, "transcript_text": transcript}).execute
+                )
+            except Exception as e:
+                logger.error(f"Error indexing transcript of call {call_id} for search: {e}")
+        
+        logger.info(f"Updated call result: {call_id}")
+        return CallResult(**self._decode_row(result.data[0]))
+    
+    async def flush_pending_writes(self) -> None:
+        """Write any coalesced updates that are still waiting for their window"""
+        await self._write_coalescer.flush()
+    
+    def write_stats(self) -> dict:
+        """Coalescing counters for monitoring"""
+        return self._write_coalescer.stats()
+    
     async def delete_call_result(self, call_id: str) -> bool:
         """Delete a call result"""
         try:
@@ -124,7 +286,7 @@ class CallService:
             if not db:
                 return False
             
-            result = db.table(self.table_name).delete().eq("call_id", call_id).execute()
+            result = await run_db(db.table(self.table_name).delete().eq("call_id", call_id).execute)
             
             if result.data:
                 logger.info(f"Deleted call result: {call_id}")
@@ -0,0 +1,257 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from app.core.cache import LRUCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keyword rules for structured extraction; every keyword is matched as whole words
+DELIVERY_CONFIRMED_PHRASES = ["confirmed", "yes", "correct", "right"]
+ADDRESS_VERIFIED_PHRASES = ["address", "location", "correct address"]
+ISSUE_KEYWORDS = ["problem", "issue", "concern", "trouble", "difficulty"]
+NEXT_STEP_KEYWORDS = ["call back", "follow up", "tomorrow", "next week", "schedule"]
+POSITIVE_WORDS = ["good", "great", "excellent", "happy", "satisfied"]
+NEGATIVE_WORDS = ["bad", "terrible", "unhappy", "angry", "frustrated"]
+
+def _empty_structured_data() -> Dict[str, Any]:
+    return {
+        "delivery_confirmed": False,
+        "address_verified": False,
+        "issues_identified": [],
+        "next_steps": [],
+        "driver_sentiment": "neutral"
+    }
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a fixed set of lowercase patterns. One pass over
+    the text finds every occurrence of every pattern, and the automaton state can
+    be carried from one chunk of text to the next.
+    """
+    
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self.max_length = max((len(pattern) for pattern in self.patterns), default=0)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][char] = child
+                node = child
+            self._out[node].append(index)
+        
+        # Breadth-first so every node's fail link is final before its children use it
+        queue = list(self._goto[0].values())
+        while queue:
+            node = queue.pop(0)
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+    
+    def scan(self, text: str, state: int = 0) -> Tuple[List[Tuple[int, int]], int]:
+        """Return ([(end_index, pattern_index), ...], final_state) for text scanned from state"""
+        matches = []
+        goto, fail, out = self._goto, self._fail, self._out
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                matches.append((position, index))
+        return matches, state
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class KeywordMatcher:
+    """Word-boundary aware multi-keyword matcher built on one Aho-Corasick automaton"""
+    
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        self.automaton = AhoCorasick(self.keywords)
+
+class IncrementalKeywordScan:
+    """
+    Per-call scan state. feed() only scans newly appended text: the automaton
+    state carries partial matches across chunks, a short tail of earlier text
+    decides the left word boundary of matches that started in a previous chunk,
+    and matches ending exactly at the end of a chunk wait for the next character
+    to confirm their right word boundary.
+    """
+    
+    def __init__(self, matcher: KeywordMatcher):
+        self.matcher = matcher
+        self._state = 0
+        self._tail = ""
+        self._pending: Set[int] = set()
+        self.found: Set[int] = set()
+    
+    def feed(self, text: str) -> None:
+        text = text.lower()
+        if not text:
+            return
+        
+        if self._pending:
+            if not _is_word_char(text[0]):
+                self.found |= self._pending
+            self._pending = set()
+        
+        matches, self._state = self.matcher.automaton.scan(text, self._state)
+        for end, index in matches:
+            if index in self.found:
+                continue
+            start = end - len(self.matcher.keywords[index]) + 1
+            if start > 0:
+                before = text[start - 1]
+            elif len(self._tail) >= 1 - start:
+                before = self._tail[start - 1]
+            else:
+                before = ""
+            if before and _is_word_char(before):
+                continue
+            if end + 1 < len(text):
+                if not _is_word_char(text[end + 1]):
+                    self.found.add(index)
+            else:
+                self._pending.add(index)
+        
+        self._tail = (self._tail + text)[-(self.matcher.automaton.max_length + 1):]
+    
+    def matched(self) -> Set[str]:
+        """Keywords seen so far; a match at the very end of the text counts as complete"""
+        return {self.matcher.keywords[index] for index in self.found | self._pending}
+
+_MATCHER = KeywordMatcher(
+    DELIVERY_CONFIRMED_PHRASES + ADDRESS_VERIFIED_PHRASES + ISSUE_KEYWORDS
+    + NEXT_STEP_KEYWORDS + POSITIVE_WORDS + NEGATIVE_WORDS
+)
+
+def _structured_data_from_matches(matched: Set[str]) -> Dict[str, Any]:
+    structured_data = _empty_structured_data()
+    structured_data["delivery_confirmed"] = any(phrase in matched for phrase in DELIVERY_CONFIRMED_PHRASES)
+    structured_data["address_verified"] = any(phrase in matched for phrase in ADDRESS_VERIFIED_PHRASES)
+    structured_data["issues_identified"] = [
+        f"Driver mentioned {keyword}" for keyword in ISSUE_KEYWORDS if keyword in matched
+    ]
+    structured_data["next_steps"] = [
+        f"Action required: {keyword}" for keyword in NEXT_STEP_KEYWORDS if keyword in matched
+    ]
+    
+    positive_count = sum(1 for word in POSITIVE_WORDS if word in matched)
+    negative_count = sum(1 for word in NEGATIVE_WORDS if word in matched)
+    if positive_count > negative_count:
+        structured_data["driver_sentiment"] = "positive"
+    elif negative_count > positive_count:
+        structured_data["driver_sentiment"] = "negative"
+    return structured_data
+
+class TranscriptExtractor:
+    """
+    Structured extraction for one call, updated with each transcript delta.
+    Transcript segments must be fed in seq order starting at 0; after a gap the
+    extractor is out of sync and callers fall back to a full scan of the final
+    transcript.
+    """
+    
+    def __init__(self):
+        self._scan = IncrementalKeywordScan(_MATCHER)
+        self.scanned_chars = 0
+        self.segments = 0
+        self.in_sync = True
+    
+    def feed(self, text: str) -> Dict[str, Any]:
+        """Scan newly appended transcript text and return the call's structured data so far"""
+        self._scan.feed(text)
+        self.scanned_chars += len(text)
+        return self.structured_data()
+    
+    def feed_segments(self, segments: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Scan newly stored transcript segments ({"seq", "content"}), one utterance per line"""
+        for segment in segments:
+            if segment["seq"] != self.segments:
+                self.in_sync = False
+            self.segments = segment["seq"] + 1
+            self._scan.feed(segment["content"] + "\n")
+            self.scanned_chars += len(segment["content"]) + 1
+        return self.structured_data()
+    
+    def covers(self, utterance_count: int) -> bool:
+        """Whether every one of the first utterance_count segments has been scanned"""
+        return self.in_sync and self.segments == utterance_count
+    
+    def structured_data(self) -> Dict[str, Any]:
+        return _structured_data_from_matches(self._scan.matched())
+
+def extract_structured_data(transcript: str) -> Dict[str, Any]:
+    """
+    Extract structured data from a complete call transcript in a single pass.
+    This is a keyword implementation - in production, you might use:
+    - OpenAI GPT for intelligent extraction
+    - Rule-based parsing
+    - Named Entity Recognition (NER)
+    """
+    try:
+        return TranscriptExtractor().feed(transcript)
+    except Exception as e:
+        logger.error(f"Error extracting structured data from transcript: {e}")
+        return {**_empty_structured_data(), "extraction_error": str(e)}
+
+def transcript_stats(transcript: str) -> Dict[str, Any]:
+    """Utterance and word counts per speaker, from Retell's "Agent: ..." / "User: ..." lines"""
+    stats = {"utterances": 0, "words": 0, "agent_utterances": 0, "driver_utterances": 0}
+    for line in transcript.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        speaker, _, text = line.partition(":")
+        speaker = speaker.strip().lower()
+        if speaker == "agent":
+            stats["agent_utterances"] += 1
+        elif speaker == "user":
+            stats["driver_utterances"] += 1
+        else:
+            text = line
+        stats["utterances"] += 1
+        stats["words"] += len(text.split())
+    return {"transcript_stats": stats}
+
+# call_id -> extractor for calls that are still live
+_extractors: LRUCache = LRUCache(maxsize=10000)
+
+def get_extractor(call_id: str) -> Optional[TranscriptExtractor]:
+    """The live extractor of a call, if this process has seen its transcript"""
+    return _extractors.get(call_id)
+
+async def load_extractor(
+    call_id: str,
+    load_segments: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+    up_to_seq: int
+) -> TranscriptExtractor:
+    """
+    The live extractor of a call. When this process has none (earlier events of the
+    call went to another process, or it was evicted) it is rebuilt from the stored
+    segments before up_to_seq, so the caller can go on feeding segments from there.
+    """
+    extractor = _extractors.get(call_id)
+    if extractor is None:
+        extractor = TranscriptExtractor()
+        if up_to_seq > 0:
+            stored = await load_segments(call_id)
+            extractor.feed_segments([segment for segment in stored if segment["seq"] < up_to_seq])
+        _extractors.set(call_id, extractor)
+    return extractor
+
+def drop_extractor(call_id: str) -> None:
+    _extractors.pop(call_id)
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from app.core.config import settings
+from app.services.extraction import extract_structured_data, transcript_stats
+
+logger = logging.getLogger(__name__)
+
+CPU_STAGE = "cpu"
+IO_STAGE = "io"
+
+class ExtractionStage:
+    """
+    One named step of structured extraction. CPU stages are plain functions
+    `fn(transcript) -> dict` that run in a worker process, so they must be
+    picklable module-level functions. IO stages are coroutines
+    `fn(transcript, structured_data) -> dict` (e.g. an LLM call) that are awaited
+    on the event loop and see the output of the stages before them.
+    """
+    
+    def __init__(self, name: str, fn: Callable[..., Any], kind: str, timeout: float, default: bool):
+        if kind not in (CPU_STAGE, IO_STAGE):
+            raise ValueError(f"Unknown extraction stage kind: {kind}")
+        self.name = name
+        self.fn = fn
+        self.kind = kind
+        self.timeout = timeout
+        self.default = default
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+    
+    def record(self, seconds: float) -> None:
+        self.runs += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "timeout_seconds": self.timeout,
+            "default": self.default,
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "avg_ms": round(self.total_seconds / self.runs * 1000, 2) if self.runs else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2)
+        }
+
+class ExtractionPipeline:
+    """
+    Ordered registry of extraction stages. Each stage's dict output is merged into
+    the structured summary in registration order. A stage that fails or exceeds
+    its timeout is recorded under "extraction_errors" and the remaining stages
+    still run. A timed-out CPU stage cannot be interrupted and keeps its worker
+    busy until it returns, so the pool should have headroom for that.
+    """
+    
+    def __init__(self, max_workers: int = 2, default_timeout: float = 10.0):
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self._stages: Dict[str, ExtractionStage] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def register(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        kind: str = CPU_STAGE,
+        timeout: Optional[float] = None,
+        default: bool = True
+    ) -> ExtractionStage:
+        """Add a stage at the end of the pipeline; default stages run for agents that don't choose their own"""
+        if name in self._stages:
+            raise ValueError(f"Extraction stage already registered: {name}")
+        stage = ExtractionStage(name, fn, kind, timeout or self.default_timeout, default)
+        self._stages[name] = stage
+        return stage
+    
+    def stage(self, name: str, kind: str = CPU_STAGE, timeout: Optional[float] = None, default: bool = True):
+        """Decorator form of register()"""
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            self.register(name, fn, kind, timeout, default)
+            return fn
+        return decorator
+    
+    @property
+    def stage_names(self) -> List[str]:
+        return list(self._stages)
+    
+    def select(self, names: Optional[Sequence[str]] = None) -> List[ExtractionStage]:
+        """Stages to run in pipeline order: the given names, or the default stages if None"""
+        if names is None:
+            return [stage for stage in self._stages.values() if stage.default]
+        unknown = set(names) - set(self._stages)
+        if unknown:
+            logger.warning(f"Ignoring unknown extraction stages: {sorted(unknown)}")
+        return [stage for stage in self._stages.values() if stage.name in names]
+    
+    def start(self) -> None:
+        """
+        Create the worker pool (on server startup). Workers come from a fork server
+        (spawn where that is unavailable), never from fork() of the running server,
+        whose other threads may hold locks the children would inherit.
+        """
+        if self._executor is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        self.start()
+        return self._executor
+    
+    async def _run_stage(self, stage: ExtractionStage, transcript: str, structured_data: Dict[str, Any]) -> Dict[str, Any]:
+        if stage.kind == CPU_STAGE:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(self._get_executor(), stage.fn, transcript)
+        else:
+            pending = stage.fn(transcript, dict(structured_data))
+        return await asyncio.wait_for(pending, timeout=stage.timeout)
+    
+    async def run(
+        self,
+        transcript: str,
+        stages: Optional[Sequence[str]] = None,
+        precomputed: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the selected stages over a transcript and return the merged structured
+        summary. `precomputed` maps stage names to results that are already known
+        (e.g. from incremental extraction during the call) so those stages are skipped.
+        """
+        precomputed = precomputed or {}
+        structured_data: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for stage in self.select(stages):
+            if stage.name in precomputed:
+                structured_data.update(precomputed[stage.name])
+                continue
+            
+            started = time.perf_counter()
+            try:
+                result = await self._run_stage(stage, transcript, structured_data)
+                structured_data.update(result or {})
+            except asyncio.TimeoutError:
+                stage.timeouts += 1
+                errors[stage.name] = f"timed out after {stage.timeout}s"
+                logger.warning(f"Extraction stage {stage.name} timed out after {stage.timeout}s")
+            except Exception as e:
+                stage.failures += 1
+                errors[stage.name] = str(e)
+                logger.error(f"Extraction stage {stage.name} failed: {e}")
+            finally:
+                stage.record(time.perf_counter() - started)
+        
+        if errors:
+            structured_data["extraction_errors"] = errors
+        return structured_data
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage run counts and latencies for monitoring"""
+        return {
+            "max_workers": self.max_workers,
+            "stages": {name: stage.stats() for name, stage in self._stages.items()}
+        }
+
+# Stage names used in agent_configurations.extraction_stages
+KEYWORD_STAGE = "keywords"
+TRANSCRIPT_STATS_STAGE = "transcript_stats"
+
+extraction_pipeline = ExtractionPipeline(
+    max_workers=settings.extraction_workers,
+    default_timeout=settings.extraction_stage_timeout
+)
+extraction_pipeline.register(KEYWORD_STAGE, extract_structured_data, CPU_STAGE)
+extraction_pipeline.register(TRANSCRIPT_STATS_STAGE, transcript_stats, CPU_STAGE, default=False)
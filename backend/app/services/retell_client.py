@@ -0,0 +1,120 @@
+import httpx
+import logging
+from typing import Any, Dict, Optional, Tuple
+from retell import AsyncRetell
+from app.core.single_flight import SingleFlight, request_key
+from app.core.rate_limit import RateLimiter, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+class RetellClient:
+    """
+    Shared connection to Retell AI, created once and reused by every request:
+    a pooled httpx.AsyncClient for the REST endpoints and the SDK's AsyncRetell
+    client for SDK calls. Call open() on startup and aclose() on shutdown.
+    
+    Every outbound request takes a token from its endpoint class's bucket
+    ("call", "agent" or "read") and 429 responses are retried after Retry-After,
+    so bursts queue up instead of failing. The SDK client's own retries are
+    disabled: they would resend without taking a token, and an SDK call is
+    rate limited only by the acquire() made before it.
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = "https://api.retellai.com",
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        rate_limit_max_wait: float = 30.0,
+        max_429_retries: int = 3
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self._http: Optional[httpx.AsyncClient] = None
+        self._sdk: Optional[AsyncRetell] = None
+        self.single_flight = SingleFlight()
+        self.limiter = RateLimiter(rate_limits, max_wait=rate_limit_max_wait)
+        self.max_429_retries = max_429_retries
+    
+    async def open(self) -> None:
+        """Create the pooled HTTP and SDK clients"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                limits=self.limits,
+                timeout=self.timeout
+            )
+        if self._sdk is None and self.api_key:
+            self._sdk = self._new_sdk()
+    
+    def _new_sdk(self) -> AsyncRetell:
+        return AsyncRetell(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+    
+    async def aclose(self) -> None:
+        """Close both clients and release their connections"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._sdk is not None:
+            await self._sdk.close()
+            self._sdk = None
+    
+    async def request(
+        self,
+        method: str,
+        path: str,
+        endpoint_class: Optional[str] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Send a REST request to Retell AI over the shared connection pool.
+        endpoint_class defaults to "read" for GETs and "agent" otherwise.
+        Concurrent identical GETs (same path and params) share one upstream request.
+        """
+        if self._http is None:
+            await self.open()
+        endpoint_class = endpoint_class or ("read" if method.upper() == "GET" else "agent")
+        if method.upper() == "GET" and set(kwargs) <= {"params"}:
+            return await self.single_flight.do(
+                request_key(method, path, kwargs.get("params")),
+                lambda: self._send(endpoint_class, method, path, **kwargs)
+            )
+        return await self._send(endpoint_class, method, path, **kwargs)
+    
+    async def _send(self, endpoint_class: str, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send one request under the rate limiter, retrying 429s after Retry-After"""
+        for attempt in range(self.max_429_retries + 1):
+            await self.limiter.acquire(endpoint_class)
+            response = await self._http.request(method, path, **kwargs)
+            if response.status_code != 429:
+                return response
+            
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.limiter.penalize(endpoint_class, retry_after)
+            logger.warning(f"Retell rate limited {method} {path}, retrying in {retry_after:.1f}s")
+            if retry_after > self.limiter.max_wait:
+                break
+        return response
+    
+    async def acquire(self, endpoint_class: str) -> None:
+        """Take a rate limit token before an SDK call, which does not go through request()"""
+        await self.limiter.acquire(endpoint_class)
+    
+    @property
+    def sdk(self) -> Optional[AsyncRetell]:
+        """The shared async SDK client, or None if no API key is configured"""
+        if self._sdk is None and self.api_key:
+            self._sdk = self._new_sdk()
+        return self._sdk
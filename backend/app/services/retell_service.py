@@ -1,21 +1,31 @@
-import httpx
 import logging
 from typing import Optional, Dict, Any
 from app.core.config import settings
 from app.models.call import CallTrigger
 from app.services.agent_config_service import AgentConfigurationService
 import json
-from retell import Retell
+from app.services.retell_client import RetellClient
 
 logger = logging.getLogger(__name__)
 
+# One Retell AI client shared by every RetellService instance; opened lazily
+# and closed from the app lifespan
+retell_client = RetellClient(
+    api_key=settings.retell_api_key,
+    rate_limits={
+        "call": (settings.retell_call_rate, settings.retell_call_burst),
+        "agent": (settings.retell_agent_rate, settings.retell_agent_burst),
+        "read": (settings.retell_read_rate, settings.retell_read_burst)
+    },
+    rate_limit_max_wait=settings.retell_rate_limit_max_wait
+)
+
 class RetellService:
     def __init__(self):
         self.api_key = settings.retell_api_key
-        self.base_url = "https://api.retellai.com"
+        self.base_url = retell_client.base_url
         self.agent_config_service = AgentConfigurationService()
-        # Initialize Retell client
-        self.client = Retell(api_key=self.api_key) if self.api_key else None
+        self.retell = retell_client
     
     async def initiate_call(self, call_trigger: CallTrigger) -> Optional[Dict[str, Any]]:
         """Initiate a voice call using Retell AI"""
@@ -42,25 +52,16 @@ class RetellService:
             }
             
             # Make API call to Retell
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/call",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json=call_payload,
-                    timeout=30.0
-                )
+            response = await self.retell.request("POST", "/v1/call", endpoint_class="call", json=call_payload)
+            
+            if response.status_code == 200:
+                call_data = response.json()
+                logger.info(f"Successfully initiated call: {call_data.get('call_id')}")
+                return call_data
+            else:
+                logger.error(f"Failed to initiate call: {response.status_code} - {response.text}")
+                return None
                 
-                if response.status_code == 200:
-                    call_data = response.json()
-                    logger.info(f"Successfully initiated call: {call_data.get('call_id')}")
-                    return call_data
-                else:
-                    logger.error(f"Failed to initiate call: {response.status_code} - {response.text}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error initiating call: {e}")
             return None
@@ -77,22 +78,14 @@ class RetellService:
             if not self.api_key:
                 return None
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/call/{call_id}",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=30.0
-                )
+            response = await self.retell.request("GET", f"/v1/call/{call_id}")
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.error(f"Failed to get call status: {response.status_code}")
+                return None
                 
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"Failed to get call status: {response.status_code}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error getting call status: {e}")
             return None
@@ -103,23 +96,15 @@ class RetellService:
             if not self.api_key:
                 return False
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/call/{call_id}/end",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=30.0
-                )
+            response = await self.retell.request("POST", f"/v1/call/{call_id}/end", endpoint_class="call")
+            
+            if response.status_code == 200:
+                logger.info(f"Successfully ended call: {call_id}")
+                return True
+            else:
+                logger.error(f"Failed to end call: {response.status_code}")
+                return False
                 
-                if response.status_code == 200:
-                    logger.info(f"Successfully ended call: {call_id}")
-                    return True
-                else:
-                    logger.error(f"Failed to end call: {response.status_code}")
-                    return False
-                    
         except Exception as e:
             logger.error(f"Error ending call: {e}")
             return False
@@ -198,24 +183,16 @@ class RetellService:
                 logger.error("Retell API key not configured")
                 return None
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/agent",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=30.0
-                )
+            response = await self.retell.request("GET", "/v1/agent")
+            
+            if response.status_code == 200:
+                agents_data = response.json()
+                logger.info(f"Successfully retrieved {len(agents_data.get('data', []))} agents")
+                return agents_data
+            else:
+                logger.error(f"Failed to get agents: {response.status_code} - {response.text}")
+                return None
                 
-                if response.status_code == 200:
-                    agents_data = response.json()
-                    logger.info(f"Successfully retrieved {len(agents_data.get('data', []))} agents")
-                    return agents_data
-                else:
-                    logger.error(f"Failed to get agents: {response.status_code} - {response.text}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error getting agents: {e}")
             return None
@@ -242,25 +219,16 @@ class RetellService:
                 "call_ending_conditions": agent_config.get("call_ending_conditions", [])
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/agent",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json=agent_payload,
-                    timeout=30.0
-                )
+            response = await self.retell.request("POST", "/v1/agent", json=agent_payload)
+            
+            if response.status_code == 200:
+                agent_data = response.json()
+                logger.info(f"Successfully created agent: {agent_data.get('agent_id')}")
+                return agent_data
+            else:
+                logger.error(f"Failed to create agent: {response.status_code} - {response.text}")
+                return None
                 
-                if response.status_code == 200:
-                    agent_data = response.json()
-                    logger.info(f"Successfully created agent: {agent_data.get('agent_id')}")
-                    return agent_data
-                else:
-                    logger.error(f"Failed to create agent: {response.status_code} - {response.text}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error creating agent: {e}")
             return None
@@ -268,12 +236,13 @@ class RetellService:
     async def create_web_call(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Create a web call using the official Retell SDK"""
         try:
-            if not self.client:
+            if not self.retell.sdk:
                 logger.error("Retell client not initialized - API key not configured")
                 return None
             
-            # Use the official Retell SDK to create web call
-            web_call_response = self.client.call.create_web_call(
+            # Use the shared async Retell SDK client to create web call
+            await self.retell.acquire("call")
+            web_call_response = await self.retell.sdk.call.create_web_call(
                 agent_id=agent_id
             )
             
@@ -0,0 +1,85 @@
+from typing import Any, Dict, List
+from app.database.connection import get_db, run_db
+import logging
+
+logger = logging.getLogger(__name__)
+
+def split_utterances(transcript: str) -> List[str]:
+    """Split a transcript into its utterances (one per non-empty line)"""
+    return [line.strip() for line in transcript.splitlines() if line.strip()]
+
+class TranscriptService:
+    """
+    Append-only transcript storage. Each transcript_updated event only writes the
+    utterances that are new since the previous event, as rows of
+    call_transcript_segments keyed by (call_id, seq). The full transcript is
+    materialized once when the call ends, or assembled on read while it is live.
+    
+    The next seq is read from the table on every append rather than kept in
+    memory, since the events of one call may reach different server processes.
+    """
+    
+    table_name = "call_transcript_segments"
+    
+    async def append(self, call_id: str, transcript: str, final: bool = False) -> List[Dict[str, Any]]:
+        """
+        Store the utterances of `transcript` that have not been stored yet and return
+        the appended segments. The last utterance may still be growing while the
+        call is live, so it is only stored once a later one follows or final is set.
+        """
+        db = get_db()
+        if not db:
+            return []
+        
+        utterances = split_utterances(transcript)
+        if not final:
+            utterances = utterances[:-1]
+        
+        next_seq = await self._get_next_seq(call_id)
+        new_segments = [
+            {"call_id": call_id, "seq": seq, "content": content}
+            for seq, content in enumerate(utterances[next_seq:], start=next_seq)
+        ]
+        if not new_segments:
+            return []
+        
+        # Upserting on (call_id, seq) makes a replayed append a no-op; only the rows
+        # this call inserted come back, so a racing process's segments aren't returned twice
+        result = await run_db(
+            db.table(self.table_name)
+            .upsert(new_segments, on_conflict="call_id,seq", ignore_duplicates=True)
+            .execute
+        )
+        return sorted(result.data or [], key=lambda segment: segment["seq"])
+    
+    async def _get_next_seq(self, call_id: str) -> int:
+        db = get_db()
+        result = await run_db(
+            db.table(self.table_name)
+            .select("seq")
+            .eq("call_id", call_id)
+            .order("seq", desc=True)
+            .limit(1)
+            .execute
+        )
+        return result.data[0]["seq"] + 1 if result.data else 0
+    
+    async def get_segments(self, call_id: str) -> List[Dict[str, Any]]:
+        """Get the stored segments of a call in order"""
+        db = get_db()
+        if not db:
+            return []
+        
+        result = await run_db(
+            db.table(self.table_name)
+            .select("seq,content")
+            .eq("call_id", call_id)
+            .order("seq")
+            .execute
+        )
+        return result.data or []
+    
+    async def materialize(self, call_id: str) -> str:
+        """Assemble the full transcript of a call from its segments"""
+        segments = await self.get_segments(call_id)
+        return "\n".join(segment["content"] for segment in segments)
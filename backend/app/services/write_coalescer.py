@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class _PendingWrite:
+    def __init__(self, previous: Optional[asyncio.Future]):
+        self.fields: Dict[str, Any] = {}
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.previous = previous
+        self.task: Optional[asyncio.Task] = None
+
+class WriteCoalescer:
+    """
+    Merges field updates for the same key into a single write. Later updates
+    to a field overwrite earlier ones (last writer wins), and batches for one
+    key are written in order.
+    
+    enqueue() doesn't wait: its batch stays open for `window` seconds so later
+    updates of the key join it. submit() is for callers that wait for the write
+    anyway, so it writes at once, taking along whatever is queued for the key.
+    A caller that handles one key's updates in sequence should enqueue its
+    intermediate updates; awaiting each one would leave nothing to merge.
+    """
+    
+    def __init__(self, writer: Callable[[str, Dict[str, Any]], Awaitable[Any]], window: float = 0.05):
+        self.writer = writer
+        self.window = window
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._last_write: Dict[str, asyncio.Future] = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.writes = 0
+    
+    async def submit(self, key: str, fields: Dict[str, Any]) -> Any:
+        """Write field updates for `key` now, merged with any queued ones, and wait for the write"""
+        future = self.enqueue(key, fields)
+        pending = self._pending.get(key)
+        if pending is not None and pending.future is future:
+            # Still waiting out its window: nothing is gained by waiting longer
+            pending.task.cancel()
+            pending.task = asyncio.create_task(self._flush(key, pending))
+        return await asyncio.shield(future)
+    
+    def enqueue(self, key: str, fields: Dict[str, Any]) -> asyncio.Future:
+        """Queue field updates for `key` without waiting; the returned future resolves with the merged write"""
+        self.submitted += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = _PendingWrite(previous=self._last_write.get(key))
+            self._pending[key] = pending
+            self._last_write[key] = pending.future
+            pending.task = asyncio.create_task(self._flush_after_window(key, pending))
+        else:
+            self.coalesced += 1
+        pending.fields.update(fields)
+        return pending.future
+    
+    async def _flush_after_window(self, key: str, pending: _PendingWrite) -> None:
+        await asyncio.sleep(self.window)
+        await self._flush(key, pending)
+    
+    async def _flush(self, key: str, pending: _PendingWrite) -> None:
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+        
+        # Keep per-key ordering: wait for the previous batch to land first
+        if pending.previous is not None and not pending.previous.done():
+            await asyncio.wait([pending.previous])
+        
+        try:
+            self.writes += 1
+            result = await self.writer(key, pending.fields)
+            if not pending.future.done():
+                pending.future.set_result(result)
+        except Exception as e:
+            logger.error(f"Coalesced write for {key} failed: {e}")
+            if not pending.future.done():
+                pending.future.set_exception(e)
+        finally:
+            if self._last_write.get(key) is pending.future:
+                del self._last_write[key]
+    
+    async def flush(self) -> None:
+        """Write every pending batch immediately (used on shutdown)"""
+        for key, pending in list(self._pending.items()):
+            if pending.task is not None:
+                pending.task.cancel()
+            await self._flush(key, pending)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Submission and write counters for monitoring"""
+        return {
+            "window_ms": int(self.window * 1000),
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "writes": self.writes,
+            "coalesced": self.coalesced
+        }
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Re-run structured extraction over stored call transcripts.
+
+When the extraction keyword lists change, existing call_results rows keep the
+structured_summary computed by the old rules. This script walks call_results in
+id order (keyset pagination, so every page is an index range scan), extracts on
+a process pool and upserts the changed summaries back in batches. Progress is
+written to a checkpoint file after every page, so an interrupted run resumes
+where it stopped.
+
+    python backfill_extraction.py --workers 8 --page-size 1000
+    python backfill_extraction.py --restart        # ignore the checkpoint
+    python backfill_extraction.py --dry-run        # count changes, write nothing
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.core.compression import compress_json, decompress_json, decompress_text, resolve_codec
+from app.services.extraction import extract_structured_data
+
+# Upserts on call_results must carry every NOT NULL column, since PostgREST
+# builds an INSERT ... ON CONFLICT statement
+UPSERT_COLUMNS = ("id", "call_id", "driver_name", "phone_number", "load_number")
+SELECT_COLUMNS = ",".join(UPSERT_COLUMNS + ("transcript", "structured_summary"))
+
+def extract_stored_transcript(transcript: str) -> Dict[str, Any]:
+    """Worker entry point: decompress a stored transcript, then extract from it"""
+    return extract_structured_data(decompress_text(transcript) or "")
+
+def load_checkpoint(path: Path) -> Dict[str, Any]:
+    if path.exists():
+        with open(path, "r") as f:
+            return json.load(f)
+    return {"last_id": 0, "scanned": 0, "updated": 0}
+
+def save_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    """Write the checkpoint atomically so a crash mid-write never corrupts it"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def fetch_page(db, last_id: int, page_size: int) -> List[Dict[str, Any]]:
+    """Next page of rows with a transcript, ordered by id after last_id"""
+    result = (
+        db.table("call_results")
+        .select(SELECT_COLUMNS)
+        .gt("id", last_id)
+        .neq("transcript", "")
+        .order("id")
+        .limit(page_size)
+        .execute()
+    )
+    return result.data or []
+
+def upsert_summaries(db, rows: List[Dict[str, Any]], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        db.table("call_results").upsert(rows[start:start + batch_size], on_conflict="id").execute()
+
+def backfill(args: argparse.Namespace) -> bool:
+    from app.core.config import settings
+    from app.database.connection import get_db
+    
+    db = get_db()
+    if not db:
+        print("❌ Supabase is not configured. Set SUPABASE_URL and SUPABASE_KEY in .env")
+        return False
+    
+    checkpoint_path = Path(args.checkpoint)
+    if args.restart and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint["last_id"]:
+        print(f"↩️  Resuming after call_results.id={checkpoint['last_id']} ({checkpoint['scanned']} scanned so far)")
+    
+    codec = resolve_codec(settings.call_compression)
+    started = time.perf_counter()
+    scanned = updated = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        while True:
+            rows = fetch_page(db, checkpoint["last_id"], args.page_size)
+            if not rows:
+                break
+            
+            transcripts = [row.get("transcript") or "" for row in rows]
+            chunksize = max(1, len(rows) // (args.workers * 4))
+            summaries = pool.map(extract_stored_transcript, transcripts, chunksize=chunksize)
+            
+            changed = [
+                {
+                    **{column: row[column] for column in UPSERT_COLUMNS},
+                    "structured_summary": compress_json(summary, codec, settings.compression_min_bytes)
+                }
+                for row, summary in zip(rows, summaries)
+                if summary != decompress_json(row.get("structured_summary"))
+            ]
+            if changed and not args.dry_run:
+                upsert_summaries(db, changed, args.batch_size)
+            
+            scanned += len(rows)
+            updated += len(changed)
+            checkpoint = {
+                "last_id": rows[-1]["id"],
+                "scanned": checkpoint["scanned"] + len(rows),
+                "updated": checkpoint["updated"] + len(changed)
+            }
+            if not args.dry_run:
+                save_checkpoint(checkpoint_path, checkpoint)
+            
+            elapsed = time.perf_counter() - started
+            print(f"📄 id<={checkpoint['last_id']}: {scanned} scanned, {updated} changed ({scanned / elapsed:.0f} calls/s)")
+    
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Backfill complete: {scanned} transcripts scanned, {updated} summaries "
+          f"{'would change' if args.dry_run else 'updated'} in {elapsed:.1f}s")
+    if not args.dry_run and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    return True
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-extract structured summaries for stored call transcripts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="extraction processes")
+    parser.add_argument("--page-size", type=int, default=1000, help="rows fetched per keyset page")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per upsert request")
+    parser.add_argument("--checkpoint", default=".backfill_extraction.json", help="checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="count changed summaries without writing")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    raise SystemExit(0 if backfill(parse_args()) else 1)
@@ -0,0 +1,252 @@
+"""
+Outbound calling campaigns for the simple backend.
+
+A campaign is a persisted queue of drivers/loads (campaign_entries) tied to one
+agent configuration. The CampaignScheduler polls active campaigns and dials due
+entries while respecting each campaign's concurrency cap, its local-time calling
+window and its retry-on-no-answer policy. Webhooks report call outcomes back
+through on_call_finished().
+"""
+
+import asyncio
+import os
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Retell disconnection reasons that mean nobody picked up, so the entry is retried
+RETRY_OUTCOMES = {"dial_no_answer", "dial_busy", "voicemail_reached", "timeout"}
+
+# Entry statuses that hold one of the campaign's concurrency slots
+ACTIVE_ENTRY_STATUSES = ("dialing", "in_progress")
+
+ENTRY_STATUSES = ("pending", "dialing", "in_progress", "completed", "failed", "cancelled")
+
+def validate_timezone(name: str) -> str:
+    """Return the timezone name if it is a known IANA zone, raise ValueError otherwise"""
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+    return name
+
+def _parse_time(value: Any) -> time:
+    return value if isinstance(value, time) else time.fromisoformat(str(value))
+
+def in_call_window(now: datetime, tz_name: str, window_start: Any, window_end: Any) -> bool:
+    """Whether `now` falls inside the calling window in the given local timezone"""
+    local = now.astimezone(ZoneInfo(tz_name)).time()
+    start, end = _parse_time(window_start), _parse_time(window_end)
+    if start <= end:
+        return start <= local < end
+    # Window wraps past midnight (e.g. 22:00-06:00)
+    return local >= start or local < end
+
+class CampaignScheduler:
+    """
+    Background loop that dials campaign entries. Entries are claimed (pending ->
+    dialing) through the claim_campaign_entries function, which locks the campaign
+    row and claims no more than its free concurrency slots, so schedulers running
+    in several workers against the same database never dial an entry twice or
+    exceed a campaign's max_concurrency.
+    
+    `dial(campaign, entry)` places one call. It must store the new call_id as the
+    entry's last_call_id before dialing, so a webhook that arrives before dial()
+    returns can still find the entry, and return {"status", "call_id"}.
+    """
+    
+    def __init__(
+        self,
+        supabase,
+        dial: Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        poll_interval: float = 15.0,
+        call_timeout_minutes: float = 30.0
+    ):
+        self.supabase = supabase
+        self.dial = dial
+        self.poll_interval = poll_interval
+        self.call_timeout = timedelta(minutes=call_timeout_minutes)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.ticks = 0
+        self.dialed = 0
+        self.dial_failures = 0
+        self.retries_scheduled = 0
+        self.timed_out = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    async def start(self) -> None:
+        """Start the polling loop"""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="campaign-scheduler")
+        print(f"📅 Campaign scheduler started (poll every {self.poll_interval:.0f}s)")
+    
+    async def stop(self) -> None:
+        """Stop the polling loop after the current tick"""
+        if not self.running:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+    
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"❌ Campaign scheduler tick failed: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def tick(self) -> None:
+        """Run one scheduling pass over every active campaign"""
+        self.ticks += 1
+        now = datetime.now(timezone.utc)
+        await self._expire_stale_entries(now)
+        for campaign in await self.supabase.get_campaigns(status="active"):
+            try:
+                await self._dial_campaign(campaign, now)
+            except Exception as e:
+                print(f"❌ Error scheduling campaign {campaign.get('id')}: {e}")
+    
+    async def _dial_campaign(self, campaign: Dict[str, Any], now: datetime) -> None:
+        campaign_id = campaign["id"]
+        active = await self.supabase.get_campaign_entries(
+            campaign_id,
+            select="id",
+            status=f"in.({','.join(ACTIVE_ENTRY_STATUSES)})"
+        )
+        slots = campaign["max_concurrency"] - len(active)
+        if slots <= 0:
+            return
+        
+        # Over-fetch so entries outside their calling window don't starve the ones inside it
+        due = await self.supabase.get_due_campaign_entries(campaign_id, now.isoformat(), limit=slots * 4)
+        if not due and not active:
+            await self._complete_if_done(campaign)
+            return
+        
+        callable_entries = [
+            entry for entry in due
+            if in_call_window(
+                now,
+                entry.get("timezone") or campaign["timezone"],
+                campaign["window_start"],
+                campaign["window_end"]
+            )
+        ][:slots]
+        if not callable_entries:
+            return
+        
+        # The database re-checks the free slots, other workers may have claimed some since
+        claimed = await self.supabase.claim_campaign_entries(campaign_id, [entry["id"] for entry in callable_entries])
+        await asyncio.gather(*(self._dial_entry(campaign, entry) for entry in claimed))
+    
+    async def _dial_entry(self, campaign: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        try:
+            result = await self.dial(campaign, entry)
+        except Exception as e:
+            print(f"❌ Error dialing campaign entry {entry['id']}: {e}")
+            result = {"status": "failed", "error": str(e)}
+        
+        if result.get("status") == "in_progress":
+            self.dialed += 1
+            # Skipped if a webhook already finished this attempt
+            await self.supabase.update_campaign_entry(
+                entry["id"],
+                {"status": "in_progress", "last_outcome": None},
+                expected_status="dialing"
+            )
+        else:
+            self.dial_failures += 1
+            await self._finish_attempt(campaign, entry, "dial_failed", retry=True)
+    
+    async def _finish_attempt(self, campaign: Dict[str, Any], entry: Dict[str, Any], outcome: str, retry: bool) -> None:
+        """
+        Record an attempt's outcome and either schedule a retry or close the entry.
+        Only applies while the entry still has the status it was read with, so when
+        a dial failure, a timeout and a webhook race for one attempt the first wins.
+        """
+        scheduling_retry = retry and entry["attempts"] < campaign["max_attempts"]
+        if scheduling_retry:
+            next_attempt = datetime.now(timezone.utc) + timedelta(minutes=campaign["retry_delay_minutes"])
+            update = {"status": "pending", "next_attempt_at": next_attempt.isoformat(), "last_outcome": outcome}
+        else:
+            update = {"status": "failed" if retry else "completed", "last_outcome": outcome}
+        updated = await self.supabase.update_campaign_entry(entry["id"], update, expected_status=entry["status"])
+        if updated and scheduling_retry:
+            self.retries_scheduled += 1
+    
+    async def on_call_finished(self, call_id: str, status: str, disconnection_reason: Optional[str] = None) -> None:
+        """Apply the outcome of a finished call to its campaign entry, if it belongs to one"""
+        entry = await self.supabase.get_campaign_entry_by_call_id(call_id)
+        if not entry or entry["status"] not in ACTIVE_ENTRY_STATUSES:
+            return
+        campaign = await self.supabase.get_campaign(entry["campaign_id"])
+        if not campaign:
+            return
+        
+        no_answer = disconnection_reason in RETRY_OUTCOMES
+        outcome = disconnection_reason or status
+        await self._finish_attempt(campaign, entry, outcome, retry=no_answer or status == "failed")
+    
+    async def _expire_stale_entries(self, now: datetime) -> None:
+        """Treat attempts with no webhook for too long as unanswered so their slots free up"""
+        stale = await self.supabase.get_stale_campaign_entries((now - self.call_timeout).isoformat())
+        campaigns: Dict[int, Optional[Dict[str, Any]]] = {}
+        for entry in stale:
+            campaign_id = entry["campaign_id"]
+            if campaign_id not in campaigns:
+                campaigns[campaign_id] = await self.supabase.get_campaign(campaign_id)
+            if campaigns[campaign_id]:
+                self.timed_out += 1
+                await self._finish_attempt(campaigns[campaign_id], entry, "timeout", retry=True)
+    
+    async def _complete_if_done(self, campaign: Dict[str, Any]) -> None:
+        remaining = await self.supabase.get_campaign_entries(campaign["id"], select="id", status="eq.pending", limit=1)
+        if not remaining:
+            await self.supabase.update_campaign(campaign["id"], {"status": "completed"})
+            print(f"✅ Campaign {campaign['id']} completed")
+    
+    async def progress(self, campaign_id: int) -> Dict[str, Any]:
+        """Entry counts by status plus the total number of dial attempts for a campaign"""
+        rows = await self.supabase.get_campaign_progress(campaign_id)
+        counts = {status: 0 for status in ENTRY_STATUSES}
+        for row in rows:
+            counts[row["status"]] = row["entries"]
+        total = sum(row["entries"] for row in rows)
+        done = counts["completed"] + counts["failed"] + counts["cancelled"]
+        return {
+            "total": total,
+            **counts,
+            "attempts": sum(row["attempts"] or 0 for row in rows),
+            "percent_complete": round(done / total * 100, 1) if total else 0.0
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Scheduler counters for monitoring"""
+        return {
+            "running": self.running,
+            "poll_interval_seconds": self.poll_interval,
+            "ticks": self.ticks,
+            "dialed": self.dialed,
+            "dial_failures": self.dial_failures,
+            "retries_scheduled": self.retries_scheduled,
+            "timed_out": self.timed_out
+        }
+
+def get_campaign_scheduler(supabase, dial) -> CampaignScheduler:
+    """Build the scheduler from CAMPAIGN_* environment variables"""
+    return CampaignScheduler(
+        supabase,
+        dial,
+        poll_interval=float(os.getenv("CAMPAIGN_POLL_INTERVAL", "15")),
+        call_timeout_minutes=float(os.getenv("CAMPAIGN_CALL_TIMEOUT_MINUTES", "30"))
+    )
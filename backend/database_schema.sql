@@ -12,6 +12,7 @@ CREATE TABLE IF NOT EXISTS agent_configurations (
     conversation_flow JSONB NOT NULL,
     fallback_responses TEXT[] DEFAULT '{}',
     call_ending_conditions TEXT[] DEFAULT '{}',
+    extraction_stages TEXT[],
     is_active BOOLEAN DEFAULT false,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -28,17 +29,120 @@ CREATE TABLE IF NOT EXISTS call_results (
     duration_seconds INTEGER,
     transcript TEXT DEFAULT '',
     structured_summary JSONB DEFAULT '{}',
+    call_summary TEXT,
     agent_config_id INTEGER REFERENCES agent_configurations(id),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Transcript segments table (append-only utterances of live calls)
+CREATE TABLE IF NOT EXISTS call_transcript_segments (
+    id BIGSERIAL PRIMARY KEY,
+    call_id VARCHAR(50) NOT NULL,
+    seq INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (call_id, seq)
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_agent_configs_active ON agent_configurations(is_active);
 CREATE INDEX IF NOT EXISTS idx_call_results_call_id ON call_results(call_id);
 CREATE INDEX IF NOT EXISTS idx_call_results_agent_config ON call_results(agent_config_id);
 CREATE INDEX IF NOT EXISTS idx_call_results_status ON call_results(status);
 CREATE INDEX IF NOT EXISTS idx_call_results_created_at ON call_results(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_call_results_created_at_id ON call_results(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_call_results_agent_created_at_id ON call_results(agent_config_id, created_at DESC, id DESC);
+
+-- Search document of a call: identifiers (load number, driver) rank above the
+-- call summary, which ranks above the transcript / free-text details
+CREATE OR REPLACE FUNCTION call_search_document(identifiers TEXT, summary TEXT, body TEXT)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(identifiers, '')), 'A') ||
+           setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+           setweight(to_tsvector('english', coalesce(body, '')), 'C')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Search documents of calls. Long transcripts are stored compressed, which
+-- Postgres can't index, so a trigger keeps identifiers and summary current and
+-- the backend sends the plain transcript through index_call_transcript()
+CREATE TABLE IF NOT EXISTS call_search_documents (
+    call_id VARCHAR(50) PRIMARY KEY REFERENCES call_results(call_id) ON DELETE CASCADE,
+    document tsvector NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_search_documents_document ON call_search_documents USING GIN (document);
+
+CREATE OR REPLACE FUNCTION refresh_call_search_document()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- A compressed transcript keeps the transcript part (weight C) of the previous document
+    INSERT INTO call_search_documents (call_id, document)
+    VALUES (
+        NEW.call_id,
+        call_search_document(
+            NEW.load_number || ' ' || NEW.driver_name,
+            NEW.call_summary,
+            CASE WHEN NEW.transcript LIKE 'zb64:%' THEN NULL ELSE NEW.transcript END
+        )
+    )
+    ON CONFLICT (call_id) DO UPDATE SET document = CASE
+        WHEN NEW.transcript LIKE 'zb64:%'
+            THEN EXCLUDED.document || ts_filter(call_search_documents.document, '{c}')
+        ELSE EXCLUDED.document
+    END;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS refresh_call_results_search_document ON call_results;
+CREATE TRIGGER refresh_call_results_search_document
+    AFTER INSERT OR UPDATE OF load_number, driver_name, call_summary, transcript ON call_results
+    FOR EACH ROW EXECUTE FUNCTION refresh_call_search_document();
+
+-- Rebuild a call's search document from the plain text of its compressed transcript
+CREATE OR REPLACE FUNCTION index_call_transcript(target_call_id TEXT, transcript_text TEXT)
+RETURNS VOID AS $$
+    UPDATE call_search_documents d
+    SET document = call_search_document(r.load_number || ' ' || r.driver_name, r.call_summary, transcript_text)
+    FROM call_results r
+    WHERE r.call_id = target_call_id AND d.call_id = r.call_id;
+$$ LANGUAGE sql;
+
+-- Ranked search over call_results (app/ backend). Snippets come from the call
+-- summary and plain transcripts; the backend cuts them from compressed ones.
+CREATE OR REPLACE FUNCTION search_call_results(search_query TEXT, result_limit INTEGER DEFAULT 20, result_offset INTEGER DEFAULT 0)
+RETURNS TABLE (
+    call_id VARCHAR,
+    agent_config_id INTEGER,
+    driver_name VARCHAR,
+    phone_number VARCHAR,
+    load_number VARCHAR,
+    status VARCHAR,
+    created_at TIMESTAMP WITH TIME ZONE,
+    rank REAL,
+    snippet TEXT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH hits AS (
+        SELECT d.call_id, ts_rank_cd(d.document, q) AS hit_rank, q
+        FROM call_search_documents d, websearch_to_tsquery('english', search_query) q
+        WHERE d.document @@ q
+        ORDER BY hit_rank DESC, d.call_id
+        LIMIT result_limit OFFSET result_offset
+    )
+    SELECT r.call_id, r.agent_config_id, r.driver_name, r.phone_number, r.load_number, r.status,
+           r.created_at, h.hit_rank,
+           ts_headline('english',
+                       concat_ws(' ', r.call_summary, CASE WHEN r.transcript LIKE 'zb64:%' THEN NULL ELSE r.transcript END),
+                       h.q, 'MaxFragments=2, MaxWords=20, MinWords=5')
+    FROM hits h
+    JOIN call_results r ON r.call_id = h.call_id
+    ORDER BY h.hit_rank DESC, h.call_id;
+END;
+$$ LANGUAGE plpgsql STABLE;
 
 -- Create a function to update the updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -1,15 +1,34 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 import uvicorn
 
-from app.routers import agent_config, call_management, webhooks, agents
+from app.routers import agent_config, call_management, webhooks, agents, metrics
 from app.core.config import settings
+from app.database.connection import db_executor
+from app.services.retell_service import retell_client
+from app.services.extraction_pipeline import extraction_pipeline
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers on startup; drain them and the database pool on shutdown"""
+    await retell_client.open()
+    extraction_pipeline.start()
+    await webhooks.webhook_queue.start()
+    yield
+    await webhooks.webhook_queue.stop(timeout=settings.webhook_drain_timeout)
+    await webhooks.drain_extractions(timeout=settings.webhook_drain_timeout)
+    extraction_pipeline.shutdown()
+    await webhooks.call_service.flush_pending_writes()
+    await retell_client.aclose()
+    await db_executor.shutdown()
 
 app = FastAPI(
     title="Voice Agent Admin API",
     description="Backend API for managing AI voice agents and call configurations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -19,6 +38,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Next-page cursor / offset of list and search endpoints, read by the dashboard
+    expose_headers=["X-Next-Cursor", "X-Next-Offset"],
 )
 
 # Include routers
@@ -26,6 +47,7 @@ app.include_router(agent_config.router, prefix="/api/v1", tags=["Agent Configura
 app.include_router(call_management.router, prefix="/api/v1", tags=["Call Management"])
 app.include_router(webhooks.router, prefix="/api/v1", tags=["Webhooks"])
 app.include_router(agents.router, prefix="/api/v1", tags=["Agents"])
+app.include_router(metrics.router, prefix="/api/v1", tags=["Metrics"])
 
 @app.get("/")
 async def root():
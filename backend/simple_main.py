@@ -4,16 +4,34 @@ Simple working backend for Voice Agent Admin
 Using Flask instead of FastAPI to avoid Python 3.13 compatibility issues
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, time
+from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
-import httpx
 import os
-from supabase_simple import get_supabase_client
-from retell import Retell
+from supabase_simple import get_async_supabase_client
+from app.core.cache import LRUCache
+from app.core.pagination import decode_cursor, next_cursor
+from app.core.partitioned_processor import PartitionedProcessor
+from app.core.number_pool import FromNumberPool, parse_from_numbers
+from app.core.idempotency import IdempotencyStore, run_idempotent, IDEMPOTENCY_HEADER
+from app.core.dedup import EventDeduplicator, webhook_fingerprint
+from app.core.broadcast import BroadcastHub, TooManySubscribers
+from app.core.fields import (
+    build_select,
+    CALL_RECORD_COLUMNS,
+    CALL_RECORD_LIST_FIELDS,
+    AGENT_CONFIGURATION_COLUMNS,
+    AGENT_CONFIGURATION_LIST_FIELDS,
+)
+from app.services.retell_client import RetellClient
+from app.services.agent_catalog import AgentCatalog
+from campaigns import get_campaign_scheduler, validate_timezone
 
 # Pydantic models for Agent Configuration
 class ConversationStep(BaseModel):
@@ -45,6 +63,31 @@ class CallRequest(BaseModel):
     expected_delivery_time: Optional[datetime] = None
     special_instructions: Optional[str] = Field(None, max_length=1000)
 
+class BatchCallRequest(BaseModel):
+    calls: List[CallRequest] = Field(..., min_items=1, max_items=1000)
+    concurrency: Optional[int] = Field(None, ge=1, le=100, description="Maximum Retell calls dialed at once")
+
+# Pydantic models for Calling Campaigns
+class CampaignEntryRequest(BaseModel):
+    driver_name: str = Field(..., min_length=1, max_length=100)
+    phone_number: str = Field(..., min_length=10, max_length=20)
+    load_number: str = Field(..., min_length=1, max_length=50)
+    delivery_address: Optional[str] = Field(None, max_length=500)
+    expected_delivery_time: Optional[datetime] = None
+    special_instructions: Optional[str] = Field(None, max_length=1000)
+    timezone: Optional[str] = Field(None, description="Driver's IANA timezone, overrides the campaign timezone")
+
+class CampaignCreateRequest(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    agent_config_id: int = Field(..., description="ID of the agent configuration to use")
+    entries: List[CampaignEntryRequest] = Field(..., min_items=1, max_items=10000)
+    max_concurrency: int = Field(5, ge=1, le=100, description="Maximum calls in progress at once")
+    timezone: str = Field("America/Chicago", description="IANA timezone of the calling window")
+    window_start: time = Field(time(8, 0), description="Local time calls may start")
+    window_end: time = Field(time(18, 0), description="Local time calls must stop")
+    max_attempts: int = Field(3, ge=1, le=10, description="Dial attempts per entry when nobody answers")
+    retry_delay_minutes: int = Field(30, ge=0, le=1440)
+
 class CallRecord(BaseModel):
     id: Optional[int] = None
     call_id: str = Field(..., description="Unique call identifier")
@@ -94,39 +137,39 @@ async def create_retell_agent(agent_config: dict) -> str:
             "call_ending_conditions": agent_config.get("call_ending_conditions", [])
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.retellai.com/v1/agent",
-                headers={
-                    "Authorization": f"Bearer {retell_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=agent_request,
-                timeout=30.0
-            )
+        response = await retell.request("POST", "/v1/agent", json=agent_request)
+        
+        if response.status_code == 200:
+            result = response.json()
+            agent_id = result.get("agent_id")
+            print(f"✅ Retell AI agent created: {agent_id}")
+            agent_catalog.invalidate()
+            
+            # Save the Retell agent ID so later calls reuse this agent. The agent
+            # exists either way, so a failed save doesn't fail this call
+            if agent_config.get("id") and supabase:
+                try:
+                    await supabase.set_agent_retell_id(agent_config["id"], agent_id)
+                    agent_config["retell_agent_id"] = agent_id
+                except Exception as e:
+                    print(f"⚠️ Failed to save Retell agent ID for configuration {agent_config['id']}: {e}")
+            
+            return agent_id
+        else:
+            print(f"❌ Retell AI agent creation error: {response.status_code} - {response.text}")
+            return None
             
-            if response.status_code == 200:
-                result = response.json()
-                agent_id = result.get("agent_id")
-                print(f"✅ Retell AI agent created: {agent_id}")
-                
-                # Update agent config with Retell agent ID
-                supabase.update_agent_configuration(agent_config["id"], {"retell_agent_id": agent_id})
-                
-                return agent_id
-            else:
-                print(f"❌ Retell AI agent creation error: {response.status_code} - {response.text}")
-                return None
-                
     except Exception as e:
         print(f"❌ Error creating Retell AI agent: {e}")
         return None
 
 async def initiate_retell_call(agent_config: dict, call_request: CallRequest, call_data: dict) -> str:
-    """Initiate a call using Retell AI API"""
+    """
+    Initiate a call using Retell AI. The caller ID comes from the from-number pool
+    and is written to call_data["from_number"] so it can be saved on the call record.
+    """
     retell_api_key = os.getenv("RETELL_API_KEY")
     retell_webhook_url = os.getenv("RETELL_WEBHOOK_URL")
-    retell_from_number = os.getenv("RETELL_FROM_NUMBER")  # Your verified Retell AI number
     
     if not retell_api_key:
         print("⚠️ RETELL_API_KEY not found. Using simulation mode.")
@@ -134,11 +177,12 @@ async def initiate_retell_call(agent_config: dict, call_request: CallRequest, ca
         import uuid
         return f"retell_sim_{str(uuid.uuid4())}"
     
-    if not retell_from_number:
-        print("⚠️ RETELL_FROM_NUMBER not found. Please set your verified Retell AI phone number.")
+    if not len(from_number_pool):
+        print("⚠️ RETELL_FROM_NUMBERS not found. Please set your verified Retell AI phone numbers.")
         import uuid
         return f"retell_error_{str(uuid.uuid4())}"
     
+    call_id = call_data.get("call_id")
     try:
         # Get or create Retell AI agent
         agent_id = await create_retell_agent(agent_config)
@@ -147,13 +191,21 @@ async def initiate_retell_call(agent_config: dict, call_request: CallRequest, ca
             import uuid
             return f"retell_error_{str(uuid.uuid4())}"
         
+        # Reserve the least-loaded verified number; released when the call ends
+        retell_from_number = await from_number_pool.acquire(call_id, timeout=FROM_NUMBER_WAIT)
+        if not retell_from_number:
+            print(f"❌ No from-number available for call {call_id} after {FROM_NUMBER_WAIT:.0f}s")
+            import uuid
+            return f"retell_error_{str(uuid.uuid4())}"
+        call_data["from_number"] = retell_from_number
+        
         # Prepare Retell AI call request
         retell_request = {
             "from_number": retell_from_number,
             "to_number": call_request.phone_number,
             "agent_id": agent_id,
             "metadata": {
-                "call_id": call_data.get("call_id"),
+                "call_id": call_id,
                 "driver_name": call_request.driver_name,
                 "load_number": call_request.load_number,
                 "delivery_address": call_request.delivery_address,
@@ -166,48 +218,137 @@ async def initiate_retell_call(agent_config: dict, call_request: CallRequest, ca
             retell_request["webhook_url"] = retell_webhook_url
         
         # Make request to Retell AI
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.retellai.com/v2/create-phone-call",
-                headers={
-                    "Authorization": f"Bearer {retell_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=retell_request,
-                timeout=30.0
-            )
+        response = await retell.request("POST", "/v2/create-phone-call", endpoint_class="call", json=retell_request)
+        
+        if response.status_code == 200:
+            result = response.json()
+            retell_call_id = result.get("call_id")
+            print(f"✅ Retell AI call initiated: {retell_call_id}")
+            print(f"📞 Calling {call_request.phone_number} from {retell_from_number}")
+            return retell_call_id
+        else:
+            print(f"❌ Retell AI API error: {response.status_code} - {response.text}")
+            await from_number_pool.release(call_id)
+            # Fallback to simulation
+            import uuid
+            return f"retell_error_{str(uuid.uuid4())}"
             
-            if response.status_code == 200:
-                result = response.json()
-                retell_call_id = result.get("call_id")
-                print(f"✅ Retell AI call initiated: {retell_call_id}")
-                print(f"📞 Calling {call_request.phone_number} from {retell_from_number}")
-                return retell_call_id
-            else:
-                print(f"❌ Retell AI API error: {response.status_code} - {response.text}")
-                # Fallback to simulation
-                import uuid
-                return f"retell_error_{str(uuid.uuid4())}"
-                
     except Exception as e:
         print(f"❌ Error calling Retell AI: {e}")
+        await from_number_pool.release(call_id)
         # Fallback to simulation
         import uuid
         return f"retell_error_{str(uuid.uuid4())}"
 
 # Initialize Supabase configuration
 try:
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     print("✅ Supabase connection initialized successfully")
 except Exception as e:
     print(f"❌ Failed to initialize Supabase: {e}")
     print("Please check your SUPABASE_URL and SUPABASE_ANON_KEY environment variables")
     supabase = None
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled connections and start workers on startup, drain and release them on shutdown"""
+    if supabase:
+        await supabase.open()
+    await retell.open()
+    await webhook_queue.start()
+    if supabase and CAMPAIGN_SCHEDULER_ENABLED:
+        await campaign_scheduler.start()
+    yield
+    await campaign_scheduler.stop()
+    await webhook_queue.stop(timeout=float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30")))
+    await retell.aclose()
+    if supabase:
+        await supabase.aclose()
+
+# Default number of Retell calls a batch trigger dials concurrently
+RETELL_BATCH_CONCURRENCY = int(os.getenv("RETELL_BATCH_CONCURRENCY", "10"))
+
+# Shared Retell AI client, connections are reused across requests
+# Outbound requests are paced per endpoint class with token buckets (requests/second, burst)
+retell = RetellClient(
+    api_key=os.getenv("RETELL_API_KEY"),
+    max_connections=int(os.getenv("RETELL_MAX_CONNECTIONS", "20")),
+    rate_limits={
+        "call": (float(os.getenv("RETELL_CALL_RATE", "5")), int(os.getenv("RETELL_CALL_BURST", "10"))),
+        "agent": (float(os.getenv("RETELL_AGENT_RATE", "2")), int(os.getenv("RETELL_AGENT_BURST", "5"))),
+        "read": (float(os.getenv("RETELL_READ_RATE", "10")), int(os.getenv("RETELL_READ_BURST", "20")))
+    },
+    rate_limit_max_wait=float(os.getenv("RETELL_RATE_LIMIT_MAX_WAIT", "30"))
+)
+
+# Bounded retell_call_id -> call_id map, filled when calls are triggered so
+# webhooks can resolve their call record without querying Supabase
+retell_call_map = LRUCache(maxsize=int(os.getenv("RETELL_CALL_MAP_SIZE", "10000")))
+
+async def finished_call_ids(call_ids: list) -> list:
+    """Calls the database records as finished, so any process can free their from-numbers"""
+    if not supabase:
+        return []
+    return await supabase.get_finished_call_ids(call_ids, FINAL_CALL_STATUSES)
+
+# Verified caller-ID numbers as "number[:max_concurrent],..."; a single
+# RETELL_FROM_NUMBER is still accepted. The final webhook of a call may reach
+# another server process, so holds are also released from the call's stored status
+from_number_pool = FromNumberPool(
+    parse_from_numbers(
+        os.getenv("RETELL_FROM_NUMBERS") or os.getenv("RETELL_FROM_NUMBER"),
+        default_limit=int(os.getenv("RETELL_FROM_NUMBER_MAX_CONCURRENCY", "5"))
+    ),
+    cooldown=float(os.getenv("RETELL_FROM_NUMBER_COOLDOWN", "300")),
+    finished_calls=finished_call_ids,
+    reconcile_interval=float(os.getenv("RETELL_FROM_NUMBER_RECONCILE_INTERVAL", "5"))
+)
+# Seconds a call waits for a free from-number before it fails
+FROM_NUMBER_WAIT = float(os.getenv("RETELL_FROM_NUMBER_WAIT", "30"))
+
+# Idempotency-Key -> response for call triggers and agent creation, so client
+# and proxy retries never place a second call or create a second agent
+idempotency_store = IdempotencyStore(
+    maxsize=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+)
+
+# Live call updates for /api/v1/calls/stream subscribers, published after webhook updates
+call_events = BroadcastHub(
+    queue_size=int(os.getenv("STREAM_QUEUE_SIZE", "100")),
+    max_subscribers=int(os.getenv("STREAM_MAX_SUBSCRIBERS", "500"))
+)
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+# Call record statuses after which webhooks may no longer move a call back
+FINAL_CALL_STATUSES = ["completed", "failed"]
+
+# Retell disconnection reasons that point at the caller-ID number or its carrier
+CARRIER_ERROR_REASONS = {"dial_failed"}
+
+async def fetch_retell_agents() -> List[dict]:
+    """Fetch the full agent list from Retell AI"""
+    response = await retell.request("GET", "/list-agents")
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to retrieve agents: {response.status_code} - {response.text}")
+    agents_data = response.json()
+    # The API returns an array directly, not wrapped in a data object
+    if isinstance(agents_data, list):
+        return agents_data
+    return agents_data.get("data", [])
+
+# Retell agent list plus agent_id index, served stale while it refreshes in the background
+agent_catalog = AgentCatalog(
+    fetch_retell_agents,
+    ttl=float(os.getenv("AGENT_CATALOG_TTL", "60")),
+    max_stale=float(os.getenv("AGENT_CATALOG_MAX_STALE", "3600"))
+)
+
 app = FastAPI(
     title="Voice Agent Admin API",
     description="Backend API for managing AI voice agents and call configurations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -227,6 +368,25 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/api/v1/metrics")
+async def get_metrics():
+    """In-process cache and queue counters for monitoring"""
+    return {
+        "agent_config_cache": supabase.agent_config_cache.stats() if supabase else None,
+        "agent_catalog": agent_catalog.stats(),
+        "single_flight": {
+            "supabase": supabase.single_flight.stats() if supabase else None,
+            "retell": retell.single_flight.stats()
+        },
+        "retell_rate_limits": retell.limiter.stats(),
+        "campaign_scheduler": campaign_scheduler.stats(),
+        "from_numbers": from_number_pool.stats(),
+        "idempotency": idempotency_store.stats(),
+        "webhook_queue": webhook_queue.stats(),
+        "webhook_dedup": webhook_dedup.stats(),
+        "call_events": call_events.stats()
+    }
+
 @app.get("/api/v1/test")
 async def test_endpoint():
     return {"message": "Backend is working!", "endpoint": "test"}
@@ -255,7 +415,7 @@ async def create_agent_configuration(config: AgentConfiguration):
         }
         
         # Create in Supabase
-        result = supabase.create_agent_configuration(config_data)
+        result = await supabase.create_agent_configuration(config_data)
         
         return {
             "message": "Agent configuration created successfully",
@@ -264,14 +424,22 @@ async def create_agent_configuration(config: AgentConfiguration):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create agent configuration: {str(e)}")
 
+def _select_fields(fields: Optional[str], allowed, default) -> str:
+    """Translate a `fields=` query parameter into a PostgREST projection, 400 on unknown columns"""
+    try:
+        return build_select(fields, allowed, default)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/api/v1/agent-configurations")
-async def get_agent_configurations():
-    """Get all agent configurations"""
+async def get_agent_configurations(fields: Optional[str] = None):
+    """Get all agent configurations (lean columns unless `fields` is given, `fields=*` for full rows)"""
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not available")
+    select = _select_fields(fields, AGENT_CONFIGURATION_COLUMNS, AGENT_CONFIGURATION_LIST_FIELDS)
     
     try:
-        configurations = supabase.get_agent_configurations()
+        configurations = await supabase.get_agent_configurations(select=select)
         return {
             "configurations": configurations,
             "count": len(configurations)
@@ -286,7 +454,7 @@ async def get_agent_configuration(config_id: int):
         raise HTTPException(status_code=500, detail="Database connection not available")
     
     try:
-        config = supabase.get_agent_configuration(config_id)
+        config = await supabase.get_agent_configuration(config_id)
         if not config:
             raise HTTPException(status_code=404, detail="Agent configuration not found")
         return config
@@ -314,7 +482,7 @@ async def update_agent_configuration(config_id: int, config_update: AgentConfigu
         }
         
         # Update in Supabase
-        result = supabase.update_agent_configuration(config_id, config_data)
+        result = await supabase.update_agent_configuration(config_id, config_data)
         
         return {
             "message": "Agent configuration updated successfully",
@@ -331,7 +499,7 @@ async def delete_agent_configuration(config_id: int):
     
     try:
         # Delete from Supabase
-        deleted_config = supabase.delete_agent_configuration(config_id)
+        deleted_config = await supabase.delete_agent_configuration(config_id)
         
         return {
             "message": "Agent configuration deleted successfully",
@@ -341,47 +509,74 @@ async def delete_agent_configuration(config_id: int):
         raise HTTPException(status_code=500, detail=f"Failed to delete agent configuration: {str(e)}")
 
 # Call Management endpoints
+def _build_call_data(call_request: CallRequest) -> dict:
+    """Build a new call record with a unique call ID for a trigger request"""
+    import uuid
+    call_id = f"CALL-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+    
+    return {
+        "call_id": call_id,
+        "agent_config_id": call_request.agent_config_id,
+        "driver_name": call_request.driver_name,
+        "phone_number": call_request.phone_number,
+        "load_number": call_request.load_number,
+        "delivery_address": call_request.delivery_address,
+        "expected_delivery_time": call_request.expected_delivery_time.isoformat() if call_request.expected_delivery_time else None,
+        "special_instructions": call_request.special_instructions,
+        "status": "initiated",
+        "start_time": datetime.now().isoformat()
+    }
+
 @app.post("/api/v1/calls/trigger")
-async def trigger_test_call(call_request: CallRequest):
-    """Trigger a test call using the specified agent configuration"""
+async def trigger_test_call(
+    call_request: CallRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    """Trigger a test call using the specified agent configuration; retries with the same Idempotency-Key replay the first response"""
+    return await run_idempotent(
+        idempotency_store, "calls/trigger", idempotency_key, call_request.dict(), response,
+        lambda: _trigger_test_call(call_request)
+    )
+
+async def _trigger_test_call(call_request: CallRequest) -> dict:
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not available")
     
     try:
         # Verify agent configuration exists
-        agent_config = supabase.get_agent_configuration(call_request.agent_config_id)
+        agent_config = await supabase.get_agent_configuration(call_request.agent_config_id)
         if not agent_config:
             raise HTTPException(status_code=404, detail="Agent configuration not found")
         
-        # Generate unique call ID
-        import uuid
-        call_id = f"CALL-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
-        
         # Create call record
-        call_data = {
-            "call_id": call_id,
-            "agent_config_id": call_request.agent_config_id,
-            "driver_name": call_request.driver_name,
-            "phone_number": call_request.phone_number,
-            "load_number": call_request.load_number,
-            "delivery_address": call_request.delivery_address,
-            "expected_delivery_time": call_request.expected_delivery_time.isoformat() if call_request.expected_delivery_time else None,
-            "special_instructions": call_request.special_instructions,
-            "status": "initiated",
-            "start_time": datetime.now().isoformat()
-        }
+        call_data = _build_call_data(call_request)
+        call_id = call_data["call_id"]
         
-        call_record = supabase.create_call_record(call_data)
+        call_record = await supabase.create_call_record(call_data)
         
         # Integrate with Retell AI API
         retell_call_id = await initiate_retell_call(agent_config, call_request, call_data)
         
+        # A failed dial is recorded like in the batch path and answered with an
+        # error, so an Idempotency-Key retry dials again instead of replaying it
+        if retell_call_id.startswith("retell_error_"):
+            await supabase.update_call_record(call_id, {
+                "retell_call_id": retell_call_id,
+                "from_number": call_data.get("from_number"),
+                "status": "failed"
+            }, unless_status=FINAL_CALL_STATUSES)
+            raise HTTPException(status_code=502, detail=f"Failed to initiate Retell AI call for call {call_id}")
+        
         # Update call record with retell call ID and status
         update_data = {
             "retell_call_id": retell_call_id,
+            "from_number": call_data.get("from_number"),
             "status": "in_progress"
         }
-        updated_call = supabase.update_call_record(call_id, update_data)
+        # A webhook may already have finished the call; don't move it back
+        updated_call = await supabase.update_call_record(call_id, update_data, unless_status=FINAL_CALL_STATUSES)
+        retell_call_map.set(retell_call_id, call_id)
         
         return {
             "message": "Test call initiated successfully",
@@ -396,6 +591,100 @@ async def trigger_test_call(call_request: CallRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to trigger test call: {str(e)}")
 
+@app.post("/api/v1/calls/trigger/batch")
+async def trigger_batch_calls(
+    batch_request: BatchCallRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    """Trigger many calls at once; retries with the same Idempotency-Key replay the first response"""
+    return await run_idempotent(
+        idempotency_store, "calls/trigger/batch", idempotency_key, batch_request.dict(), response,
+        lambda: _trigger_batch_calls(batch_request)
+    )
+
+async def _trigger_batch_calls(batch_request: BatchCallRequest) -> dict:
+    """One config lookup per agent, one bulk insert, bounded concurrent dialing"""
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database connection not available")
+    
+    try:
+        # Look up each distinct agent configuration once
+        config_ids = list({call.agent_config_id for call in batch_request.calls})
+        fetched = await asyncio.gather(*(supabase.get_agent_configuration(config_id) for config_id in config_ids))
+        agent_configs = dict(zip(config_ids, fetched))
+        
+        # Resolve the Retell agent once per configuration so calls don't each create one
+        if os.getenv("RETELL_API_KEY"):
+            for agent_config in agent_configs.values():
+                if agent_config and not agent_config.get("retell_agent_id"):
+                    agent_id = await create_retell_agent(agent_config)
+                    if agent_id:
+                        agent_config["retell_agent_id"] = agent_id
+        
+        results = []
+        pending = []
+        for index, call_request in enumerate(batch_request.calls):
+            if not agent_configs.get(call_request.agent_config_id):
+                results.append({
+                    "index": index,
+                    "status": "failed",
+                    "error": "Agent configuration not found"
+                })
+            else:
+                pending.append((index, call_request, _build_call_data(call_request)))
+        
+        # Insert every call record in a single request
+        if pending:
+            await supabase.create_call_records([call_data for _, _, call_data in pending])
+        
+        semaphore = asyncio.Semaphore(batch_request.concurrency or RETELL_BATCH_CONCURRENCY)
+        
+        async def dispatch(index: int, call_request: CallRequest, call_data: dict) -> dict:
+            call_id = call_data["call_id"]
+            async with semaphore:
+                try:
+                    agent_config = agent_configs[call_request.agent_config_id]
+                    retell_call_id = await initiate_retell_call(agent_config, call_request, call_data)
+                    status = "failed" if retell_call_id.startswith("retell_error_") else "in_progress"
+                    await supabase.update_call_record(call_id, {
+                        "retell_call_id": retell_call_id,
+                        "from_number": call_data.get("from_number"),
+                        "status": status
+                    }, unless_status=FINAL_CALL_STATUSES)
+                    retell_call_map.set(retell_call_id, call_id)
+                    return {
+                        "index": index,
+                        "call_id": call_id,
+                        "retell_call_id": retell_call_id,
+                        "status": status
+                    }
+                except Exception as e:
+                    print(f"❌ Error dispatching batch call {call_id}: {e}")
+                    return {
+                        "index": index,
+                        "call_id": call_id,
+                        "status": "failed",
+                        "error": str(e)
+                    }
+        
+        results.extend(await asyncio.gather(*(dispatch(*item) for item in pending)))
+        results.sort(key=lambda result: result["index"])
+        
+        initiated = sum(1 for result in results if result["status"] == "in_progress")
+        return {
+            "message": f"Batch processed: {initiated} of {len(results)} calls initiated",
+            "total": len(results),
+            "initiated": initiated,
+            "failed": len(results) - initiated,
+            "results": results
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to trigger batch calls: {str(e)}")
+
 @app.post("/api/v1/calls/web-call")
 async def create_web_call(web_call_request: WebCallRequest):
     """Create a web call using Retell AI"""
@@ -405,11 +694,9 @@ async def create_web_call(web_call_request: WebCallRequest):
         if not retell_api_key:
             raise HTTPException(status_code=500, detail="Retell API key not configured")
         
-        # Initialize Retell client
-        client = Retell(api_key=retell_api_key)
-        
-        # Create web call
-        web_call_response = client.call.create_web_call(
+        # Create web call through the shared async Retell client
+        await retell.acquire("call")
+        web_call_response = await retell.sdk.call.create_web_call(
             agent_id=web_call_request.agent_id
         )
         
@@ -449,11 +736,9 @@ async def create_phone_call(phone_call_request: PhoneCallRequest):
         if not retell_api_key:
             raise HTTPException(status_code=500, detail="Retell API key not configured")
         
-        # Initialize Retell client
-        client = Retell(api_key=retell_api_key)
-        
-        # Create phone call
-        phone_call_response = client.call.create_phone_call(
+        # Create phone call through the shared async Retell client
+        await retell.acquire("call")
+        phone_call_response = await retell.sdk.call.create_phone_call(
             from_number=phone_call_request.from_number,
             to_number=phone_call_request.to_number,
         )
@@ -480,23 +765,76 @@ async def create_phone_call(phone_call_request: PhoneCallRequest):
         print(f"❌ Error creating phone call: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create phone call: {str(e)}")
 
+def _validate_cursor(cursor: Optional[str]) -> None:
+    """Reject malformed pagination cursors with a 400 before hitting the database"""
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
 @app.get("/api/v1/calls")
-async def get_call_records(limit: int = 50, offset: int = 0):
-    """Get call records with pagination"""
+async def get_call_records(limit: int = 50, offset: int = 0, cursor: Optional[str] = None, fields: Optional[str] = None):
+    """Get call records with pagination (pass next_cursor back as cursor for constant-cost paging)"""
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not available")
+    _validate_cursor(cursor)
+    select = _select_fields(fields, CALL_RECORD_COLUMNS, CALL_RECORD_LIST_FIELDS)
     
     try:
-        call_records = supabase.get_call_records(limit=limit, offset=offset)
+        call_records = await supabase.get_call_records(limit=limit, offset=offset, cursor=cursor, select=select)
         return {
             "call_records": call_records,
             "count": len(call_records),
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor(call_records, limit)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch call records: {str(e)}")
 
+# Largest page of search hits returned at once
+MAX_SEARCH_LIMIT = 100
+
+# Declared before /api/v1/calls/{call_id} so "search" is not taken for a call ID
+@app.get("/api/v1/calls/search")
+async def search_call_records(q: str, limit: int = 20, offset: int = 0):
+    """Ranked full-text search over call summaries, load numbers and driver names"""
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database connection not available")
+    query = q.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Search query must not be empty")
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    offset = max(offset, 0)
+    
+    try:
+        hits = await supabase.search_call_records(query, limit=limit, offset=offset)
+        return {
+            "query": query,
+            "results": hits,
+            "count": len(hits),
+            "limit": limit,
+            "offset": offset,
+            "next_offset": offset + limit if len(hits) >= limit else None
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search call records: {str(e)}")
+
+# Also declared before /api/v1/calls/{call_id}
+@app.get("/api/v1/calls/stream")
+async def stream_call_events(request: Request, call_id: Optional[str] = None, agent_config_id: Optional[int] = None):
+    """Server-Sent Events stream of live call status updates, optionally limited to one call or agent"""
+    try:
+        subscription = call_events.subscribe(call_id=call_id, agent_config_id=agent_config_id)
+    except TooManySubscribers as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        call_events.stream(subscription, STREAM_HEARTBEAT, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/v1/calls/{call_id}")
 async def get_call_record(call_id: str):
     """Get a specific call record by call ID"""
@@ -504,7 +842,7 @@ async def get_call_record(call_id: str):
         raise HTTPException(status_code=500, detail="Database connection not available")
     
     try:
-        call_record = supabase.get_call_record(call_id)
+        call_record = await supabase.get_call_record(call_id)
         if not call_record:
             raise HTTPException(status_code=404, detail="Call record not found")
         return call_record
@@ -521,7 +859,7 @@ async def update_call_status(call_id: str, status_update: CallStatusUpdate):
     
     try:
         # Verify call record exists
-        call_record = supabase.get_call_record(call_id)
+        call_record = await supabase.get_call_record(call_id)
         if not call_record:
             raise HTTPException(status_code=404, detail="Call record not found")
         
@@ -543,7 +881,7 @@ async def update_call_status(call_id: str, status_update: CallStatusUpdate):
             update_data["duration_seconds"] = status_update.duration_seconds
         
         # Update call record
-        updated_call = supabase.update_call_record(call_id, update_data)
+        updated_call = await supabase.update_call_record(call_id, update_data)
         
         return {
             "message": "Call status updated successfully",
@@ -556,23 +894,26 @@ async def update_call_status(call_id: str, status_update: CallStatusUpdate):
         raise HTTPException(status_code=500, detail=f"Failed to update call status: {str(e)}")
 
 @app.get("/api/v1/calls/agent/{agent_config_id}")
-async def get_calls_by_agent(agent_config_id: int, limit: int = 50):
+async def get_calls_by_agent(agent_config_id: int, limit: int = 50, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get call records for a specific agent configuration"""
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not available")
+    _validate_cursor(cursor)
+    select = _select_fields(fields, CALL_RECORD_COLUMNS, CALL_RECORD_LIST_FIELDS)
     
     try:
         # Verify agent configuration exists
-        agent_config = supabase.get_agent_configuration(agent_config_id)
+        agent_config = await supabase.get_agent_configuration(agent_config_id)
         if not agent_config:
             raise HTTPException(status_code=404, detail="Agent configuration not found")
         
-        call_records = supabase.get_call_records_by_agent(agent_config_id, limit=limit)
+        call_records = await supabase.get_call_records_by_agent(agent_config_id, limit=limit, cursor=cursor, select=select)
         return {
             "call_records": call_records,
             "count": len(call_records),
             "agent_config": agent_config,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor(call_records, limit)
         }
     except HTTPException:
         raise
@@ -580,22 +921,25 @@ async def get_calls_by_agent(agent_config_id: int, limit: int = 50):
         raise HTTPException(status_code=500, detail=f"Failed to fetch call records for agent: {str(e)}")
 
 @app.get("/api/v1/calls/status/{status}")
-async def get_calls_by_status(status: str, limit: int = 50):
+async def get_calls_by_status(status: str, limit: int = 50, cursor: Optional[str] = None, fields: Optional[str] = None):
     """Get call records by status"""
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not available")
+    _validate_cursor(cursor)
+    select = _select_fields(fields, CALL_RECORD_COLUMNS, CALL_RECORD_LIST_FIELDS)
     
     try:
         valid_statuses = ["initiated", "in_progress", "completed", "failed"]
         if status not in valid_statuses:
             raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
         
-        call_records = supabase.get_call_records_by_status(status, limit=limit)
+        call_records = await supabase.get_call_records_by_status(status, limit=limit, cursor=cursor, select=select)
         return {
             "call_records": call_records,
             "count": len(call_records),
             "status": status,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor(call_records, limit)
         }
     except HTTPException:
         raise
@@ -616,33 +960,8 @@ async def get_all_agents():
         }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.retellai.com/list-agents",
-                headers={
-                    "Authorization": f"Bearer {retell_api_key}",
-                    "Content-Type": "application/json"
-                },
-                timeout=30.0
-            )
-            
-            if response.status_code == 200:
-                agents_data = response.json()
-                # The API returns an array directly, not wrapped in a data object
-                if isinstance(agents_data, list):
-                    print(f"✅ Successfully retrieved {len(agents_data)} agents")
-                    return {"data": agents_data}
-                else:
-                    print(f"✅ Successfully retrieved {len(agents_data.get('data', []))} agents")
-                    return agents_data
-            else:
-                print(f"❌ Failed to get agents: {response.status_code} - {response.text}")
-                return {
-                    "data": [],
-                    "message": f"Failed to retrieve agents: {response.status_code}",
-                    "error": response.text
-                }
-                
+        agents = await agent_catalog.get_all()
+        return {"data": agents}
     except Exception as e:
         print(f"❌ Error getting agents: {e}")
         return {
@@ -660,25 +979,26 @@ async def get_agent_by_id(agent_id: str):
         raise HTTPException(status_code=500, detail="RETELL_API_KEY not configured")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.retellai.com/v2/get-agent/{agent_id}",
-                headers={
-                    "Authorization": f"Bearer {retell_api_key}",
-                    "Content-Type": "application/json"
-                },
-                timeout=30.0
+        try:
+            agent = await agent_catalog.get(agent_id)
+        except Exception as e:
+            print(f"⚠️ Agent catalog unavailable, fetching agent directly: {e}")
+            agent = None
+        if agent:
+            return agent
+        
+        # Not in the catalog (e.g. created elsewhere since the last refresh)
+        response = await retell.request("GET", f"/v2/get-agent/{agent_id}")
+        
+        if response.status_code == 200:
+            agent_data = response.json()
+            return agent_data
+        else:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Failed to get agent: {response.text}"
             )
             
-            if response.status_code == 200:
-                agent_data = response.json()
-                return agent_data
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Failed to get agent: {response.text}"
-                )
-                
     except HTTPException:
         raise
     except Exception as e:
@@ -698,8 +1018,18 @@ class AgentCreationRequest(BaseModel):
     is_active: bool = True
 
 @app.post("/api/v1/agents/create")
-async def create_agent(agent_request: AgentCreationRequest):
-    """Create a new agent in both Supabase and Retell AI"""
+async def create_agent(
+    agent_request: AgentCreationRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
+):
+    """Create a new agent in both Supabase and Retell AI; retries with the same Idempotency-Key replay the first response"""
+    return await run_idempotent(
+        idempotency_store, "agents/create", idempotency_key, agent_request.dict(), response,
+        lambda: _create_agent(agent_request)
+    )
+
+async def _create_agent(agent_request: AgentCreationRequest) -> dict:
     try:
         # First, save the configuration to Supabase
         conversation_steps = [
@@ -726,6 +1056,7 @@ async def create_agent(agent_request: AgentCreationRequest):
         
         # Prepare data for Retell AI
         retell_config = {
+            "id": saved_config["config"].get("id"),
             "agent_name": agent_request.agent_name,
             "greeting": agent_request.greeting,
             "primary_objective": agent_request.primary_objective,
@@ -748,7 +1079,7 @@ async def create_agent(agent_request: AgentCreationRequest):
         return {
             "message": "Agent created successfully",
             "agent_id": retell_agent_id,
-            "config_id": saved_config.get("id"),
+            "config_id": saved_config["config"].get("id"),
             "retell_agent": {"agent_id": retell_agent_id},
             "config": saved_config
         }
@@ -762,6 +1093,165 @@ async def create_agent(agent_request: AgentCreationRequest):
             detail="Internal server error"
         )
 
+# Campaign endpoints
+async def dial_campaign_entry(campaign: dict, entry: dict) -> dict:
+    """Place one campaign call through the same path as /calls/trigger"""
+    agent_config = await supabase.get_agent_configuration(campaign["agent_config_id"])
+    if not agent_config:
+        return {"status": "failed", "error": "Agent configuration not found"}
+    
+    call_request = CallRequest(
+        agent_config_id=campaign["agent_config_id"],
+        driver_name=entry["driver_name"],
+        phone_number=entry["phone_number"],
+        load_number=entry["load_number"],
+        delivery_address=entry.get("delivery_address"),
+        expected_delivery_time=entry.get("expected_delivery_time"),
+        special_instructions=entry.get("special_instructions")
+    )
+    call_data = _build_call_data(call_request)
+    call_id = call_data["call_id"]
+    
+    await supabase.create_call_record(call_data)
+    await supabase.update_campaign_entry(entry["id"], {"last_call_id": call_id})
+    
+    retell_call_id = await initiate_retell_call(agent_config, call_request, call_data)
+    status = "failed" if retell_call_id.startswith("retell_error_") else "in_progress"
+    await supabase.update_call_record(call_id, {
+        "retell_call_id": retell_call_id,
+        "from_number": call_data.get("from_number"),
+        "status": status
+    }, unless_status=FINAL_CALL_STATUSES)
+    retell_call_map.set(retell_call_id, call_id)
+    return {"status": status, "call_id": call_id, "retell_call_id": retell_call_id}
+
+CAMPAIGN_SCHEDULER_ENABLED = os.getenv("CAMPAIGN_SCHEDULER_ENABLED", "true").lower() == "true"
+campaign_scheduler = get_campaign_scheduler(supabase, dial_campaign_entry)
+
+@app.post("/api/v1/campaigns")
+async def create_campaign(campaign_request: CampaignCreateRequest):
+    """Create a calling campaign; the scheduler starts dialing its entries in the calling window"""
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database connection not available")
+    
+    try:
+        for tz_name in {campaign_request.timezone, *(entry.timezone for entry in campaign_request.entries if entry.timezone)}:
+            validate_timezone(tz_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        agent_config = await supabase.get_agent_configuration(campaign_request.agent_config_id)
+        if not agent_config:
+            raise HTTPException(status_code=404, detail="Agent configuration not found")
+        
+        campaign = await supabase.create_campaign({
+            "name": campaign_request.name,
+            "agent_config_id": campaign_request.agent_config_id,
+            "status": "active",
+            "max_concurrency": campaign_request.max_concurrency,
+            "timezone": campaign_request.timezone,
+            "window_start": campaign_request.window_start.isoformat(),
+            "window_end": campaign_request.window_end.isoformat(),
+            "max_attempts": campaign_request.max_attempts,
+            "retry_delay_minutes": campaign_request.retry_delay_minutes
+        })
+        
+        entries = [
+            {
+                "campaign_id": campaign["id"],
+                "driver_name": entry.driver_name,
+                "phone_number": entry.phone_number,
+                "load_number": entry.load_number,
+                "delivery_address": entry.delivery_address,
+                "expected_delivery_time": entry.expected_delivery_time.isoformat() if entry.expected_delivery_time else None,
+                "special_instructions": entry.special_instructions,
+                "timezone": entry.timezone
+            }
+            for entry in campaign_request.entries
+        ]
+        # Insert in chunks to keep each request body reasonably sized
+        for start in range(0, len(entries), 500):
+            await supabase.create_campaign_entries(entries[start:start + 500])
+        
+        return {
+            "message": f"Campaign created with {len(entries)} entries",
+            "campaign": campaign
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create campaign: {str(e)}")
+
+@app.get("/api/v1/campaigns")
+async def get_campaigns(status: Optional[str] = None):
+    """Get all campaigns, optionally filtered by status"""
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database connection not available")
+    
+    try:
+        return await supabase.get_campaigns(status=status)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch campaigns: {str(e)}")
+
+@app.get("/api/v1/campaigns/{campaign_id}")
+async def get_campaign(campaign_id: int):
+    """Get a campaign with its progress counters"""
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database connection not available")
+    
+    try:
+        campaign = await supabase.get_campaign(campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        
+        return {
+            **campaign,
+            "progress": await campaign_scheduler.progress(campaign_id)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch campaign: {str(e)}")
+
+async def _set_campaign_status(campaign_id: int, status: str, allowed_from: tuple) -> dict:
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database connection not available")
+    
+    try:
+        campaign = await supabase.get_campaign(campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        if campaign["status"] not in allowed_from:
+            raise HTTPException(status_code=409, detail=f"Campaign is {campaign['status']}")
+        
+        return await supabase.update_campaign(campaign_id, {"status": status})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update campaign: {str(e)}")
+
+@app.post("/api/v1/campaigns/{campaign_id}/pause")
+async def pause_campaign(campaign_id: int):
+    """Stop dialing new entries; calls already in progress finish normally"""
+    return await _set_campaign_status(campaign_id, "paused", ("active",))
+
+@app.post("/api/v1/campaigns/{campaign_id}/resume")
+async def resume_campaign(campaign_id: int):
+    """Resume dialing a paused campaign"""
+    return await _set_campaign_status(campaign_id, "active", ("paused",))
+
+@app.post("/api/v1/campaigns/{campaign_id}/cancel")
+async def cancel_campaign(campaign_id: int):
+    """Cancel a campaign; entries that were never dialed are not called"""
+    campaign = await _set_campaign_status(campaign_id, "cancelled", ("active", "paused"))
+    try:
+        await supabase.cancel_pending_campaign_entries(campaign_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to cancel campaign entries: {str(e)}")
+    return campaign
+
 # Test endpoint to verify webhook is accessible
 @app.get("/api/v1/webhooks/retell")
 async def webhook_test():
@@ -772,6 +1262,123 @@ async def webhook_test():
         "webhook_url": "http://localhost:8000/api/v1/webhooks/retell"
     }
 
+# Webhook ingestion: "queue" acks as soon as the event is validated and lets
+# background workers apply it, "inline" processes it before responding
+WEBHOOK_INGEST_MODE = os.getenv("WEBHOOK_INGEST_MODE", "queue").lower()
+
+async def process_retell_webhook(webhook_data: dict) -> dict:
+    """Apply a Retell AI webhook event to its call record"""
+    # Extract call information from webhook
+    retell_call_id = webhook_data.get("call_id")
+    call_status = webhook_data.get("call_status")
+    call_summary = webhook_data.get("call_summary")
+    end_time = webhook_data.get("end_time")
+    duration_seconds = webhook_data.get("duration_seconds")
+    
+    # Resolve our call_id from the in-process map, falling back to an indexed lookup
+    call_id = retell_call_map.get(retell_call_id)
+    if not call_id:
+        call_record = await supabase.get_call_record_by_retell_id(retell_call_id)
+        if not call_record:
+            print(f"⚠️ Call record not found for retell_call_id: {retell_call_id}")
+            return {"message": "Call record not found"}
+        call_id = call_record["call_id"]
+        retell_call_map.set(retell_call_id, call_id)
+    
+    # Map Retell AI status to our status
+    status_mapping = {
+        "queued": "initiated",
+        "ringing": "in_progress", 
+        "in_progress": "in_progress",
+        "ended": "completed",
+        "failed": "failed"
+    }
+    
+    mapped_status = status_mapping.get(call_status, "in_progress")
+    
+    # Prepare update data
+    update_data = {
+        "status": mapped_status
+    }
+    
+    if call_summary:
+        update_data["call_summary"] = call_summary
+    
+    if end_time:
+        # Convert end_time to ISO format if it's a string
+        if isinstance(end_time, str):
+            update_data["end_time"] = end_time
+        else:
+            update_data["end_time"] = end_time.isoformat()
+    
+    if duration_seconds:
+        update_data["duration_seconds"] = duration_seconds
+    
+    # Update the call record. Events of one call can still race across server
+    # processes, so a progress update never overwrites a finished call
+    unless_status = None if mapped_status in FINAL_CALL_STATUSES else FINAL_CALL_STATUSES
+    updated = await supabase.update_call_record(call_id, update_data, unless_status=unless_status)
+    if updated is None:
+        print(f"⚠️ Ignored late {call_status} event for finished call {call_id}")
+        return {
+            "message": "Call already finished",
+            "call_id": call_id,
+            "status": mapped_status
+        }
+    
+    print(f"✅ Updated call {call_id} with status: {mapped_status}")
+    
+    # The updated record carries agent_config_id, so agent filters need no extra lookup
+    call_events.publish(
+        "call_ended" if mapped_status in FINAL_CALL_STATUSES else "call_status",
+        {
+            "call_id": call_id,
+            "agent_config_id": updated.get("agent_config_id"),
+            "status": mapped_status,
+            "duration_seconds": updated.get("duration_seconds"),
+            "call_summary": updated.get("call_summary")
+        }
+    )
+    
+    # Free the call's from-number and let the campaign scheduler retry unanswered campaign calls
+    if mapped_status in ("completed", "failed"):
+        disconnection_reason = webhook_data.get("disconnection_reason")
+        await from_number_pool.release(call_id, carrier_error=disconnection_reason in CARRIER_ERROR_REASONS)
+        try:
+            await campaign_scheduler.on_call_finished(call_id, mapped_status, disconnection_reason)
+        except Exception as e:
+            print(f"⚠️ Failed to update campaign entry for call {call_id}: {e}")
+    
+    return {
+        "message": "Webhook processed successfully",
+        "call_id": call_id,
+        "status": mapped_status
+    }
+
+# Fingerprints of recently received webhook events; Retell redelivers on timeout
+webhook_dedup = EventDeduplicator(
+    maxsize=int(os.getenv("WEBHOOK_DEDUP_SIZE", "50000")),
+    ttl=float(os.getenv("WEBHOOK_DEDUP_TTL", "3600"))
+)
+
+async def process_queued_webhook(webhook_data: dict) -> dict:
+    """Queue worker entry point; a failed event is forgotten so its redelivery is processed"""
+    try:
+        return await process_retell_webhook(webhook_data)
+    except Exception:
+        webhook_dedup.forget(webhook_fingerprint(webhook_data))
+        raise
+
+# Events of one call always land on the same partition and are applied in
+# order; different calls are processed in parallel across partitions
+webhook_queue = PartitionedProcessor(
+    process_queued_webhook,
+    key=lambda webhook_data: webhook_data.get("call_id"),
+    partitions=int(os.getenv("WEBHOOK_PARTITIONS", os.getenv("WEBHOOK_WORKERS", "8"))),
+    maxsize=int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000")),
+    name="retell-webhook-queue"
+)
+
 # Webhook endpoint for Retell AI call status updates
 @app.post("/api/v1/webhooks/retell")
 async def retell_webhook(webhook_data: dict):
@@ -779,72 +1386,38 @@ async def retell_webhook(webhook_data: dict):
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not available")
     
-    try:
-        # Extract call information from webhook
-        retell_call_id = webhook_data.get("call_id")
-        call_status = webhook_data.get("call_status")
-        call_summary = webhook_data.get("call_summary")
-        end_time = webhook_data.get("end_time")
-        duration_seconds = webhook_data.get("duration_seconds")
-        
-        if not retell_call_id:
-            raise HTTPException(status_code=400, detail="Missing call_id in webhook data")
-        
-        # Find the call record by retell_call_id
-        call_records = supabase.get_call_records()
-        call_record = None
-        for record in call_records:
-            if record.get("retell_call_id") == retell_call_id:
-                call_record = record
-                break
-        
-        if not call_record:
-            print(f"⚠️ Call record not found for retell_call_id: {retell_call_id}")
-            return {"message": "Call record not found"}
-        
-        # Map Retell AI status to our status
-        status_mapping = {
-            "queued": "initiated",
-            "ringing": "in_progress", 
-            "in_progress": "in_progress",
-            "ended": "completed",
-            "failed": "failed"
-        }
-        
-        mapped_status = status_mapping.get(call_status, "in_progress")
-        
-        # Prepare update data
-        update_data = {
-            "status": mapped_status
+    retell_call_id = webhook_data.get("call_id")
+    if not retell_call_id:
+        raise HTTPException(status_code=400, detail="Missing call_id in webhook data")
+    
+    # Redelivered copies are acked without touching the database
+    fingerprint = webhook_fingerprint(webhook_data)
+    if webhook_dedup.check_and_mark(fingerprint):
+        return {
+            "message": "Duplicate webhook ignored",
+            "call_id": retell_call_id,
+            "status": "duplicate"
         }
-        
-        if call_summary:
-            update_data["call_summary"] = call_summary
-        
-        if end_time:
-            # Convert end_time to ISO format if it's a string
-            if isinstance(end_time, str):
-                update_data["end_time"] = end_time
-            else:
-                update_data["end_time"] = end_time.isoformat()
-        
-        if duration_seconds:
-            update_data["duration_seconds"] = duration_seconds
-        
-        # Update the call record
-        updated_call = supabase.update_call_record(call_record["call_id"], update_data)
-        
-        print(f"✅ Updated call {call_record['call_id']} with status: {mapped_status}")
-        
+    
+    if WEBHOOK_INGEST_MODE == "queue":
+        if not webhook_queue.enqueue(webhook_data):
+            webhook_dedup.forget(fingerprint)
+            # Retell retries on non-2xx, so shed load instead of blocking
+            raise HTTPException(
+                status_code=503,
+                detail="Webhook queue is full",
+                headers={"Retry-After": "5"}
+            )
         return {
-            "message": "Webhook processed successfully",
-            "call_id": call_record["call_id"],
-            "status": mapped_status
+            "message": "Webhook accepted",
+            "call_id": retell_call_id,
+            "status": "queued"
         }
-        
-    except HTTPException:
-        raise
+    
+    try:
+        return await process_retell_webhook(webhook_data)
     except Exception as e:
+        webhook_dedup.forget(fingerprint)
         print(f"❌ Error processing Retell webhook: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to process webhook: {str(e)}")
 
@@ -9,10 +9,52 @@ from dotenv import load_dotenv
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import json
+from app.core.pagination import KEYSET_ORDER, keyset_filter
+from app.core.cache import TTLCache
+from app.core.single_flight import SingleFlight, request_key
 
 # Load environment variables
 load_dotenv()
 
+def _agent_configuration_payload(config_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the agent_configurations row written on create/update"""
+    return {
+        "agent_name": config_data["agent_name"],
+        "greeting": config_data["greeting"],
+        "primary_objective": config_data["primary_objective"],
+        "conversation_flow": config_data["conversation_flow"],
+        "fallback_responses": config_data["fallback_responses"],
+        "call_ending_conditions": config_data["call_ending_conditions"],
+        "is_active": config_data.get("is_active", True)
+    }
+
+def _call_records_page_params(limit: int, cursor: Optional[str] = None, select: str = "*", **filters: Any) -> Dict[str, Any]:
+    """Build PostgREST params for a newest-first page of call records, keyset-paged when a cursor is given"""
+    params: Dict[str, Any] = {**filters, "select": select, "order": KEYSET_ORDER, "limit": limit}
+    if cursor:
+        params["or"] = f"({keyset_filter(cursor)})"
+    return params
+
+def _call_record_payload(call_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the call_records row written on create"""
+    return {
+        "call_id": call_data["call_id"],
+        "agent_config_id": call_data["agent_config_id"],
+        "driver_name": call_data["driver_name"],
+        "phone_number": call_data["phone_number"],
+        "load_number": call_data["load_number"],
+        "delivery_address": call_data.get("delivery_address"),
+        "expected_delivery_time": call_data.get("expected_delivery_time"),
+        "special_instructions": call_data.get("special_instructions"),
+        "status": call_data.get("status", "initiated"),
+        "retell_call_id": call_data.get("retell_call_id"),
+        "from_number": call_data.get("from_number"),
+        "start_time": call_data.get("start_time"),
+        "end_time": call_data.get("end_time"),
+        "duration_seconds": call_data.get("duration_seconds"),
+        "call_summary": call_data.get("call_summary")
+    }
+
 class SimpleSupabaseClient:
     def __init__(self):
         self.url: str = os.getenv("SUPABASE_URL")
@@ -33,15 +75,7 @@ class SimpleSupabaseClient:
         """Create a new agent configuration in Supabase"""
         try:
             # Prepare data for insertion
-            insert_data = {
-                "agent_name": config_data["agent_name"],
-                "greeting": config_data["greeting"],
-                "primary_objective": config_data["primary_objective"],
-                "conversation_flow": config_data["conversation_flow"],
-                "fallback_responses": config_data["fallback_responses"],
-                "call_ending_conditions": config_data["call_ending_conditions"],
-                "is_active": config_data.get("is_active", True)
-            }
+            insert_data = _agent_configuration_payload(config_data)
             
             with httpx.Client() as client:
                 response = client.post(
@@ -61,14 +95,14 @@ class SimpleSupabaseClient:
             print(f"Error creating agent configuration: {e}")
             raise
     
-    def get_agent_configurations(self) -> List[Dict[str, Any]]:
+    def get_agent_configurations(self, select: str = "*") -> List[Dict[str, Any]]:
         """Get all agent configurations from Supabase"""
         try:
             with httpx.Client() as client:
                 response = client.get(
                     f"{self.base_url}/agent_configurations",
                     headers=self.headers,
-                    params={"order": "created_at.desc"}
+                    params={"select": select, "order": "created_at.desc"}
                 )
                 response.raise_for_status()
                 return response.json()
@@ -96,15 +130,7 @@ class SimpleSupabaseClient:
         """Update an existing agent configuration"""
         try:
             # Prepare data for update
-            update_data = {
-                "agent_name": config_data["agent_name"],
-                "greeting": config_data["greeting"],
-                "primary_objective": config_data["primary_objective"],
-                "conversation_flow": config_data["conversation_flow"],
-                "fallback_responses": config_data["fallback_responses"],
-                "call_ending_conditions": config_data["call_ending_conditions"],
-                "is_active": config_data.get("is_active", True)
-            }
+            update_data = _agent_configuration_payload(config_data)
             
             with httpx.Client() as client:
                 response = client.patch(
@@ -153,22 +179,7 @@ class SimpleSupabaseClient:
         """Create a new call record in Supabase"""
         try:
             # Prepare data for insertion
-            insert_data = {
-                "call_id": call_data["call_id"],
-                "agent_config_id": call_data["agent_config_id"],
-                "driver_name": call_data["driver_name"],
-                "phone_number": call_data["phone_number"],
-                "load_number": call_data["load_number"],
-                "delivery_address": call_data.get("delivery_address"),
-                "expected_delivery_time": call_data.get("expected_delivery_time"),
-                "special_instructions": call_data.get("special_instructions"),
-                "status": call_data.get("status", "initiated"),
-                "retell_call_id": call_data.get("retell_call_id"),
-                "start_time": call_data.get("start_time"),
-                "end_time": call_data.get("end_time"),
-                "duration_seconds": call_data.get("duration_seconds"),
-                "call_summary": call_data.get("call_summary")
-            }
+            insert_data = _call_record_payload(call_data)
             
             with httpx.Client() as client:
                 response = client.post(
@@ -188,18 +199,17 @@ class SimpleSupabaseClient:
             print(f"Error creating call record: {e}")
             raise
     
-    def get_call_records(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get call records from Supabase with pagination"""
+    def get_call_records(self, limit: int = 50, offset: int = 0, cursor: Optional[str] = None, select: str = "*") -> List[Dict[str, Any]]:
+        """Get call records from Supabase with pagination (keyset when a cursor is given, offset otherwise)"""
         try:
+            params = _call_records_page_params(limit, cursor, select)
+            if not cursor:
+                params["offset"] = offset
             with httpx.Client() as client:
                 response = client.get(
                     f"{self.base_url}/call_records",
                     headers=self.headers,
-                    params={
-                        "order": "created_at.desc",
-                        "limit": limit,
-                        "offset": offset
-                    }
+                    params=params
                 )
                 response.raise_for_status()
                 return response.json()
@@ -223,6 +233,22 @@ class SimpleSupabaseClient:
             print(f"Error fetching call record {call_id}: {e}")
             raise
     
+    def get_call_record_by_retell_id(self, retell_call_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific call record by its Retell AI call ID"""
+        try:
+            with httpx.Client() as client:
+                response = client.get(
+                    f"{self.base_url}/call_records",
+                    headers=self.headers,
+                    params={"retell_call_id": f"eq.{retell_call_id}", "limit": 1}
+                )
+                response.raise_for_status()
+                result = response.json()
+                return result[0] if result else None
+        except Exception as e:
+            print(f"Error fetching call record for retell_call_id {retell_call_id}: {e}")
+            raise
+    
     def update_call_record(self, call_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing call record"""
         try:
@@ -245,18 +271,14 @@ class SimpleSupabaseClient:
             print(f"Error updating call record {call_id}: {e}")
             raise
     
-    def get_call_records_by_agent(self, agent_config_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_call_records_by_agent(self, agent_config_id: int, limit: int = 50, cursor: Optional[str] = None, select: str = "*") -> List[Dict[str, Any]]:
         """Get call records for a specific agent configuration"""
         try:
             with httpx.Client() as client:
                 response = client.get(
                     f"{self.base_url}/call_records",
                     headers=self.headers,
-                    params={
-                        "agent_config_id": f"eq.{agent_config_id}",
-                        "order": "created_at.desc",
-                        "limit": limit
-                    }
+                    params=_call_records_page_params(limit, cursor, select, agent_config_id=f"eq.{agent_config_id}")
                 )
                 response.raise_for_status()
                 return response.json()
@@ -264,18 +286,14 @@ class SimpleSupabaseClient:
             print(f"Error fetching call records for agent {agent_config_id}: {e}")
             raise
     
-    def get_call_records_by_status(self, status: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_call_records_by_status(self, status: str, limit: int = 50, cursor: Optional[str] = None, select: str = "*") -> List[Dict[str, Any]]:
         """Get call records by status"""
         try:
             with httpx.Client() as client:
                 response = client.get(
                     f"{self.base_url}/call_records",
                     headers=self.headers,
-                    params={
-                        "status": f"eq.{status}",
-                        "order": "created_at.desc",
-                        "limit": limit
-                    }
+                    params=_call_records_page_params(limit, cursor, select, status=f"eq.{status}")
                 )
                 response.raise_for_status()
                 return response.json()
@@ -283,8 +301,481 @@ class SimpleSupabaseClient:
             print(f"Error fetching call records with status {status}: {e}")
             raise
 
+class AsyncSimpleSupabaseClient:
+    """
+    Async variant of SimpleSupabaseClient backed by one long-lived httpx.AsyncClient.
+    Connections are kept alive and reused across requests instead of paying a
+    fresh TCP+TLS handshake per query. Call open() on startup and aclose() on shutdown.
+    """
+
+    def __init__(self):
+        self.url: str = os.getenv("SUPABASE_URL")
+        self.key: str = os.getenv("SUPABASE_ANON_KEY")
+        
+        if not self.url or not self.key:
+            raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment variables")
+        
+        self.base_url = f"{self.url}/rest/v1"
+        self.headers = {
+            "apikey": self.key,
+            "Authorization": f"Bearer {self.key}",
+            "Content-Type": "application/json",
+            "Prefer": "return=representation"
+        }
+        
+        # Connection pool configuration
+        self.http2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+        )
+        self.timeout = httpx.Timeout(float(os.getenv("SUPABASE_TIMEOUT", "10")))
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Identical GETs in flight at the same time share one upstream request
+        self.single_flight = SingleFlight()
+        
+        # Agent configurations rarely change, so serve them from memory and
+        # invalidate on every write made through this client
+        self.agent_config_cache = TTLCache(
+            maxsize=int(os.getenv("AGENT_CONFIG_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("AGENT_CONFIG_CACHE_TTL", "300"))
+        )
+    
+    async def open(self) -> None:
+        """Create the pooled HTTP client"""
+        if self._client is not None:
+            return
+        
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("⚠️ 'h2' package not installed, falling back to HTTP/1.1 for Supabase")
+                http2 = False
+        
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=http2,
+            limits=self.limits,
+            timeout=self.timeout
+        )
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release its connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _request(self, method: str, table: str, params: Optional[Dict[str, Any]] = None, json: Any = None) -> Any:
+        """Send a PostgREST request over the shared connection pool"""
+        if self._client is None:
+            await self.open()
+        
+        path = f"/{table}"
+        if method == "GET":
+            # Each caller parses the shared response itself, so results are never shared objects
+            response = await self.single_flight.do(
+                request_key(method, path, params),
+                lambda: self._client.request(method, path, params=params)
+            )
+        else:
+            response = await self._client.request(method, path, params=params, json=json)
+        response.raise_for_status()
+        return response.json() if response.content else None
+    
+    async def create_agent_configuration(self, config_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new agent configuration in Supabase"""
+        try:
+            result = await self._request("POST", "agent_configurations", json=_agent_configuration_payload(config_data))
+            if result:
+                self.agent_config_cache.pop(result[0].get("id"))
+                return result[0]
+            else:
+                raise Exception("Failed to create agent configuration")
+        except Exception as e:
+            print(f"Error creating agent configuration: {e}")
+            raise
+    
+    async def get_agent_configurations(self, select: str = "*") -> List[Dict[str, Any]]:
+        """Get all agent configurations from Supabase"""
+        try:
+            return await self._request("GET", "agent_configurations", params={"select": select, "order": "created_at.desc"})
+        except Exception as e:
+            print(f"Error fetching agent configurations: {e}")
+            raise
+    
+    async def get_agent_configuration(self, config_id: int) -> Optional[Dict[str, Any]]:
+        """Get a specific agent configuration by ID (read-through cached)"""
+        cached = self.agent_config_cache.get(config_id)
+        if cached is not None:
+            return dict(cached)
+        
+        try:
+            result = await self._request("GET", "agent_configurations", params={"id": f"eq.{config_id}"})
+            if not result:
+                return None
+            self.agent_config_cache.set(config_id, result[0])
+            return dict(result[0])
+        except Exception as e:
+            print(f"Error fetching agent configuration {config_id}: {e}")
+            raise
+    
+    async def update_agent_configuration(self, config_id: int, config_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Update an existing agent configuration"""
+        try:
+            try:
+                result = await self._request(
+                    "PATCH",
+                    "agent_configurations",
+                    params={"id": f"eq.{config_id}"},
+                    json=_agent_configuration_payload(config_data)
+                )
+            finally:
+                self.agent_config_cache.pop(config_id)
+            if result:
+                return result[0]
+            else:
+                raise Exception("Failed to update agent configuration")
+        except Exception as e:
+            print(f"Error updating agent configuration {config_id}: {e}")
+            raise
+    
+    async def set_agent_retell_id(self, config_id: int, retell_agent_id: str) -> Optional[Dict[str, Any]]:
+        """Record the Retell AI agent created for a configuration (PATCHes only retell_agent_id)"""
+        try:
+            try:
+                result = await self._request(
+                    "PATCH",
+                    "agent_configurations",
+                    params={"id": f"eq.{config_id}"},
+                    json={"retell_agent_id": retell_agent_id}
+                )
+            finally:
+                self.agent_config_cache.pop(config_id)
+            return result[0] if result else None
+        except Exception as e:
+            print(f"Error saving Retell agent ID of agent configuration {config_id}: {e}")
+            raise
+    
+    async def delete_agent_configuration(self, config_id: int) -> Dict[str, Any]:
+        """Delete an agent configuration"""
+        try:
+            # First get the configuration to return it
+            config = await self.get_agent_configuration(config_id)
+            if not config:
+                raise Exception("Agent configuration not found")
+            
+            try:
+                await self._request("DELETE", "agent_configurations", params={"id": f"eq.{config_id}"})
+            finally:
+                self.agent_config_cache.pop(config_id)
+            return config
+        except Exception as e:
+            print(f"Error deleting agent configuration {config_id}: {e}")
+            raise
+    
+    # Call Management Methods
+    async def create_call_record(self, call_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new call record in Supabase"""
+        try:
+            result = await self._request("POST", "call_records", json=_call_record_payload(call_data))
+            if result:
+                return result[0]
+            else:
+                raise Exception("Failed to create call record")
+        except Exception as e:
+            print(f"Error creating call record: {e}")
+            raise
+    
+    async def create_call_records(self, call_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several call records in a single bulk insert"""
+        try:
+            result = await self._request(
+                "POST",
+                "call_records",
+                json=[_call_record_payload(call_data) for call_data in call_data_list]
+            )
+            if result and len(result) == len(call_data_list):
+                return result
+            else:
+                raise Exception("Failed to create call records")
+        except Exception as e:
+            print(f"Error creating {len(call_data_list)} call records: {e}")
+            raise
+    
+    async def get_call_records(self, limit: int = 50, offset: int = 0, cursor: Optional[str] = None, select: str = "*") -> List[Dict[str, Any]]:
+        """Get call records from Supabase with pagination (keyset when a cursor is given, offset otherwise)"""
+        try:
+            params = _call_records_page_params(limit, cursor, select)
+            if not cursor:
+                params["offset"] = offset
+            return await self._request("GET", "call_records", params=params)
+        except Exception as e:
+            print(f"Error fetching call records: {e}")
+            raise
+    
+    async def get_call_record(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific call record by call_id"""
+        try:
+            result = await self._request("GET", "call_records", params={"call_id": f"eq.{call_id}"})
+            return result[0] if result else None
+        except Exception as e:
+            print(f"Error fetching call record {call_id}: {e}")
+            raise
+    
+    async def get_call_record_by_retell_id(self, retell_call_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific call record by its Retell AI call ID"""
+        try:
+            result = await self._request(
+                "GET",
+                "call_records",
+                params={"retell_call_id": f"eq.{retell_call_id}", "limit": 1}
+            )
+            return result[0] if result else None
+        except Exception as e:
+            print(f"Error fetching call record for retell_call_id {retell_call_id}: {e}")
+            raise
+    
+    async def get_finished_call_ids(self, call_ids: List[str], statuses: List[str]) -> List[str]:
+        """IDs among call_ids whose call record has one of the given (final) statuses"""
+        if not call_ids:
+            return []
+        try:
+            result = await self._request(
+                "GET",
+                "call_records",
+                params={
+                    "select": "call_id",
+                    "call_id": f"in.({','.join(call_ids)})",
+                    "status": f"in.({','.join(statuses)})"
+                }
+            )
+            return [row["call_id"] for row in result or []]
+        except Exception as e:
+            print(f"Error fetching finished call records: {e}")
+            raise
+    
+    async def update_call_record(self, call_id: str, update_data: Dict[str, Any], unless_status: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Update an existing call record. With unless_status the update is skipped
+        (returning None) when the record already has one of those statuses.
+        """
+        try:
+            params = {"call_id": f"eq.{call_id}"}
+            if unless_status:
+                params["status"] = f"not.in.({','.join(unless_status)})"
+            result = await self._request(
+                "PATCH",
+                "call_records",
+                params=params,
+                json=update_data
+            )
+            if result:
+                return result[0]
+            elif unless_status:
+                return None
+            else:
+                raise Exception("Failed to update call record")
+        except Exception as e:
+            print(f"Error updating call record {call_id}: {e}")
+            raise
+    
+    async def get_call_records_by_agent(self, agent_config_id: int, limit: int = 50, cursor: Optional[str] = None, select: str = "*") -> List[Dict[str, Any]]:
+        """Get call records for a specific agent configuration"""
+        try:
+            return await self._request(
+                "GET",
+                "call_records",
+                params=_call_records_page_params(limit, cursor, select, agent_config_id=f"eq.{agent_config_id}")
+            )
+        except Exception as e:
+            print(f"Error fetching call records for agent {agent_config_id}: {e}")
+            raise
+    
+    async def get_call_records_by_status(self, status: str, limit: int = 50, cursor: Optional[str] = None, select: str = "*") -> List[Dict[str, Any]]:
+        """Get call records by status"""
+        try:
+            return await self._request(
+                "GET",
+                "call_records",
+                params=_call_records_page_params(limit, cursor, select, status=f"eq.{status}")
+            )
+        except Exception as e:
+            print(f"Error fetching call records with status {status}: {e}")
+            raise
+    
+    async def search_call_records(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Ranked full-text search over call records through the search_call_records function"""
+        try:
+            return await self._request(
+                "GET",
+                "rpc/search_call_records",
+                params={"search_query": query, "result_limit": limit, "result_offset": offset}
+            )
+        except Exception as e:
+            print(f"Error searching call records for {query!r}: {e}")
+            raise
+    
+    # Campaign Methods
+    async def create_campaign(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new calling campaign"""
+        try:
+            result = await self._request("POST", "campaigns", json=campaign_data)
+            if result:
+                return result[0]
+            else:
+                raise Exception("Failed to create campaign")
+        except Exception as e:
+            print(f"Error creating campaign: {e}")
+            raise
+    
+    async def get_campaigns(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get campaigns, optionally filtered by status"""
+        try:
+            params: Dict[str, Any] = {"select": "*", "order": "created_at.desc"}
+            if status:
+                params["status"] = f"eq.{status}"
+            return await self._request("GET", "campaigns", params=params)
+        except Exception as e:
+            print(f"Error fetching campaigns: {e}")
+            raise
+    
+    async def get_campaign(self, campaign_id: int) -> Optional[Dict[str, Any]]:
+        """Get a specific campaign by ID"""
+        try:
+            result = await self._request("GET", "campaigns", params={"id": f"eq.{campaign_id}"})
+            return result[0] if result else None
+        except Exception as e:
+            print(f"Error fetching campaign {campaign_id}: {e}")
+            raise
+    
+    async def update_campaign(self, campaign_id: int, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an existing campaign"""
+        try:
+            result = await self._request("PATCH", "campaigns", params={"id": f"eq.{campaign_id}"}, json=update_data)
+            return result[0] if result else None
+        except Exception as e:
+            print(f"Error updating campaign {campaign_id}: {e}")
+            raise
+    
+    async def create_campaign_entries(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create campaign entries in a single bulk insert"""
+        try:
+            return await self._request("POST", "campaign_entries", json=entries) or []
+        except Exception as e:
+            print(f"Error creating {len(entries)} campaign entries: {e}")
+            raise
+    
+    async def get_campaign_entries(self, campaign_id: int, select: str = "*", **filters: Any) -> List[Dict[str, Any]]:
+        """Get the entries of a campaign, with optional PostgREST filters"""
+        try:
+            params: Dict[str, Any] = {**filters, "campaign_id": f"eq.{campaign_id}", "select": select}
+            return await self._request("GET", "campaign_entries", params=params)
+        except Exception as e:
+            print(f"Error fetching entries for campaign {campaign_id}: {e}")
+            raise
+    
+    async def cancel_pending_campaign_entries(self, campaign_id: int) -> List[Dict[str, Any]]:
+        """Mark every entry of a campaign that is still waiting to be dialed as cancelled"""
+        try:
+            return await self._request(
+                "PATCH",
+                "campaign_entries",
+                params={"campaign_id": f"eq.{campaign_id}", "status": "eq.pending"},
+                json={"status": "cancelled"}
+            ) or []
+        except Exception as e:
+            print(f"Error cancelling entries for campaign {campaign_id}: {e}")
+            raise
+    
+    async def get_due_campaign_entries(self, campaign_id: int, now: str, limit: int) -> List[Dict[str, Any]]:
+        """Get pending campaign entries whose next attempt is due, oldest first"""
+        try:
+            return await self._request("GET", "campaign_entries", params={
+                "campaign_id": f"eq.{campaign_id}",
+                "status": "eq.pending",
+                "next_attempt_at": f"lte.{now}",
+                "order": "next_attempt_at.asc,id.asc",
+                "limit": limit
+            })
+        except Exception as e:
+            print(f"Error fetching due entries for campaign {campaign_id}: {e}")
+            raise
+    
+    async def get_stale_campaign_entries(self, updated_before: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get campaign entries stuck dialing or in progress since before the given time"""
+        try:
+            return await self._request("GET", "campaign_entries", params={
+                "status": "in.(dialing,in_progress)",
+                "updated_at": f"lt.{updated_before}",
+                "limit": limit
+            })
+        except Exception as e:
+            print(f"Error fetching stale campaign entries: {e}")
+            raise
+    
+    async def get_campaign_entry_by_call_id(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Get the campaign entry whose latest attempt is the given call"""
+        try:
+            result = await self._request(
+                "GET",
+                "campaign_entries",
+                params={"last_call_id": f"eq.{call_id}", "limit": 1}
+            )
+            return result[0] if result else None
+        except Exception as e:
+            print(f"Error fetching campaign entry for call {call_id}: {e}")
+            raise
+    
+    async def update_campaign_entry(self, entry_id: int, update_data: Dict[str, Any], expected_status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Update a campaign entry. With expected_status the update only applies while
+        the entry still has that status, so racing webhooks, timeouts and dial results apply once.
+        """
+        try:
+            params = {"id": f"eq.{entry_id}"}
+            if expected_status:
+                params["status"] = f"eq.{expected_status}"
+            result = await self._request("PATCH", "campaign_entries", params=params, json=update_data)
+            return result[0] if result else None
+        except Exception as e:
+            print(f"Error updating campaign entry {entry_id}: {e}")
+            raise
+    
+    async def claim_campaign_entries(self, campaign_id: int, entry_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Move the given pending entries to dialing through claim_campaign_entries, which
+        only claims as many as the campaign has free concurrency slots. Returns the claimed entries.
+        """
+        try:
+            return await self._request(
+                "POST",
+                "rpc/claim_campaign_entries",
+                json={"target_campaign_id": campaign_id, "entry_ids": entry_ids}
+            ) or []
+        except Exception as e:
+            print(f"Error claiming entries for campaign {campaign_id}: {e}")
+            raise
+    
+    async def get_campaign_progress(self, campaign_id: int) -> List[Dict[str, Any]]:
+        """Entry counts and dial attempts of a campaign grouped by status"""
+        try:
+            return await self._request(
+                "GET",
+                "rpc/campaign_progress",
+                params={"target_campaign_id": campaign_id}
+            )
+        except Exception as e:
+            print(f"Error fetching progress of campaign {campaign_id}: {e}")
+            raise
+
 # Global instance
 supabase_client = None
+async_supabase_client = None
 
 def get_supabase_client() -> SimpleSupabaseClient:
     """Get the global Supabase client instance"""
@@ -292,3 +783,10 @@ def get_supabase_client() -> SimpleSupabaseClient:
     if supabase_client is None:
         supabase_client = SimpleSupabaseClient()
     return supabase_client
+
+def get_async_supabase_client() -> AsyncSimpleSupabaseClient:
+    """Get the global async Supabase client instance"""
+    global async_supabase_client
+    if async_supabase_client is None:
+        async_supabase_client = AsyncSimpleSupabaseClient()
+    return async_supabase_client
\ No newline at end of file
@@ -0,0 +1,17 @@
+import pytest
+from tests.fake_supabase import FakeSupabase
+
+async def _run_inline(fn, *args):
+    return fn(*args)
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Route the app/ services' database access to an in-memory FakeSupabase"""
+    from app.services import call_service, transcript_service
+    db = FakeSupabase()
+    for module in (call_service, transcript_service):
+        monkeypatch.setattr(module, "get_db", lambda: db)
+        monkeypatch.setattr(module, "run_db", _run_inline)
+    # Shared per-process state starts empty for every test
+    monkeypatch.setattr(call_service.CallService, "_write_coalescer", None)
+    return db
@@ -0,0 +1,163 @@
+"""
+In-memory stand-in for the supabase-py client, covering the query builder calls
+the app/ services make. Every executed write is recorded in `writes` so tests
+can assert how many round trips a code path makes.
+"""
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+class FakeQuery:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.action = "select"
+        self.payload: Any = None
+        self.columns: Optional[List[str]] = None
+        self.filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self.ordering: List[tuple] = []
+        self.row_limit: Optional[int] = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self._negate = False
+    
+    # Query building
+    def select(self, columns: str = "*") -> "FakeQuery":
+        self.columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        return self
+    
+    def insert(self, rows: Any) -> "FakeQuery":
+        self.action, self.payload = "insert", rows
+        return self
+    
+    def update(self, data: Dict[str, Any]) -> "FakeQuery":
+        self.action, self.payload = "update", data
+        return self
+    
+    def upsert(self, rows: Any, on_conflict: str = "id", ignore_duplicates: bool = False) -> "FakeQuery":
+        self.action, self.payload = "upsert", rows
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+    
+    def delete(self) -> "FakeQuery":
+        self.action = "delete"
+        return self
+    
+    def _add(self, predicate: Callable[[Dict[str, Any]], bool]) -> "FakeQuery":
+        negate, self._negate = self._negate, False
+        self.filters.append((lambda row: not predicate(row)) if negate else predicate)
+        return self
+    
+    @property
+    def not_(self) -> "FakeQuery":
+        self._negate = True
+        return self
+    
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(lambda row: row.get(column) == value)
+    
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(lambda row: row.get(column) != value)
+    
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        return self._add(lambda row: row.get(column) in values)
+    
+    def order(self, column: str, desc: bool = False) -> "FakeQuery":
+        self.ordering.append((column, desc))
+        return self
+    
+    def limit(self, count: int) -> "FakeQuery":
+        self.row_limit = count
+        return self
+    
+    # Execution
+    def _matching(self) -> List[Dict[str, Any]]:
+        return [row for row in self.db.tables.setdefault(self.table, []) if all(f(row) for f in self.filters)]
+    
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self.columns is None:
+            return dict(row)
+        return {column: row.get(column) for column in self.columns}
+    
+    def execute(self) -> SimpleNamespace:
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.action != "select":
+            self.db.writes.append((self.action, self.table, self.payload))
+        
+        if self.action == "select":
+            result = self._matching()
+            for column, desc in reversed(self.ordering):
+                result.sort(key=lambda row: row.get(column), reverse=desc)
+            if self.row_limit is not None:
+                result = result[:self.row_limit]
+            return SimpleNamespace(data=[self._project(row) for row in result])
+        
+        if self.action == "insert":
+            inserted = []
+            for row in self.payload if isinstance(self.payload, list) else [self.payload]:
+                row = dict(row)
+                row.setdefault("id", self.db.next_id())
+                rows.append(row)
+                inserted.append(dict(row))
+            return SimpleNamespace(data=inserted)
+        
+        if self.action == "update":
+            updated = []
+            for row in self._matching():
+                row.update(self.payload)
+                updated.append(dict(row))
+            return SimpleNamespace(data=updated)
+        
+        if self.action == "upsert":
+            keys = [key.strip() for key in self.on_conflict.split(",")]
+            upserted = []
+            for new in self.payload if isinstance(self.payload, list) else [self.payload]:
+                existing = next((row for row in rows if all(row.get(k) == new.get(k) for k in keys)), None)
+                if existing is None:
+                    row = dict(new)
+                    row.setdefault("id", self.db.next_id())
+                    rows.append(row)
+                    upserted.append(dict(row))
+                elif not self.ignore_duplicates:
+                    existing.update(new)
+                    upserted.append(dict(existing))
+            return SimpleNamespace(data=upserted)
+        
+        if self.action == "delete":
+            deleted = self._matching()
+            self.db.tables[self.table] = [row for row in rows if row not in deleted]
+            return SimpleNamespace(data=deleted)
+        
+        raise AssertionError(f"Unsupported action {self.action}")
+
+class FakeRpc:
+    def __init__(self, db: "FakeSupabase", name: str, params: Dict[str, Any]):
+        self.db, self.name, self.params = db, name, params
+    
+    def execute(self) -> SimpleNamespace:
+        self.db.rpc_calls.append((self.name, self.params))
+        handler = self.db.rpc_handlers.get(self.name)
+        if handler is None:
+            raise RuntimeError(f"function {self.name} does not exist")
+        return SimpleNamespace(data=handler(self.params))
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.writes: List[tuple] = []
+        self.rpc_calls: List[tuple] = []
+        self.rpc_handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._id = 0
+    
+    def next_id(self) -> int:
+        self._id += 1
+        return self._id
+    
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+    
+    def rpc(self, name: str, params: Dict[str, Any]) -> FakeRpc:
+        return FakeRpc(self, name, params)
+    
+    def writes_to(self, table: str, action: str = "update") -> List[Any]:
+        return [payload for kind, name, payload in self.writes if name == table and kind == action]
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import agent_catalog
+from app.services.agent_catalog import AgentCatalog
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the catalog's clock; the event loop keeps using the real one
+    monkeypatch.setattr(agent_catalog, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+def _fetcher(*responses):
+    calls = []
+    
+    async def fetch():
+        calls.append(len(calls))
+        response = responses[min(len(calls) - 1, len(responses) - 1)]
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return fetch, calls
+
+async def test_fresh_reads_are_served_from_memory(clock):
+    fetch, calls = _fetcher([{"agent_id": "a1"}, {"agent_id": "a2"}])
+    catalog = AgentCatalog(fetch, ttl=60)
+    
+    assert len(await catalog.get_all()) == 2
+    assert await catalog.get("a2") == {"agent_id": "a2"}
+    assert await catalog.get("missing") is None
+    assert len(calls) == 1
+    assert catalog.stats()["hits"] == 2
+
+async def test_concurrent_cold_reads_share_one_fetch(clock):
+    started = asyncio.Event()
+    
+    async def fetch():
+        started.set()
+        await asyncio.sleep(0.01)
+        return [{"agent_id": "a1"}]
+    catalog = AgentCatalog(fetch)
+    
+    results = await asyncio.gather(*(catalog.get_all() for _ in range(5)))
+    
+    assert all(result == [{"agent_id": "a1"}] for result in results)
+    assert catalog.stats()["refreshes"] == 1
+
+async def test_stale_copy_is_served_while_refreshing(clock):
+    fetch, calls = _fetcher([{"agent_id": "old"}], [{"agent_id": "new"}])
+    catalog = AgentCatalog(fetch, ttl=60)
+    await catalog.get_all()
+    clock.now += 61
+    
+    assert await catalog.get_all() == [{"agent_id": "old"}]
+    await asyncio.sleep(0)
+    assert await catalog.get_all() == [{"agent_id": "new"}]
+    assert catalog.stats()["stale_hits"] == 1
+
+async def test_too_stale_catalog_waits_for_retell_and_falls_back_on_failure(clock):
+    fetch, calls = _fetcher([{"agent_id": "old"}], RuntimeError("Retell down"))
+    catalog = AgentCatalog(fetch, ttl=60, max_stale=600)
+    await catalog.get_all()
+    clock.now += 601
+    
+    assert await catalog.get_all() == [{"agent_id": "old"}]
+    assert catalog.stats()["refresh_failures"] == 1
+
+async def test_cold_failure_raises(clock):
+    fetch, _ = _fetcher(RuntimeError("Retell down"))
+    catalog = AgentCatalog(fetch)
+    
+    with pytest.raises(RuntimeError):
+        await catalog.get_all()
+
+async def test_invalidate_forces_a_fresh_fetch(clock):
+    fetch, calls = _fetcher([{"agent_id": "a1"}], [{"agent_id": "a1"}, {"agent_id": "a2"}])
+    catalog = AgentCatalog(fetch)
+    await catalog.get_all()
+    
+    catalog.invalidate()
+    
+    assert await catalog.get("a2") == {"agent_id": "a2"}
+    assert len(calls) == 2
+
+async def test_fetch_started_before_invalidate_is_not_cached(clock):
+    release = asyncio.Event()
+    responses = [[{"agent_id": "before"}], [{"agent_id": "after"}]]
+    
+    async def fetch():
+        response = responses.pop(0)
+        if response[0]["agent_id"] == "before":
+            await release.wait()
+        return response
+    catalog = AgentCatalog(fetch)
+    waiter = asyncio.create_task(catalog.get_all())
+    await asyncio.sleep(0)
+    
+    catalog.invalidate()
+    release.set()
+    
+    assert await waiter == [{"agent_id": "before"}]
+    assert await catalog.get_all() == [{"agent_id": "after"}]
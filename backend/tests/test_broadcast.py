@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from app.core.broadcast import BroadcastHub, TooManySubscribers
+from app.services import call_events
+
+async def _collect(stream, count):
+    return [await stream.__anext__() for _ in range(count)]
+
+def test_publish_delivers_to_matching_subscribers_only():
+    hub = BroadcastHub()
+    everything = hub.subscribe(call_id=None)
+    one_call = hub.subscribe(call_id="c1")
+    
+    assert hub.publish("call_started", {"call_id": "c1"}) == 2
+    assert hub.publish("call_started", {"call_id": "c2"}) == 1
+    
+    assert everything.queue.qsize() == 2
+    assert one_call.queue.get_nowait()["data"] == {"call_id": "c1"}
+    assert hub.wants("call_id") and not hub.wants("agent_config_id")
+
+def test_publish_without_subscribers_is_a_no_op():
+    hub = BroadcastHub()
+    
+    assert hub.publish("call_started", {"call_id": "c1"}) == 0
+    assert hub.stats()["published"] == 0
+
+def test_slow_subscriber_is_dropped_instead_of_blocking():
+    hub = BroadcastHub(queue_size=2)
+    slow = hub.subscribe()
+    fast = hub.subscribe()
+    
+    for seq in range(3):
+        hub.publish("transcript_updated", {"seq": seq})
+        fast.queue.get_nowait()
+    
+    assert slow.dropped and not fast.dropped
+    assert hub.stats()["subscribers"] == 1
+    assert hub.stats()["dropped_subscribers"] == 1
+
+def test_subscriber_limit():
+    hub = BroadcastHub(max_subscribers=1)
+    hub.subscribe()
+    
+    with pytest.raises(TooManySubscribers):
+        hub.subscribe()
+
+async def test_stream_formats_server_sent_events():
+    hub = BroadcastHub()
+    subscription = hub.subscribe()
+    hub.publish("call_ended", {"call_id": "c1", "duration_seconds": 42})
+    stream = hub.stream(subscription)
+    
+    retry, event = await _collect(stream, 2)
+    
+    assert retry == "retry: 3000\n\n"
+    assert event.startswith("id: 1\nevent: call_ended\ndata: ")
+    assert json.loads(event.split("data: ")[1]) == {"call_id": "c1", "duration_seconds": 42}
+    await stream.aclose()
+    assert not hub.has_subscribers
+
+async def test_stream_sends_heartbeats_while_idle():
+    hub = BroadcastHub()
+    stream = hub.stream(hub.subscribe(), heartbeat=0.01)
+    
+    _, heartbeat = await _collect(stream, 2)
+    
+    assert heartbeat.startswith(": keep-alive")
+    await stream.aclose()
+
+async def test_dropped_stream_flushes_its_queue_then_ends():
+    hub = BroadcastHub(queue_size=1)
+    subscription = hub.subscribe()
+    hub.publish("call_status", {"seq": 1})
+    hub.publish("call_status", {"seq": 2})
+    stream = hub.stream(subscription)
+    
+    chunks = [chunk async for chunk in stream]
+    
+    assert '"seq": 1' in chunks[1]
+    assert chunks[-1] == "event: dropped\ndata: {}\n\n"
+
+async def test_publish_call_event_looks_up_the_agent_only_when_filtered(monkeypatch):
+    hub = BroadcastHub()
+    lookups = []
+    
+    async def get_agent_config_id(self, call_id):
+        lookups.append(call_id)
+        return 7
+    monkeypatch.setattr(call_events, "call_event_hub", hub)
+    monkeypatch.setattr(call_events, "_call_agents", call_events.LRUCache(maxsize=10))
+    monkeypatch.setattr(call_events.CallService, "get_agent_config_id", get_agent_config_id)
+    
+    by_call = hub.subscribe(call_id="c1")
+    await call_events.publish_call_event("call_started", "c1", status="in_progress")
+    assert lookups == []
+    assert by_call.queue.get_nowait()["data"] == {"call_id": "c1", "agent_config_id": None, "status": "in_progress"}
+    
+    by_agent = hub.subscribe(agent_config_id=7)
+    await call_events.publish_call_event("call_status", "c1")
+    await call_events.publish_call_event("call_ended", "c1")
+    assert lookups == ["c1"]
+    assert by_agent.queue.qsize() == 2
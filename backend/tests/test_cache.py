@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import cache
+from app.core.cache import LRUCache, TTLCache
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    
+    assert "a" in lru and "c" in lru
+    assert "b" not in lru
+    assert len(lru) == 2
+
+def test_lru_get_pop_and_defaults():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    
+    assert lru.get("missing", "default") == "default"
+    assert lru.pop("a") == 1
+    assert lru.pop("a", "gone") == "gone"
+
+def test_lru_rejects_empty_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+def test_ttl_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    ttl = TTLCache(maxsize=10, ttl=30)
+    ttl.set("a", 1)
+    
+    now[0] += 29
+    assert ttl.get("a") == 1
+    now[0] += 2
+    assert ttl.get("a") is None
+    assert "a" not in ttl
+
+def test_ttl_counts_hits_and_misses():
+    ttl = TTLCache(maxsize=10, ttl=30)
+    ttl.set("a", 1)
+    ttl.get("a")
+    ttl.get("b")
+    
+    stats = ttl.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+def test_ttl_caches_falsy_values_and_pops_values():
+    ttl = TTLCache(maxsize=10, ttl=30)
+    ttl.set("empty", [])
+    
+    assert ttl.get("empty", "default") == []
+    assert ttl.pop("empty") == []
+    assert ttl.pop("empty", "gone") == "gone"
+
+def test_ttl_is_still_lru_bounded():
+    ttl = TTLCache(maxsize=1, ttl=30)
+    ttl.set("a", 1)
+    ttl.set("b", 2)
+    
+    assert ttl.get("a") is None
+    assert ttl.get("b") == 2
@@ -0,0 +1,90 @@
+import pytest
+from app.core.compression import compress_text
+from app.models.call import CallResultUpdate, CallStatus
+from app.services.call_service import CallService
+from app.services.transcript_service import TranscriptService
+
+def _call_row(call_id: str, status: str, transcript: str = "") -> dict:
+    return {
+        "call_id": call_id,
+        "driver_name": "Mike Johnson",
+        "phone_number": "+15551234567",
+        "load_number": "7891-B",
+        "status": status,
+        "transcript": transcript,
+        "structured_summary": {},
+        "agent_config_id": 1
+    }
+
+async def test_live_call_reads_transcript_from_segments(fake_db):
+    fake_db.tables["call_results"] = [_call_row("call_live", CallStatus.IN_PROGRESS.value)]
+    await TranscriptService().append("call_live", "Agent: Hi Mike\nDriver: Hello\nAgent: Where are you")
+    
+    result = await CallService().get_call_result("call_live")
+    
+    assert result is not None
+    assert result.status == CallStatus.IN_PROGRESS
+    assert result.transcript == "Agent: Hi Mike\nDriver: Hello"
+
+async def test_live_call_without_segments_is_still_readable(fake_db):
+    fake_db.tables["call_results"] = [_call_row("call_new", CallStatus.PENDING.value)]
+    
+    result = await CallService().get_call_result("call_new")
+    
+    assert result is not None
+    assert result.transcript == ""
+
+async def test_finished_call_keeps_its_stored_transcript(fake_db):
+    fake_db.tables["call_results"] = [_call_row("call_done", CallStatus.COMPLETED.value, "Agent: Bye")]
+    
+    result = await CallService().get_call_result("call_done")
+    
+    assert result.transcript == "Agent: Bye"
+
+async def test_queued_progress_and_final_update_become_one_patch(fake_db):
+    fake_db.tables["call_results"] = [_call_row("call_1", CallStatus.IN_PROGRESS.value)]
+    service = CallService()
+    
+    service.queue_call_result_update("call_1", CallResultUpdate(structured_summary={"delivery_confirmed": True}))
+    result = await service.update_call_result(
+        "call_1", CallResultUpdate(status=CallStatus.COMPLETED, transcript="Agent: Bye")
+    )
+    
+    patches = fake_db.writes_to("call_results")
+    assert len(patches) == 1
+    assert patches[0]["structured_summary"] == {"delivery_confirmed": True}
+    assert patches[0]["status"] == CallStatus.COMPLETED
+    assert result.transcript == "Agent: Bye"
+
+async def test_progress_update_does_not_land_on_finished_call(fake_db):
+    fake_db.tables["call_results"] = [_call_row("call_1", CallStatus.CANCELLED.value, "Agent: Hi")]
+    service = CallService()
+    
+    assert await service.update_call_result("call_1", CallResultUpdate(status=CallStatus.IN_PROGRESS)) is None
+    assert await service.update_call_result("call_1", CallResultUpdate(transcript="late")) is None
+    assert fake_db.tables["call_results"][0]["status"] == CallStatus.CANCELLED.value
+    
+    summary = await service.update_call_result(
+        "call_1", CallResultUpdate(structured_summary={"a": 1}), allow_final=True
+    )
+    assert summary is not None and summary.status == CallStatus.CANCELLED
+
+async def test_search_error_is_raised_not_reported_as_no_results(fake_db):
+    # No search_call_results function registered, as before the migration is applied
+    with pytest.raises(RuntimeError):
+        await CallService().search_call_results("damaged pallet")
+
+async def test_search_cuts_snippets_from_compressed_transcripts(fake_db):
+    transcript = "Driver: " + "unloading at dock seven " * 100 + "\nDriver: one pallet arrived damaged"
+    row = _call_row("call_1", CallStatus.COMPLETED.value, compress_text(transcript, "zlib", min_size=0))
+    fake_db.tables["call_results"] = [row]
+    fake_db.rpc_handlers["search_call_results"] = lambda params: [{
+        "call_id": "call_1", "agent_config_id": 1, "driver_name": row["driver_name"],
+        "phone_number": row["phone_number"], "load_number": row["load_number"],
+        "status": row["status"], "rank": 0.5, "snippet": None
+    }]
+    
+    hits = await CallService().search_call_results("damaged")
+    
+    assert len(hits) == 1
+    assert "<b>damaged</b>" in hits[0].snippet
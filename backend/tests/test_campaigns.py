@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from campaigns import CampaignScheduler
+
+class FakeCampaignStore:
+    """
+    The campaign methods of the simple Supabase client over in-memory rows. Like the
+    SQL functions, claim_campaign_entries and get_campaign_progress work on every
+    entry of the campaign, not on a page of them.
+    """
+    
+    def __init__(self, campaign: Dict[str, Any], entries: List[Dict[str, Any]]):
+        self.campaign = campaign
+        self.entries = entries
+        self.listed_entries = 0
+    
+    async def get_campaigns(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [self.campaign] if status in (None, self.campaign["status"]) else []
+    
+    async def get_campaign(self, campaign_id: int) -> Optional[Dict[str, Any]]:
+        return self.campaign if campaign_id == self.campaign["id"] else None
+    
+    async def update_campaign(self, campaign_id: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.campaign.update(update_data)
+        return self.campaign
+    
+    async def get_campaign_entries(self, campaign_id: int, select: str = "*", **filters: Any) -> List[Dict[str, Any]]:
+        self.listed_entries += 1
+        statuses = filters.get("status", "")
+        if statuses.startswith("in.("):
+            wanted = statuses[4:-1].split(",")
+        elif statuses.startswith("eq."):
+            wanted = [statuses[3:]]
+        else:
+            wanted = None
+        return [dict(e) for e in self.entries if wanted is None or e["status"] in wanted]
+    
+    async def get_due_campaign_entries(self, campaign_id: int, now: str, limit: int) -> List[Dict[str, Any]]:
+        due = [e for e in self.entries if e["status"] == "pending" and e["next_attempt_at"] <= now]
+        return [dict(e) for e in due[:limit]]
+    
+    async def get_stale_campaign_entries(self, updated_before: str, limit: int = 100) -> List[Dict[str, Any]]:
+        return []
+    
+    async def get_campaign_entry_by_call_id(self, call_id: str) -> Optional[Dict[str, Any]]:
+        return next((dict(e) for e in self.entries if e.get("last_call_id") == call_id), None)
+    
+    async def update_campaign_entry(self, entry_id: int, update_data: Dict[str, Any], expected_status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        entry = next(e for e in self.entries if e["id"] == entry_id)
+        if expected_status and entry["status"] != expected_status:
+            return None
+        entry.update(update_data)
+        return dict(entry)
+    
+    async def claim_campaign_entries(self, campaign_id: int, entry_ids: List[int]) -> List[Dict[str, Any]]:
+        active = sum(e["status"] in ("dialing", "in_progress") for e in self.entries)
+        slots = self.campaign["max_concurrency"] - active
+        claimed = []
+        for entry_id in entry_ids:
+            entry = next(e for e in self.entries if e["id"] == entry_id)
+            if len(claimed) < slots and entry["status"] == "pending":
+                entry.update(status="dialing", attempts=entry["attempts"] + 1)
+                claimed.append(dict(entry))
+        return claimed
+    
+    async def get_campaign_progress(self, campaign_id: int) -> List[Dict[str, Any]]:
+        rows: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries:
+            row = rows.setdefault(entry["status"], {"status": entry["status"], "entries": 0, "attempts": 0})
+            row["entries"] += 1
+            row["attempts"] += entry["attempts"]
+        return list(rows.values())
+
+def _campaign(**overrides: Any) -> Dict[str, Any]:
+    return {
+        "id": 1,
+        "status": "active",
+        "max_concurrency": 2,
+        "max_attempts": 3,
+        "retry_delay_minutes": 10,
+        "timezone": "UTC",
+        "window_start": "00:00",
+        "window_end": "23:59:59",
+        **overrides
+    }
+
+def _entries(count: int, status: str = "pending") -> List[Dict[str, Any]]:
+    due = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+    return [
+        {"id": i, "campaign_id": 1, "status": status, "attempts": 0, "next_attempt_at": due, "timezone": None}
+        for i in range(1, count + 1)
+    ]
+
+def _scheduler(store: FakeCampaignStore, dialed: List[int]) -> CampaignScheduler:
+    async def dial(campaign, entry):
+        dialed.append(entry["id"])
+        entry_row = next(e for e in store.entries if e["id"] == entry["id"])
+        entry_row["last_call_id"] = f"call-{entry['id']}"
+        return {"status": "in_progress", "call_id": entry_row["last_call_id"]}
+    return CampaignScheduler(store, dial)
+
+async def test_tick_dials_up_to_max_concurrency():
+    store = FakeCampaignStore(_campaign(), _entries(5))
+    dialed: List[int] = []
+    
+    await _scheduler(store, dialed).tick()
+    
+    assert dialed == [1, 2]
+    assert [e["status"] for e in store.entries] == ["in_progress", "in_progress", "pending", "pending", "pending"]
+
+async def test_schedulers_in_two_workers_share_the_concurrency_cap():
+    store = FakeCampaignStore(_campaign(), _entries(5))
+    dialed: List[int] = []
+    first, second = _scheduler(store, dialed), _scheduler(store, dialed)
+    now = datetime.now(timezone.utc)
+    
+    # Both workers read the same free slots before either claims
+    original = store.get_due_campaign_entries
+    snapshots = []
+    async def due_once_read_by_both(*args, **kwargs):
+        if not snapshots:
+            snapshots.append(await original(*args, **kwargs))
+        return snapshots[0]
+    store.get_due_campaign_entries = due_once_read_by_both
+    
+    await first._dial_campaign(store.campaign, now)
+    await second._dial_campaign(store.campaign, now)
+    
+    assert dialed == [1, 2]
+
+async def test_webhook_outcome_schedules_a_retry():
+    store = FakeCampaignStore(_campaign(), _entries(1))
+    scheduler = _scheduler(store, [])
+    await scheduler.tick()
+    
+    await scheduler.on_call_finished("call-1", "ended", disconnection_reason="dial_no_answer")
+    
+    entry = store.entries[0]
+    assert entry["status"] == "pending"
+    assert entry["last_outcome"] == "dial_no_answer"
+    assert scheduler.retries_scheduled == 1
+
+async def test_late_dial_result_does_not_reopen_a_finished_attempt():
+    store = FakeCampaignStore(_campaign(), _entries(1))
+    
+    async def dial(campaign, entry):
+        store.entries[0]["last_call_id"] = "call-1"
+        # The webhook for the call lands before dial() returns
+        await scheduler.on_call_finished("call-1", "ended", disconnection_reason="user_hangup")
+        return {"status": "in_progress", "call_id": "call-1"}
+    scheduler = CampaignScheduler(store, dial)
+    
+    await scheduler.tick()
+    
+    assert store.entries[0]["status"] == "completed"
+
+async def test_progress_uses_grouped_counts():
+    entries = _entries(4)
+    entries[0].update(status="completed", attempts=1)
+    entries[1].update(status="failed", attempts=3)
+    store = FakeCampaignStore(_campaign(), entries)
+    
+    progress = await _scheduler(store, []).progress(1)
+    
+    assert store.listed_entries == 0
+    assert progress["total"] == 4
+    assert progress["pending"] == 2
+    assert progress["completed"] == 1
+    assert progress["failed"] == 1
+    assert progress["dialing"] == 0
+    assert progress["attempts"] == 4
+    assert progress["percent_complete"] == 50.0
@@ -0,0 +1,70 @@
+import pytest
+
+from app.core import compression
+from app.core.compression import (
+    COMPRESSED_PREFIX,
+    compress_json,
+    compress_text,
+    decompress_json,
+    decompress_text,
+    is_compressed,
+    resolve_codec
+)
+
+TRANSCRIPT = "\n".join(f"Agent: Line {i} about load 7891-B\nUser: Yes, on I-80 near mile {i}" for i in range(100))
+
+@pytest.mark.parametrize("codec", ["zstd", "zlib"])
+def test_text_round_trip(codec):
+    stored = compress_text(TRANSCRIPT, codec)
+    
+    assert is_compressed(stored)
+    assert len(stored) < len(TRANSCRIPT)
+    assert decompress_text(stored) == TRANSCRIPT
+
+def test_short_and_empty_text_is_stored_as_is():
+    assert compress_text("Agent: Hi", "zstd") == "Agent: Hi"
+    assert compress_text("", "zstd") == ""
+    assert compress_text(None, "zstd") is None
+    assert compress_text(TRANSCRIPT, None) == TRANSCRIPT
+
+def test_text_that_looks_compressed_is_always_encoded():
+    tricky = COMPRESSED_PREFIX + "not really"
+    
+    stored = compress_text(tricky, None)
+    
+    assert stored != tricky
+    assert decompress_text(stored) == tricky
+
+def test_plain_values_pass_through_decompression():
+    assert decompress_text("Agent: Hi") == "Agent: Hi"
+    assert decompress_text(None) is None
+    assert decompress_json({"delivery_confirmed": True}) == {"delivery_confirmed": True}
+
+def test_json_round_trip_only_above_min_size():
+    small = {"delivery_confirmed": True}
+    large = {"issues_identified": [f"Driver mentioned problem {i}" for i in range(100)]}
+    
+    assert compress_json(small, "zstd") == small
+    stored = compress_json(large, "zstd")
+    assert is_compressed(stored)
+    assert decompress_json(stored) == large
+
+def test_resolve_codec(monkeypatch):
+    assert resolve_codec("none") is None
+    assert resolve_codec("ZLIB") == "zlib"
+    with pytest.raises(ValueError):
+        resolve_codec("lz4")
+    
+    monkeypatch.setattr(compression, "zstandard", None)
+    assert resolve_codec("zstd") == "zlib"
+
+def test_zstd_value_without_zstandard_installed_raises(monkeypatch):
+    stored = compress_text(TRANSCRIPT, "zstd")
+    monkeypatch.setattr(compression, "zstandard", None)
+    
+    with pytest.raises(RuntimeError):
+        decompress_text(stored)
+
+def test_unknown_format_version_raises():
+    with pytest.raises(ValueError):
+        decompress_text(COMPRESSED_PREFIX + "CQE=")
@@ -0,0 +1,10 @@
+from fastapi.testclient import TestClient
+from main import app
+
+def test_dashboard_can_read_pagination_headers():
+    client = TestClient(app)
+    
+    response = client.get("/health", headers={"Origin": "http://localhost:3000"})
+    
+    exposed = {h.strip().lower() for h in response.headers["access-control-expose-headers"].split(",")}
+    assert {"x-next-cursor", "x-next-offset"} <= exposed
@@ -0,0 +1,38 @@
+from app.core.dedup import EventDeduplicator, webhook_fingerprint
+
+def test_redelivered_event_has_the_same_fingerprint():
+    event = {"event_type": "call_ended", "call_id": "c1", "timestamp": 1700000000}
+    
+    assert webhook_fingerprint(dict(event)) == webhook_fingerprint(event) == "c1:call_ended:1700000000"
+    assert webhook_fingerprint({**event, "timestamp": 1700000001}) != webhook_fingerprint(event)
+
+def test_events_without_timestamp_are_fingerprinted_by_payload():
+    first = {"event": "call_analyzed", "call_id": "c1", "data": {"b": 1, "a": 2}}
+    reordered = {"call_id": "c1", "data": {"a": 2, "b": 1}, "event": "call_analyzed"}
+    
+    assert webhook_fingerprint(first) == webhook_fingerprint(reordered)
+    assert webhook_fingerprint(first) != webhook_fingerprint({**first, "data": {}})
+
+def test_check_and_mark_suppresses_repeats():
+    dedup = EventDeduplicator(maxsize=10, ttl=60)
+    
+    assert dedup.check_and_mark("c1:call_ended:1") is False
+    assert dedup.check_and_mark("c1:call_ended:1") is True
+    assert dedup.check_and_mark("c1:call_ended:2") is False
+    assert dedup.stats() == {"tracked": 2, "checked": 3, "suppressed": 1}
+
+def test_forget_lets_a_failed_event_be_processed_again():
+    dedup = EventDeduplicator(maxsize=10, ttl=60)
+    dedup.check_and_mark("c1:call_ended:1")
+    
+    dedup.forget("c1:call_ended:1")
+    
+    assert dedup.check_and_mark("c1:call_ended:1") is False
+
+def test_seen_set_is_bounded():
+    dedup = EventDeduplicator(maxsize=2, ttl=60)
+    for fingerprint in ("a", "b", "c"):
+        dedup.check_and_mark(fingerprint)
+    
+    assert dedup.stats()["tracked"] == 2
+    assert dedup.check_and_mark("a") is False
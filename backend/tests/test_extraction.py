@@ -0,0 +1,101 @@
+import random
+import re
+
+from app.services import extraction
+from app.services.extraction import (
+    AhoCorasick,
+    IncrementalKeywordScan,
+    KeywordMatcher,
+    TranscriptExtractor,
+    extract_structured_data,
+    load_extractor
+)
+
+def _regex_matches(keywords, text):
+    """Reference: keywords that occur as whole words, one regex per keyword"""
+    text = text.lower()
+    return {kw for kw in keywords if re.search(rf"(?<!\w){re.escape(kw)}(?!\w)", text)}
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    
+    matches, _ = automaton.scan("ushers")
+    
+    found = {(end, automaton.patterns[index]) for end, index in matches}
+    assert found == {(3, "she"), (3, "he"), (5, "hers")}
+
+def test_automaton_state_carries_across_chunks():
+    automaton = AhoCorasick(["follow up"])
+    
+    first, state = automaton.scan("we will foll")
+    second, _ = automaton.scan("ow up", state)
+    
+    assert first == []
+    assert second == [(4, 0)]
+
+def test_chunked_scan_matches_the_regex_reference():
+    keywords = ["yes", "address", "correct address", "call back", "follow up", "good", "bad"]
+    matcher = KeywordMatcher(keywords)
+    vocabulary = ["yes", "yesterday", "address", "correct", "call", "back", "callback", "follow", "up",
+                  "good", "goodbye", "bad", "badge", "_bad", "ok", "the", "no"]
+    rng = random.Random(7)
+    
+    for _ in range(300):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 12))]
+        text = "".join(word + rng.choice([" ", ", ", ". ", "\n"]) for word in words).rstrip()
+        scan = IncrementalKeywordScan(matcher)
+        cuts = sorted(rng.sample(range(1, len(text)), min(3, len(text) - 1))) if len(text) > 1 else []
+        for start, end in zip([0, *cuts], [*cuts, len(text)]):
+            scan.feed(text[start:end])
+        
+        assert scan.matched() == _regex_matches(keywords, text), text
+
+def test_extractor_fed_segments_equals_a_full_scan():
+    utterances = ["Agent: Is the delivery address correct?", "User: Yes, but there is a problem", "User: call back tomorrow"]
+    extractor = TranscriptExtractor()
+    
+    for seq, content in enumerate(utterances):
+        extractor.feed_segments([{"seq": seq, "content": content}])
+    
+    assert extractor.covers(3)
+    assert extractor.structured_data() == extract_structured_data("\n".join(utterances))
+    assert extractor.structured_data()["issues_identified"] == ["Driver mentioned problem"]
+
+def test_extractor_out_of_sync_after_a_gap():
+    extractor = TranscriptExtractor()
+    
+    extractor.feed_segments([{"seq": 1, "content": "User: yes"}])
+    
+    assert not extractor.covers(2)
+
+async def test_load_extractor_rebuilds_from_stored_segments(monkeypatch):
+    monkeypatch.setattr(extraction, "_extractors", extraction.LRUCache(maxsize=10))
+    stored = [
+        {"seq": 0, "content": "Agent: Any trouble on the road?"},
+        {"seq": 1, "content": "User: Yes, I'm frustrated"},
+        {"seq": 2, "content": "User: call back tomorrow"}
+    ]
+    loads = []
+    
+    async def load_segments(call_id):
+        loads.append(call_id)
+        return stored
+    
+    # Earlier events of the call were handled by another process; seq 2 is new here
+    extractor = await load_extractor("call_1", load_segments, up_to_seq=2)
+    summary = extractor.feed_segments(stored[2:])
+    
+    assert extractor.covers(3)
+    assert summary == extract_structured_data("\n".join(segment["content"] for segment in stored))
+    assert await load_extractor("call_1", load_segments, up_to_seq=3) is extractor
+    assert loads == ["call_1"]
+
+async def test_load_extractor_for_a_new_call_skips_the_read(monkeypatch):
+    monkeypatch.setattr(extraction, "_extractors", extraction.LRUCache(maxsize=10))
+    
+    async def load_segments(call_id):
+        raise AssertionError("nothing is stored before seq 0")
+    
+    extractor = await load_extractor("call_1", load_segments, up_to_seq=0)
+    
+    assert extractor.segments == 0
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.services.extraction import extract_structured_data, transcript_stats
+from app.services.extraction_pipeline import CPU_STAGE, IO_STAGE, ExtractionPipeline
+
+TRANSCRIPT = "Agent: Is the address correct?\nUser: Yes, but there is a problem"
+
+@pytest.fixture
+def pipeline():
+    pipeline = ExtractionPipeline(max_workers=1, default_timeout=30)
+    yield pipeline
+    pipeline.shutdown()
+
+async def test_cpu_stages_run_in_worker_processes_and_merge_in_order(pipeline):
+    pipeline.register("keywords", extract_structured_data, CPU_STAGE)
+    pipeline.register("transcript_stats", transcript_stats, CPU_STAGE)
+    
+    result = await pipeline.run(TRANSCRIPT)
+    
+    assert result == {**extract_structured_data(TRANSCRIPT), **transcript_stats(TRANSCRIPT)}
+    assert pipeline.stats()["stages"]["keywords"]["runs"] == 1
+
+async def test_io_stage_sees_earlier_results(pipeline):
+    seen = {}
+    
+    @pipeline.stage("first", kind=IO_STAGE)
+    async def first(transcript, structured_data):
+        return {"delivery_confirmed": True}
+    
+    @pipeline.stage("second", kind=IO_STAGE)
+    async def second(transcript, structured_data):
+        seen.update(structured_data)
+        return {"summary": "confirmed" if structured_data["delivery_confirmed"] else "open"}
+    
+    assert await pipeline.run(TRANSCRIPT) == {"delivery_confirmed": True, "summary": "confirmed"}
+    assert seen == {"delivery_confirmed": True}
+
+async def test_failed_and_timed_out_stages_are_reported_and_others_still_run(pipeline):
+    @pipeline.stage("broken", kind=IO_STAGE)
+    async def broken(transcript, structured_data):
+        raise RuntimeError("LLM unavailable")
+    
+    @pipeline.stage("slow", kind=IO_STAGE, timeout=0.01)
+    async def slow(transcript, structured_data):
+        await asyncio.sleep(1)
+    
+    @pipeline.stage("last", kind=IO_STAGE)
+    async def last(transcript, structured_data):
+        return {"ran": True}
+    
+    result = await pipeline.run(TRANSCRIPT)
+    
+    assert result["ran"] is True
+    assert result["extraction_errors"] == {"broken": "LLM unavailable", "slow": "timed out after 0.01s"}
+    stages = pipeline.stats()["stages"]
+    assert (stages["broken"]["failures"], stages["slow"]["timeouts"]) == (1, 1)
+
+async def test_precomputed_stages_are_skipped(pipeline):
+    @pipeline.stage("keywords", kind=IO_STAGE)
+    async def keywords(transcript, structured_data):
+        raise AssertionError("already computed during the call")
+    
+    result = await pipeline.run(TRANSCRIPT, precomputed={"keywords": {"driver_sentiment": "positive"}})
+    
+    assert result == {"driver_sentiment": "positive"}
+
+def test_select_defaults_and_named_stages(pipeline):
+    pipeline.register("keywords", extract_structured_data)
+    pipeline.register("transcript_stats", transcript_stats, default=False)
+    
+    assert [stage.name for stage in pipeline.select()] == ["keywords"]
+    assert [stage.name for stage in pipeline.select(["transcript_stats", "unknown"])] == ["transcript_stats"]
+
+def test_registration_errors(pipeline):
+    pipeline.register("keywords", extract_structured_data)
+    
+    with pytest.raises(ValueError):
+        pipeline.register("keywords", extract_structured_data)
+    with pytest.raises(ValueError):
+        pipeline.register("other", extract_structured_data, kind="gpu")
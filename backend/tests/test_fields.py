@@ -0,0 +1,31 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.fields import (
+    CALL_RESULT_COLUMNS,
+    CALL_RESULT_LIST_FIELDS,
+    build_select
+)
+from app.routers.call_management import _select_fields
+
+def test_default_projection_is_the_lean_list_fields():
+    assert build_select(None, CALL_RESULT_COLUMNS, CALL_RESULT_LIST_FIELDS) == ",".join(CALL_RESULT_LIST_FIELDS)
+    assert "transcript" not in build_select(" ", CALL_RESULT_COLUMNS, CALL_RESULT_LIST_FIELDS)
+
+def test_star_selects_every_column():
+    assert build_select(" * ", CALL_RESULT_COLUMNS, CALL_RESULT_LIST_FIELDS) == "*"
+
+def test_requested_fields_keep_order_drop_duplicates_and_add_pagination_columns():
+    select = build_select("status, call_id,,status", CALL_RESULT_COLUMNS, CALL_RESULT_LIST_FIELDS)
+    
+    assert select == "status,call_id,id,created_at"
+
+def test_unknown_field_raises_value_error():
+    with pytest.raises(ValueError, match="Unknown field 'password'"):
+        build_select("call_id,password", CALL_RESULT_COLUMNS, CALL_RESULT_LIST_FIELDS)
+
+def test_unknown_field_is_a_400_on_list_endpoints():
+    with pytest.raises(HTTPException) as error:
+        _select_fields("password")
+    
+    assert error.value.status_code == 400
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.core.idempotency import (
+    REPLAYED_HEADER,
+    IdempotencyConflict,
+    IdempotencyStore,
+    request_fingerprint,
+    run_idempotent
+)
+
+def _counting(result="created"):
+    runs = []
+    
+    async def fn():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return result
+    return fn, runs
+
+def test_fingerprint_ignores_key_order():
+    assert request_fingerprint({"a": 1, "b": [1, 2]}) == request_fingerprint({"b": [1, 2], "a": 1})
+    assert request_fingerprint({"a": 1}) != request_fingerprint({"a": 2})
+
+async def test_replayed_key_returns_the_stored_result():
+    store = IdempotencyStore()
+    fn, runs = _counting()
+    
+    assert await store.run("k", "fp", fn) == ("created", False)
+    assert await store.run("k", "fp", fn) == ("created", True)
+    assert len(runs) == 1
+
+async def test_duplicate_in_flight_waits_for_the_original():
+    store = IdempotencyStore()
+    fn, runs = _counting()
+    
+    results = await asyncio.gather(store.run("k", "fp", fn), store.run("k", "fp", fn))
+    
+    assert sorted(results) == [("created", False), ("created", True)]
+    assert len(runs) == 1
+    assert store.stats()["waits"] == 1
+
+async def test_key_reused_for_another_request_conflicts():
+    store = IdempotencyStore()
+    fn, _ = _counting()
+    await store.run("k", "fp", fn)
+    
+    with pytest.raises(IdempotencyConflict):
+        await store.run("k", "other", fn)
+
+async def test_failed_operation_can_be_retried():
+    store = IdempotencyStore()
+    attempts = []
+    
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("Retell unavailable")
+        return "created"
+    
+    with pytest.raises(RuntimeError):
+        await store.run("k", "fp", flaky)
+    assert await store.run("k", "fp", flaky) == ("created", False)
+
+async def test_run_idempotent_marks_replays_and_rejects_conflicts():
+    store = IdempotencyStore()
+    fn, runs = _counting({"call_id": "c1"})
+    
+    first, second = Response(), Response()
+    await run_idempotent(store, "calls/trigger", "key-1", {"phone": "1"}, first, fn)
+    assert await run_idempotent(store, "calls/trigger", "key-1", {"phone": "1"}, second, fn) == {"call_id": "c1"}
+    
+    assert REPLAYED_HEADER not in first.headers
+    assert second.headers[REPLAYED_HEADER] == "true"
+    assert len(runs) == 1
+    with pytest.raises(HTTPException) as error:
+        await run_idempotent(store, "calls/trigger", "key-1", {"phone": "2"}, Response(), fn)
+    assert error.value.status_code == 422
+
+async def test_without_a_key_every_request_runs():
+    store = IdempotencyStore()
+    fn, runs = _counting()
+    
+    await run_idempotent(store, "calls/trigger", None, {}, Response(), fn)
+    await run_idempotent(store, "calls/trigger", None, {}, Response(), fn)
+    
+    assert len(runs) == 2
@@ -0,0 +1,82 @@
+import asyncio
+
+from app.core.number_pool import FromNumberPool, parse_from_numbers
+
+def test_parse_from_numbers():
+    assert parse_from_numbers("+15550001111:3, +15550002222,", default_limit=5) == {
+        "+15550001111": 3,
+        "+15550002222": 5
+    }
+    assert parse_from_numbers(None) == {}
+
+async def test_acquire_picks_least_loaded_number():
+    pool = FromNumberPool({"a": 2, "b": 2})
+    
+    first = await pool.acquire("call-1")
+    second = await pool.acquire("call-2")
+    
+    assert {first, second} == {"a", "b"}
+    assert await pool.release("call-1") == first
+    assert await pool.acquire("call-3") == first
+
+async def test_acquire_times_out_when_every_number_is_busy():
+    pool = FromNumberPool({"a": 1})
+    await pool.acquire("call-1")
+    
+    assert await pool.acquire("call-2", timeout=0.05) is None
+    assert pool.stats()["exhausted"] == 1
+
+async def test_release_wakes_a_waiting_acquire():
+    pool = FromNumberPool({"a": 1})
+    await pool.acquire("call-1")
+    
+    waiter = asyncio.create_task(pool.acquire("call-2", timeout=5))
+    await asyncio.sleep(0.01)
+    await pool.release("call-1")
+    
+    assert await asyncio.wait_for(waiter, timeout=1) == "a"
+
+async def test_carrier_error_cools_the_number_down():
+    pool = FromNumberPool({"a": 1, "b": 1}, cooldown=60)
+    number = await pool.acquire("call-1")
+    await pool.release("call-1", carrier_error=True)
+    
+    assert await pool.acquire("call-2") != number
+    assert pool.stats()["numbers"][number]["carrier_errors"] == 1
+
+async def test_holds_expire_after_max_hold():
+    pool = FromNumberPool({"a": 1}, max_hold=0.01)
+    await pool.acquire("call-1")
+    await asyncio.sleep(0.02)
+    
+    assert await pool.acquire("call-2", timeout=0) == "a"
+
+async def test_reconcile_releases_calls_finished_elsewhere():
+    asked = []
+    
+    async def finished_calls(keys):
+        asked.append(keys)
+        return keys
+    pool = FromNumberPool({"a": 1}, finished_calls=finished_calls, reconcile_interval=0)
+    await pool.acquire("call-1")
+    
+    assert await pool.acquire("call-2", timeout=1) == "a"
+    assert asked == [["call-1"]]
+    assert pool.stats()["reconciled"] == 1
+
+async def test_release_is_not_blocked_by_a_slow_reconcile():
+    query_started, query_done = asyncio.Event(), asyncio.Event()
+    
+    async def finished_calls(keys):
+        query_started.set()
+        await query_done.wait()
+        return []
+    pool = FromNumberPool({"a": 1}, finished_calls=finished_calls, reconcile_interval=0)
+    await pool.acquire("call-1")
+    waiter = asyncio.create_task(pool.acquire("call-2", timeout=5))
+    await asyncio.wait_for(query_started.wait(), timeout=1)
+    
+    # The reconcile query is still running, release must not wait for it
+    assert await asyncio.wait_for(pool.release("call-1"), timeout=0.5) == "a"
+    query_done.set()
+    assert await asyncio.wait_for(waiter, timeout=1) == "a"
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.pagination import KEYSET_ORDER, decode_cursor, encode_cursor, keyset_filter, next_cursor
+from supabase_simple import _call_records_page_params
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+    
+    cursor = encode_cursor(created_at, 42)
+    
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at.isoformat(), 42)
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor("yesterday", 1)])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_keyset_filter_breaks_created_at_ties_by_id():
+    cursor = encode_cursor("2026-03-01T12:00:00+00:00", 7)
+    
+    assert keyset_filter(cursor) == (
+        'created_at.lt."2026-03-01T12:00:00+00:00",'
+        'and(created_at.eq."2026-03-01T12:00:00+00:00",id.lt.7)'
+    )
+
+def test_next_cursor_only_for_full_pages():
+    rows = [{"created_at": "2026-03-01T12:00:00+00:00", "id": 2}, {"created_at": "2026-03-01T11:00:00+00:00", "id": 1}]
+    
+    assert next_cursor(rows, limit=3) is None
+    assert next_cursor([], limit=2) is None
+    assert decode_cursor(next_cursor(rows, limit=2)) == ("2026-03-01T11:00:00+00:00", 1)
+
+def test_walking_pages_visits_every_row_once():
+    # Several rows share a created_at, which offset-free paging must not skip or repeat
+    rows = [
+        {"id": row_id, "created_at": f"2026-03-01T12:00:0{row_id // 3}+00:00"}
+        for row_id in range(1, 11)
+    ]
+    ordered = sorted(rows, key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    
+    seen, cursor = [], None
+    while True:
+        page = ordered
+        if cursor:
+            created_at, row_id = decode_cursor(cursor)
+            page = [r for r in ordered if r["created_at"] < created_at or (r["created_at"] == created_at and r["id"] < row_id)]
+        page = page[:4]
+        seen.extend(row["id"] for row in page)
+        cursor = next_cursor(page, limit=4)
+        if cursor is None:
+            break
+    
+    assert seen == [row["id"] for row in ordered]
+
+def test_call_records_page_params():
+    assert _call_records_page_params(20, select="id,status", status="eq.completed") == {
+        "status": "eq.completed",
+        "select": "id,status",
+        "order": KEYSET_ORDER,
+        "limit": 20
+    }
+    
+    cursor = encode_cursor("2026-03-01T12:00:00+00:00", 7)
+    assert _call_records_page_params(20, cursor)["or"] == f"({keyset_filter(cursor)})"
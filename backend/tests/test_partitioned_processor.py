@@ -0,0 +1,87 @@
+import asyncio
+import random
+
+from app.core.partitioned_processor import PartitionedProcessor, partition_for
+
+def test_partition_is_stable_and_in_range():
+    assert partition_for("call_1", 8) == partition_for("call_1", 8)
+    assert all(0 <= partition_for(f"call_{i}", 8) < 8 for i in range(100))
+
+async def test_items_of_one_key_are_handled_in_arrival_order():
+    handled = {}
+    rng = random.Random(3)
+    
+    async def handler(item):
+        await asyncio.sleep(rng.random() / 1000)
+        handled.setdefault(item["call_id"], []).append(item["seq"])
+    processor = PartitionedProcessor(handler, key=lambda item: item["call_id"], partitions=4)
+    await processor.start()
+    
+    for seq in range(20):
+        for call in range(5):
+            assert processor.enqueue({"call_id": f"call_{call}", "seq": seq})
+    await processor.stop()
+    
+    assert handled == {f"call_{call}": list(range(20)) for call in range(5)}
+    assert processor.stats()["processed"] == 100
+
+async def test_partitions_run_in_parallel():
+    running, peak = 0, 0
+    
+    async def handler(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+    processor = PartitionedProcessor(handler, key=lambda item: item, partitions=4)
+    await processor.start()
+    
+    for key in range(40):
+        processor.enqueue(key)
+    await processor.stop()
+    
+    assert peak > 1
+
+async def test_full_partition_rejects_items():
+    release = asyncio.Event()
+    
+    async def handler(item):
+        await release.wait()
+    processor = PartitionedProcessor(handler, key=lambda item: "same", partitions=2, maxsize=4)
+    await processor.start()
+    
+    accepted = [processor.enqueue(i) for i in range(5)]
+    release.set()
+    await processor.stop()
+    
+    # Every item shares one partition, which holds maxsize // partitions items
+    assert accepted == [True, True, False, False, False]
+    assert processor.stats()["rejected"] == 3
+
+async def test_failed_item_does_not_stop_the_partition():
+    handled = []
+    
+    async def handler(item):
+        if item == "bad":
+            raise RuntimeError("boom")
+        handled.append(item)
+    processor = PartitionedProcessor(handler, key=lambda item: "same", partitions=1)
+    await processor.start()
+    
+    for item in ("a", "bad", "b"):
+        processor.enqueue(item)
+    await processor.stop()
+    
+    assert handled == ["a", "b"]
+    assert processor.stats()["failed"] == 1
+
+async def test_enqueue_after_stop_is_rejected():
+    async def handler(item):
+        pass
+    processor = PartitionedProcessor(handler, key=lambda item: item)
+    
+    assert processor.enqueue("before start") is False
+    await processor.start()
+    await processor.stop()
+    assert processor.enqueue("after stop") is False
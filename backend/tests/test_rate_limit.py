@@ -0,0 +1,68 @@
+import time
+
+import httpx
+import pytest
+
+from app.core.rate_limit import RateLimiter, RateLimitExceeded, TokenBucket, parse_retry_after
+from app.services.retell_client import RetellClient
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) == 1.0
+    assert parse_retry_after("soon", default=4.0) == 4.0
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:00 GMT") == 0.0
+
+async def test_burst_is_served_at_once_then_refills_at_rate():
+    bucket = TokenBucket(rate=50.0, burst=3)
+    
+    waits = [await bucket.acquire(max_wait=1.0) for _ in range(3)]
+    assert max(waits) < 0.01
+    
+    start = time.monotonic()
+    await bucket.acquire(max_wait=1.0)
+    assert time.monotonic() - start >= 0.015
+    assert bucket.stats()["acquired"] == 4
+
+async def test_acquire_rejects_waits_longer_than_max_wait():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    await bucket.acquire(max_wait=0)
+    
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire(max_wait=0.1)
+    assert bucket.stats()["rejected"] == 1
+
+async def test_penalize_blocks_the_bucket_until_retry_after():
+    bucket = TokenBucket(rate=1000.0, burst=10)
+    bucket.penalize(5.0)
+    
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire(max_wait=1.0)
+    assert bucket.stats()["throttled"] == 1
+
+async def test_limiter_rejects_unknown_endpoint_class():
+    limiter = RateLimiter({"read": (1.0, 1)})
+    
+    with pytest.raises(ValueError):
+        await limiter.acquire("call")
+
+async def test_retell_client_retries_429_under_the_limiter():
+    responses = [httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={"ok": True})]
+    client = RetellClient("key", rate_limits={"call": (100.0, 5), "agent": (100.0, 5), "read": (100.0, 5)})
+    client._http = httpx.AsyncClient(
+        base_url="https://retell.test",
+        transport=httpx.MockTransport(lambda request: responses.pop(0))
+    )
+    
+    response = await client.request("POST", "/v2/create-phone-call", endpoint_class="call")
+    
+    assert response.status_code == 200
+    bucket = client.limiter.buckets["call"].stats()
+    assert bucket["acquired"] == 2
+    assert bucket["throttled"] == 1
+    await client.aclose()
+
+def test_retell_sdk_does_not_retry_behind_the_limiter():
+    client = RetellClient("key")
+    
+    assert client.sdk.max_retries == 0
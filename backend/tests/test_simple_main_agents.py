@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+import pytest
+import simple_main
+from supabase_simple import AsyncSimpleSupabaseClient
+
+class FakeAgentStore:
+    def __init__(self, configs):
+        self.configs = configs
+        self.saved = []
+    
+    async def get_agent_configuration(self, config_id):
+        return dict(self.configs[config_id])
+    
+    async def set_agent_retell_id(self, config_id, retell_agent_id):
+        self.saved.append((config_id, retell_agent_id))
+        self.configs[config_id]["retell_agent_id"] = retell_agent_id
+        return dict(self.configs[config_id])
+
+@pytest.fixture
+def retell_agents(monkeypatch):
+    """Retell agent creation endpoint that hands out agent_1, agent_2, ..."""
+    created = []
+    
+    async def request(method, path, **kwargs):
+        created.append(kwargs.get("json"))
+        return SimpleNamespace(status_code=200, json=lambda: {"agent_id": f"agent_{len(created)}"})
+    
+    monkeypatch.setenv("RETELL_API_KEY", "key_test")
+    monkeypatch.setattr(simple_main.retell, "request", request)
+    return created
+
+async def test_created_agent_id_is_saved_and_reused(monkeypatch, retell_agents):
+    store = FakeAgentStore({1: {"id": 1, "agent_name": "Dispatch", "retell_agent_id": None}})
+    monkeypatch.setattr(simple_main, "supabase", store)
+    
+    first = await simple_main.create_retell_agent(await store.get_agent_configuration(1))
+    second = await simple_main.create_retell_agent(await store.get_agent_configuration(1))
+    
+    assert first == second == "agent_1"
+    assert len(retell_agents) == 1
+    assert store.saved == [(1, "agent_1")]
+
+async def test_failed_save_still_returns_the_created_agent(monkeypatch, retell_agents):
+    class FailingStore(FakeAgentStore):
+        async def set_agent_retell_id(self, config_id, retell_agent_id):
+            raise RuntimeError("database unavailable")
+    
+    store = FailingStore({1: {"id": 1, "agent_name": "Dispatch"}})
+    monkeypatch.setattr(simple_main, "supabase", store)
+    
+    assert await simple_main.create_retell_agent(await store.get_agent_configuration(1)) == "agent_1"
+
+async def test_set_agent_retell_id_patches_only_that_column(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "anon")
+    client = AsyncSimpleSupabaseClient()
+    requests = []
+    
+    async def request(method, table, params=None, json=None):
+        requests.append((method, table, params, json))
+        return [{"id": 7, "retell_agent_id": json["retell_agent_id"]}]
+    
+    monkeypatch.setattr(client, "_request", request)
+    
+    await client.set_agent_retell_id(7, "agent_abc")
+    
+    assert requests == [("PATCH", "agent_configurations", {"id": "eq.7"}, {"retell_agent_id": "agent_abc"})]
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight, request_key
+
+def test_request_key_ignores_param_order():
+    assert request_key("get", "/calls", {"b": 2, "a": 1}) == request_key("GET", "/calls", {"a": "1", "b": "2"})
+    assert request_key("GET", "/calls") != request_key("GET", "/calls", {"a": 1})
+
+async def test_concurrent_identical_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    started = []
+    
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+    
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(4)))
+    
+    assert results == [{"ok": True}] * 4
+    assert len(started) == 1
+    assert flight.stats() == {"in_flight": 0, "calls": 4, "coalesced": 3}
+
+async def test_results_are_not_cached_after_completion():
+    flight = SingleFlight()
+    started = []
+    
+    async def fetch():
+        started.append(1)
+        return len(started)
+    
+    assert await flight.do("key", fetch) == 1
+    assert await flight.do("key", fetch) == 2
+
+async def test_failure_is_raised_to_every_waiter():
+    flight = SingleFlight()
+    
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+    
+    results = await asyncio.gather(flight.do("key", fetch), flight.do("key", fetch), return_exceptions=True)
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    
+    async def fetch():
+        await release.wait()
+        return "done"
+    
+    first = asyncio.create_task(flight.do("key", fetch))
+    second = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
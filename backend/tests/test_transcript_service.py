@@ -0,0 +1,52 @@
+from app.services.transcript_service import TranscriptService, split_utterances
+
+def _stored(db, call_id):
+    rows = [row for row in db.tables.get("call_transcript_segments", []) if row["call_id"] == call_id]
+    return [(row["seq"], row["content"]) for row in sorted(rows, key=lambda row: row["seq"])]
+
+def test_split_utterances_drops_blank_lines():
+    assert split_utterances("Agent: Hi\n\n  User: Hello  \n") == ["Agent: Hi", "User: Hello"]
+
+async def test_append_stores_only_new_finished_utterances(fake_db):
+    service = TranscriptService()
+    
+    first = await service.append("call_1", "Agent: Hi\nUser: Hel")
+    second = await service.append("call_1", "Agent: Hi\nUser: Hello\nAgent: Where")
+    final = await service.append("call_1", "Agent: Hi\nUser: Hello\nAgent: Where are you", final=True)
+    
+    assert [s["seq"] for s in first] == [0]
+    assert [s["seq"] for s in second] == [1]
+    assert [s["content"] for s in final] == ["Agent: Where are you"]
+    assert _stored(fake_db, "call_1") == [(0, "Agent: Hi"), (1, "User: Hello"), (2, "Agent: Where are you")]
+
+async def test_next_seq_comes_from_the_database(fake_db):
+    # Another server process stored the first utterances of this call
+    fake_db.tables["call_transcript_segments"] = [
+        {"id": 100, "call_id": "call_1", "seq": 0, "content": "Agent: Hi"},
+        {"id": 101, "call_id": "call_1", "seq": 1, "content": "User: Hello"}
+    ]
+    
+    appended = await TranscriptService().append("call_1", "Agent: Hi\nUser: Hello\nAgent: Where\nUser: Ohio")
+    
+    assert [(s["seq"], s["content"]) for s in appended] == [(2, "Agent: Where")]
+    assert len(_stored(fake_db, "call_1")) == 3
+
+async def test_racing_append_returns_only_its_own_rows(fake_db):
+    service = TranscriptService()
+    await service.append("call_1", "Agent: Hi\nUser: Hello\nAgent: Where")
+    
+    # A second process read the same next seq before the first one wrote
+    async def stale_next_seq(call_id):
+        return 0
+    service._get_next_seq = stale_next_seq
+    appended = await service.append("call_1", "Agent: Hi\nUser: Hello\nAgent: Where\nUser: Ohio")
+    
+    assert [s["seq"] for s in appended] == [2]
+    assert len(_stored(fake_db, "call_1")) == 3
+
+async def test_materialize_joins_segments_in_order(fake_db):
+    service = TranscriptService()
+    await service.append("call_1", "Agent: Hi\nUser: Hello", final=True)
+    
+    assert await service.materialize("call_1") == "Agent: Hi\nUser: Hello"
+    assert await service.materialize("call_other") == ""
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from app.services.write_coalescer import WriteCoalescer
+
+class RecordingWriter:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.writes = []
+        self.delay = delay
+        self.fail = fail
+    
+    async def __call__(self, key, fields):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("write failed")
+        self.writes.append((key, dict(fields)))
+        return dict(fields)
+
+async def test_enqueued_updates_merge_into_one_write():
+    writer = RecordingWriter()
+    coalescer = WriteCoalescer(writer, window=0.05)
+    
+    coalescer.enqueue("call_1", {"status": "in_progress"})
+    coalescer.enqueue("call_1", {"structured_summary": {"a": 1}})
+    coalescer.enqueue("call_1", {"structured_summary": {"a": 2}})
+    await asyncio.sleep(0.1)
+    
+    assert writer.writes == [("call_1", {"status": "in_progress", "structured_summary": {"a": 2}})]
+    assert coalescer.stats()["coalesced"] == 2
+
+async def test_submit_writes_at_once_and_takes_queued_fields_along():
+    writer = RecordingWriter()
+    coalescer = WriteCoalescer(writer, window=10.0)
+    
+    coalescer.enqueue("call_1", {"structured_summary": {"a": 1}})
+    result = await asyncio.wait_for(coalescer.submit("call_1", {"status": "completed"}), timeout=1.0)
+    
+    assert result == {"structured_summary": {"a": 1}, "status": "completed"}
+    assert len(writer.writes) == 1
+
+async def test_keys_are_written_separately_and_in_order():
+    writer = RecordingWriter(delay=0.02)
+    coalescer = WriteCoalescer(writer, window=0.01)
+    
+    first = coalescer.enqueue("call_1", {"seq": 1})
+    await asyncio.sleep(0.015)  # first batch is now being written
+    second = coalescer.enqueue("call_1", {"seq": 2})
+    other = coalescer.enqueue("call_2", {"seq": 1})
+    await asyncio.gather(first, second, other)
+    
+    call_1_writes = [fields["seq"] for key, fields in writer.writes if key == "call_1"]
+    assert call_1_writes == [1, 2]
+    assert ("call_2", {"seq": 1}) in writer.writes
+
+async def test_failed_write_is_raised_to_submitters():
+    coalescer = WriteCoalescer(RecordingWriter(fail=True), window=0.01)
+    
+    with pytest.raises(RuntimeError):
+        await coalescer.submit("call_1", {"status": "completed"})
+
+async def test_flush_writes_pending_batches_immediately():
+    writer = RecordingWriter()
+    coalescer = WriteCoalescer(writer, window=10.0)
+    
+    coalescer.enqueue("call_1", {"status": "in_progress"})
+    await coalescer.flush()
+    
+    assert writer.writes == [("call_1", {"status": "in_progress"})]
@@ -106,7 +106,7 @@ const AgentConfiguration = () => {
     try {
       setIsLoading(true);
       setError(null);
-      const response = await fetch(`${API_BASE_URL}/agent-configurations`);
+      const response = await fetch(`${API_BASE_URL}/agent-configurations?fields=*`);
       if (!response.ok) {
         throw new Error('Failed to load configurations');
       }
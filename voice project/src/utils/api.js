@@ -14,11 +14,11 @@ class ApiError extends Error {
 async function apiRequest(endpoint, options = {}) {
   const url = `${API_BASE_URL}${endpoint}`;
   const config = {
+    ...options,
     headers: {
       'Content-Type': 'application/json',
       ...options.headers,
     },
-    ...options,
   };
 
   try {
@@ -46,6 +46,10 @@ async function apiRequest(endpoint, options = {}) {
   }
 }
 
+// Key for a non-repeatable POST; reuse the same key when retrying the same action
+// so the backend replays the first response instead of acting twice
+export const newIdempotencyKey = () => crypto.randomUUID();
+
 // Agent Configuration API functions
 export const agentConfigApi = {
   // Get all agent configurations
@@ -72,11 +76,15 @@ export const agentConfigApi = {
   }),
 };
 
+// Events sent by /calls/stream
+const CALL_EVENT_TYPES = ['call_started', 'call_status', 'transcript_updated', 'call_ended', 'structured_summary'];
+
 // Call Management API functions
 export const callApi = {
   // Trigger a test call
-  trigger: (callRequest) => apiRequest('/calls/trigger', {
+  trigger: (callRequest, idempotencyKey = newIdempotencyKey()) => apiRequest('/calls/trigger', {
     method: 'POST',
+    headers: { 'Idempotency-Key': idempotencyKey },
     body: JSON.stringify(callRequest),
   }),
   
@@ -86,9 +94,15 @@ export const callApi = {
     body: JSON.stringify(callRequest),
   }),
   
-  // Get all call records
-  getAll: (limit = 50, offset = 0) => 
-    apiRequest(`/calls?limit=${limit}&offset=${offset}`),
+  // Get all call records (pass the previous page's next_cursor to page forward)
+  getAll: (limit = 50, offset = 0, cursor = null) => 
+    apiRequest(cursor
+      ? `/calls?limit=${limit}&cursor=${encodeURIComponent(cursor)}`
+      : `/calls?limit=${limit}&offset=${offset}`),
+  
+  // Full-text search over call records (pass the previous page's next_offset to page forward)
+  search: (query, limit = 20, offset = 0) => 
+    apiRequest(`/calls/search?q=${encodeURIComponent(query)}&limit=${limit}&offset=${offset}`),
   
   // Get specific call record
   getById: (callId) => apiRequest(`/calls/${callId}`),
@@ -101,18 +115,35 @@ export const callApi = {
     }),
   
   // Get calls by agent configuration
-  getByAgent: (agentConfigId, limit = 50) => 
-    apiRequest(`/calls/agent/${agentConfigId}?limit=${limit}`),
+  getByAgent: (agentConfigId, limit = 50, cursor = null) => 
+    apiRequest(`/calls/agent/${agentConfigId}?limit=${limit}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`),
   
   // Get calls by status
-  getByStatus: (status, limit = 50) => 
-    apiRequest(`/calls/status/${status}?limit=${limit}`),
+  getByStatus: (status, limit = 50, cursor = null) => 
+    apiRequest(`/calls/status/${status}?limit=${limit}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`),
   
   // Create web call
   createWebCall: (agentId) => apiRequest('/calls/web-call', {
     method: 'POST',
     body: JSON.stringify({ agent_id: agentId }),
   }),
+  
+  // Subscribe to live call updates instead of polling; returns a function that closes the stream
+  subscribe: (onEvent, { callId = null, agentConfigId = null } = {}, onError = null) => {
+    const params = new URLSearchParams();
+    if (callId) params.set('call_id', callId);
+    if (agentConfigId) params.set('agent_config_id', agentConfigId);
+    const query = params.toString();
+    const source = new EventSource(`${API_BASE_URL}/calls/stream${query ? `?${query}` : ''}`);
+    
+    CALL_EVENT_TYPES.forEach((type) => {
+      source.addEventListener(type, (event) => onEvent(type, JSON.parse(event.data)));
+    });
+    // The server ends the stream of a client that fell too far behind; EventSource reconnects on its own
+    source.onerror = (error) => onError && onError(error);
+    
+    return () => source.close();
+  },
 };
 
 // Phone Call API functions
@@ -136,8 +167,9 @@ export const agentsApi = {
   getById: (agentId) => apiRequest(`/agents/${agentId}`),
   
   // Create new agent in both Supabase and Retell AI
-  create: (agentConfig) => apiRequest('/agents/create', {
+  create: (agentConfig, idempotencyKey = newIdempotencyKey()) => apiRequest('/agents/create', {
     method: 'POST',
+    headers: { 'Idempotency-Key': idempotencyKey },
     body: JSON.stringify(agentConfig),
   }),
 };